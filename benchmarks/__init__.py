@@ -0,0 +1,8 @@
+"""
+Benchmarks of pymws against a local stand-in for MWS.
+
+Run them from the root of the repository::
+
+    python -m benchmarks --output results.json
+    python -m benchmarks --compare results.json
+"""
@@ -0,0 +1,73 @@
+"""
+Response bodies of the fake MWS server, generated from the example
+responses of the tests (``tests/responses``).
+"""
+import base64
+import copy
+import hashlib
+import io
+import os
+
+from lxml import etree
+
+RESPONSES = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'tests', 'responses',
+)
+
+ORDERS_NS = 'https://mws.amazonservices.com/Orders/2013-09-01'
+
+
+def load(path):
+    """
+    Returns the bytes of an example response.
+    """
+    with io.open(os.path.join(RESPONSES, path), 'rb') as f:
+        return f.read()
+
+
+def get_md5(content):
+    return base64.b64encode(hashlib.md5(content).digest()).decode('ascii')
+
+
+def orders_page(action='ListOrders', next_token=None, per_page=100):
+    """
+    Returns a page of `per_page` orders for `action` (ListOrders or
+    ListOrdersByNextToken), copied from the first order of
+    ``orders/list_orders.xml``.
+    """
+    source = etree.fromstring(load('orders/list_orders.xml'))
+    ns = {'o': ORDERS_NS}
+    template = source.find('.//o:Order', ns)
+
+    root = etree.Element(
+        '{%s}%sResponse' % (ORDERS_NS, action), nsmap={None: ORDERS_NS}
+    )
+    result = etree.SubElement(root, '{%s}%sResult' % (ORDERS_NS, action))
+    if next_token is not None:
+        etree.SubElement(result, '{%s}NextToken' % ORDERS_NS).text = \
+            next_token
+    orders = etree.SubElement(result, '{%s}Orders' % ORDERS_NS)
+    for index in range(per_page):
+        order = copy.deepcopy(template)
+        order.find('o:AmazonOrderId', ns).text = \
+            '111-0000000-{:07d}'.format(index)
+        orders.append(order)
+    result.append(copy.deepcopy(source.find('.//o:CreatedBefore', ns)))
+    metadata = etree.SubElement(root, '{%s}ResponseMetadata' % ORDERS_NS)
+    etree.SubElement(metadata, '{%s}RequestId' % ORDERS_NS).text = \
+        '7f00c14d-d49a-49a4-a378-84df1f209724'
+    return etree.tostring(root, xml_declaration=True, encoding='utf-8')
+
+
+def report_body(size):
+    """
+    Returns a tab separated report of about `size` bytes, repeating the
+    rows of ``reports/get_report_tab_separated.tsv``.
+    """
+    lines = load('reports/get_report_tab_separated.tsv').splitlines(True)
+    header, rows = lines[0], b''.join(lines[1:])
+    if not rows.endswith(b'\n'):
+        rows += b'\n'
+    count = max(1, (size - len(header)) // len(rows))
+    return header + rows * count
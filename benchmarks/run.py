@@ -0,0 +1,516 @@
+"""
+Run the benchmarks and write their results as JSON.
+
+Each benchmark reports its throughput and the peak memory allocated by
+Python while it runs (measured in a second run under tracemalloc, so
+that tracing does not slow down the timed run). Memory allocated by
+lxml is not seen by tracemalloc: the XML benchmarks report instead the
+growth of the maximum resident set size of a fresh process parsing the
+response.
+"""
+import argparse
+import asyncio
+import gc
+import multiprocessing
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from lxml import objectify
+import requests
+from requests.adapters import HTTPAdapter
+
+from pymws import MWS
+from pymws.aio import AsyncMWS
+from pymws.concurrency import map_concurrent
+from pymws.exceptions import MWSException
+from pymws.hooks import HistogramHook
+from pymws.signing import Signer
+from pymws.throttling import Quota, Throttle
+from pymws.utils import iter_xsv
+from pymws.xmlstream import RecordStream
+
+from . import fixtures
+from .server import FakeMWSServer
+
+try:
+    import resource
+except ImportError:
+    # Windows
+    resource = None
+
+MB = 1024 * 1024
+
+#: Size of the benchmarks, and of the quick run.
+CONFIGS = {
+    'full': {
+        'signatures': 20000,
+        'parse_pages': 50,
+        'large_response_orders': 5000,
+        'report_size': 32 * MB,
+        'requests': 1000,
+        'pages': 50,
+        'workers': 8,
+        'throttled_requests': 60,
+    },
+    'quick': {
+        'signatures': 2000,
+        'parse_pages': 5,
+        'large_response_orders': 1000,
+        'report_size': 4 * MB,
+        'requests': 100,
+        'pages': 5,
+        'workers': 4,
+        'throttled_requests': 20,
+    },
+}
+
+#: Quota the server and the client throttle apply in the throttled
+#: benchmark: a burst of 5 and a request every 50ms.
+THROTTLED_QUOTA = Quota(5, 0.05)
+
+
+def get_max_rss():
+    """
+    Returns the maximum resident set size of the process in bytes, or
+    None if it is not known.
+    """
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, kilobytes elsewhere
+    return max_rss if sys.platform == 'darwin' else max_rss * 1024
+
+
+def get_peak_rss():
+    """
+    Returns the peak resident set size of the process in bytes. On Linux
+    the peak of the process itself, the maximum resident set size of
+    getrusage being inherited from the parent of a new process.
+    """
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except (IOError, OSError):
+        pass
+    return get_max_rss()
+
+
+def reset_peak_rss():
+    """
+    Reset the peak resident set size to the current size, where the
+    system allows it (Linux).
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except (IOError, OSError):
+        pass
+
+
+def measure(func, trace=True):
+    """
+    Call `func` and return its result and duration, then call it again
+    under tracemalloc and return its peak memory allocation (None
+    without `trace`).
+    """
+    gc.collect()
+    start = time.perf_counter()
+    result = func()
+    duration = time.perf_counter() - start
+    if not trace:
+        return result, duration, None
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, duration, peak
+
+
+def make_client(server, workers=1, **kwargs):
+    session = requests.Session()
+    session.mount('http://', HTTPAdapter(
+        pool_connections=1, pool_maxsize=workers
+    ))
+    client = MWS(
+        'US', merchant_id='A1BENCHMARK', access_key_id='ACCESSKEY',
+        secret_key='SECRET', auth_token='amzn.mws.token', session=session,
+        **kwargs
+    )
+    return server.attach(client)
+
+
+def bench_signing(config, server):
+    signer = Signer(
+        'https://mws.amazonservices.com', 'ACCESSKEY', 'SECRET',
+        'A1BENCHMARK', 'amzn.mws.token',
+    )
+    params = {
+        'CreatedAfter': '2020-01-01T00:00:00',
+        'MarketplaceId.Id.1': 'ATVPDKIKX0DER',
+        'OrderStatus.Status.1': 'Unshipped',
+    }
+    count = config['signatures']
+
+    def run():
+        for _ in range(count):
+            signer.sign('GET', '/Orders/2013-09-01', signer.get_query_string(
+                'ListOrders', params, '2013-09-01'
+            ))
+
+    _, duration, peak = measure(run)
+    return {
+        'signatures_per_second': count / duration,
+        'microseconds_per_signature': duration / count * 1e6,
+        'peak_memory': peak,
+    }
+
+
+def parse_response(mode, body):
+    """
+    Parse an orders response with objectify or as a stream and return
+    the growth of the peak resident set size while parsing. Run in a
+    fresh process, so that memory freed by other benchmarks is not
+    reused.
+    """
+    gc.collect()
+    reset_peak_rss()
+    before = get_peak_rss()
+    if mode == 'objectify':
+        response = objectify.fromstring(body)
+        len(response.ListOrdersResult.Orders.Order)
+    else:
+        chunks = (body[i:i + 65536] for i in range(0, len(body), 65536))
+        for _ in RecordStream(chunks, 'Orders.Order'):
+            pass
+    return get_peak_rss() - before
+
+
+def measure_rss(mode, body):
+    if get_peak_rss() is None:
+        return None
+    with multiprocessing.get_context('spawn').Pool(1) as pool:
+        return pool.apply(parse_response, (mode, body))
+
+
+def bench_xml_parse(config, server):
+    page = fixtures.orders_page(next_token='page-2')
+    large = fixtures.orders_page(
+        next_token='page-2', per_page=config['large_response_orders']
+    )
+    count = config['parse_pages']
+
+    def objectified():
+        for _ in range(count):
+            response = objectify.fromstring(page)
+            len(response.ListOrdersResult.Orders.Order)
+
+    def streamed(**kwargs):
+        for _ in range(count):
+            chunks = (page[i:i + 65536] for i in range(0, len(page), 65536))
+            for _ in RecordStream(chunks, 'Orders.Order', **kwargs):
+                pass
+
+    _, objectify_duration, _ = measure(objectified, trace=False)
+    _, stream_duration, _ = measure(streamed, trace=False)
+    # Parsing only, the records are the elements
+    _, elements_duration, _ = measure(
+        lambda: streamed(convert=lambda element: element), trace=False
+    )
+    return {
+        'page_bytes': len(page),
+        'objectify_ms_per_page': objectify_duration / count * 1000,
+        'objectify_page_rss': measure_rss('objectify', page),
+        'stream_ms_per_page': stream_duration / count * 1000,
+        'stream_page_rss': measure_rss('stream', page),
+        'stream_elements_ms_per_page': elements_duration / count * 1000,
+        'large_response_bytes': len(large),
+        'objectify_large_response_rss': measure_rss('objectify', large),
+        'stream_large_response_rss': measure_rss('stream', large),
+    }
+
+
+def bench_report_parse(config, server):
+    body = fixtures.report_body(config['report_size'])
+
+    def run():
+        chunks = (body[i:i + 65536] for i in range(0, len(body), 65536))
+        rows = 0
+        for _ in iter_xsv(chunks, rows='tuple'):
+            rows += 1
+        return rows
+
+    rows, duration, peak = measure(run)
+    return {
+        'megabytes_per_second': len(body) / MB / duration,
+        'rows_per_second': rows / duration,
+        'peak_memory': peak,
+    }
+
+
+def bench_requests_sync(config, server):
+    client = make_client(server)
+    count = config['requests']
+
+    def run():
+        for _ in range(count):
+            client.orders.get_service_status()
+
+    _, duration, peak = measure(run)
+    return {
+        'requests_per_second': count / duration,
+        'peak_memory': peak,
+    }
+
+
+def bench_requests_concurrent(config, server):
+    workers = config['workers']
+    client = make_client(server, workers)
+    count = config['requests']
+
+    def run():
+        for _ in map_concurrent(
+                lambda _: client.orders.get_service_status(),
+                range(count), max_workers=workers):
+            pass
+
+    _, duration, peak = measure(run)
+    return {
+        'workers': workers,
+        'requests_per_second': count / duration,
+        'peak_memory': peak,
+    }
+
+
+def bench_requests_async(config, server):
+    workers = config['workers']
+    count = config['requests']
+
+    def make_async_client():
+        return server.attach(AsyncMWS(
+            'US', merchant_id='A1BENCHMARK', access_key_id='ACCESSKEY',
+            secret_key='SECRET', auth_token='amzn.mws.token',
+            max_concurrency=workers,
+        ))
+
+    try:
+        make_async_client()
+    except MWSException:
+        # aiohttp is not installed
+        return {}
+
+    async def requests():
+        async with make_async_client() as client:
+            await asyncio.gather(*(
+                client.orders.get_service_status() for _ in range(count)
+            ))
+
+    def run():
+        loop = asyncio.new_event_loop()
+        try:
+            loop.run_until_complete(requests())
+        finally:
+            loop.close()
+
+    _, duration, peak = measure(run)
+    return {
+        'max_concurrency': workers,
+        'requests_per_second': count / duration,
+        'peak_memory': peak,
+    }
+
+
+def bench_pagination(config, server):
+    client = make_client(server)
+
+    def run(prefetch):
+        return sum(1 for _ in client.orders.iter_orders(prefetch=prefetch))
+
+    orders, duration, peak = measure(lambda: run(0))
+    _, prefetch_duration, prefetch_peak = measure(lambda: run(2))
+    pages = config['pages']
+    return {
+        'orders': orders,
+        'pages_per_second': pages / duration,
+        'peak_memory': peak,
+        'prefetch_pages_per_second': pages / prefetch_duration,
+        'prefetch_peak_memory': prefetch_peak,
+    }
+
+
+def bench_report_download(config, server):
+    client = make_client(server)
+
+    def run():
+        rows = 0
+        for _ in client.reports.iter_report(123456789, rows='tuple'):
+            rows += 1
+        return rows
+
+    rows, duration, peak = measure(run)
+    return {
+        'megabytes_per_second': config['report_size'] / MB / duration,
+        'rows_per_second': rows / duration,
+        'peak_memory': peak,
+    }
+
+
+def bench_throttled(config, server):
+    workers = config['workers']
+    count = config['throttled_requests']
+    results = {}
+    for mode, throttle in (
+            ('throttle', Throttle(
+                quotas={'GetServiceStatus': THROTTLED_QUOTA})),
+            ('no_throttle', None)):
+        histograms = HistogramHook()
+        client = make_client(
+            server, workers, throttle=throttle, hooks=[histograms]
+        )
+        completed = []
+
+        def call(_):
+            try:
+                client.orders.get_service_status()
+                completed.append(1)
+            except Exception:
+                pass
+
+        start = time.perf_counter()
+        for _ in map_concurrent(call, range(count), max_workers=workers):
+            pass
+        duration = time.perf_counter() - start
+        summary = histograms.get_summary('GetServiceStatus')
+        results[mode + '_requests_per_second'] = len(completed) / duration
+        results[mode + '_throttled_responses'] = summary['errors']
+    return results
+
+
+#: The benchmarks, in the order they run.
+BENCHMARKS = [
+    ('signing', bench_signing),
+    ('xml_parse', bench_xml_parse),
+    ('report_parse', bench_report_parse),
+    ('requests_sync', bench_requests_sync),
+    ('requests_concurrent', bench_requests_concurrent),
+    ('requests_async', bench_requests_async),
+    ('pagination', bench_pagination),
+    ('report_download', bench_report_download),
+    ('throttled', bench_throttled),
+]
+
+
+def get_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'], stderr=subprocess.DEVNULL,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).decode('ascii').strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(config, only=None, latency=0.0, log=sys.stderr):
+    results = {}
+    server = FakeMWSServer(
+        latency=latency, pages=config['pages'],
+        report_size=config['report_size'],
+    )
+    throttled_server = FakeMWSServer(
+        latency=latency, pages=1, report_size=0,
+        quotas={'GetServiceStatus': THROTTLED_QUOTA},
+    )
+    with server, throttled_server:
+        for name, benchmark in BENCHMARKS:
+            if only and name not in only:
+                continue
+            log.write('{}...\n'.format(name))
+            results[name] = benchmark(
+                config,
+                throttled_server if name == 'throttled' else server,
+            )
+    return results
+
+
+def compare(baseline, current):
+    """
+    Returns the lines of a table comparing the results of two runs.
+    """
+    lines = ['{:<22} {:<34} {:>14} {:>14} {:>8}'.format(
+        'benchmark', 'metric', 'baseline', 'current', 'change'
+    )]
+    for name, metrics in current['results'].items():
+        base_metrics = baseline['results'].get(name, {})
+        for metric, value in metrics.items():
+            base = base_metrics.get(metric)
+            change = ''
+            if base:
+                change = '{:+.1f}%'.format((value - base) / base * 100)
+            lines.append('{:<22} {:<34} {:>14} {:>14} {:>8}'.format(
+                name, metric, format_value(base), format_value(value),
+                change,
+            ))
+    return lines
+
+
+def format_value(value):
+    if value is None:
+        return '-'
+    if isinstance(value, float):
+        return '{:.2f}'.format(value)
+    return str(value)
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks', description=__doc__,
+    )
+    parser.add_argument(
+        '--quick', action='store_true', help='run smaller benchmarks'
+    )
+    parser.add_argument(
+        '--only', action='append', choices=[name for name, _ in BENCHMARKS],
+        help='run only this benchmark (can be repeated)',
+    )
+    parser.add_argument(
+        '--latency', type=float, default=0.0,
+        help='seconds the server waits before answering',
+    )
+    parser.add_argument('--output', help='write the results to this file')
+    parser.add_argument(
+        '--compare', help='compare the results with a previous output'
+    )
+    args = parser.parse_args(args)
+
+    config = CONFIGS['quick' if args.quick else 'full']
+    output = {
+        'meta': {
+            'commit': get_commit(),
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'config': dict(config, latency=args.latency),
+        },
+        'results': run(config, args.only, args.latency),
+    }
+    output['meta']['max_rss'] = get_max_rss()
+    text = json.dumps(output, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print('\n'.join(compare(baseline, output)))
+    elif not args.output:
+        print(text)
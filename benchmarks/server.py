@@ -0,0 +1,195 @@
+"""
+A local stand-in for MWS.
+
+The server runs in a separate process, so that it does not compete with
+the benchmarked client for the GIL, and answers:
+
+* GetServiceStatus with ``orders/get_service_status.xml``,
+* ListOrders and ListOrdersByNextToken with pages of 100 orders, the
+  last of `pages` pages having no NextToken,
+* GetReport with a tab separated report of `report_size` bytes and its
+  Content-MD5,
+
+after `latency` seconds. Operations listed in `quotas` are throttled
+like MWS does, answering ``503 RequestThrottled`` once their bucket is
+empty.
+
+.. code-block:: python
+
+    with FakeMWSServer(latency=0.01, pages=5) as server:
+        client = MWS('US', merchant_id='A1', ...)
+        server.attach(client)
+        list(client.orders.iter_orders())
+"""
+import multiprocessing
+import time
+
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from threading import Lock
+from urllib.parse import parse_qs, urlparse
+
+from pymws.throttling import TokenBucket
+
+from . import fixtures
+
+
+class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class FakeMWSHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are written separately, without this the body
+    # waits for the delayed ACK of the headers.
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.handle_action()
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        self.rfile.read(length)
+        self.handle_action()
+
+    def handle_action(self):
+        server = self.server
+        params = dict(
+            (key, values[0])
+            for key, values in parse_qs(urlparse(self.path).query).items()
+        )
+        action = params.get('Action')
+        if server.latency:
+            time.sleep(server.latency)
+        if server.is_throttled(params.get('SellerId'), action):
+            return self.respond(
+                503, server.bodies['throttled'], 'text/xml'
+            )
+        if action == 'GetServiceStatus':
+            return self.respond(200, server.bodies['status'], 'text/xml')
+        if action == 'ListOrders':
+            return self.respond(200, server.get_page(action, 1), 'text/xml')
+        if action == 'ListOrdersByNextToken':
+            page = int(params.get('NextToken', 'page-1').split('-')[1])
+            return self.respond(200, server.get_page(action, page), 'text/xml')
+        if action == 'GetReport':
+            return self.respond(
+                200, server.bodies['report'], 'text/plain;charset=Cp1252',
+                {'Content-MD5': server.report_md5},
+            )
+        self.respond(400, server.bodies['error'], 'text/xml')
+
+    def respond(self, status, body, content_type, headers=None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        view = memoryview(body)
+        for start in range(0, len(body), 65536):
+            self.wfile.write(view[start:start + 65536])
+
+
+class FakeMWSHTTPServer(ThreadingHTTPServer):
+
+    def __init__(self, address, latency=0.0, quotas=None, pages=10,
+                 report_size=16 * 1024 * 1024):
+        ThreadingHTTPServer.__init__(self, address, FakeMWSHandler)
+        self.latency = latency
+        self.quotas = quotas or {}
+        self.pages = pages
+        self._buckets = {}
+        self._lock = Lock()
+        report = fixtures.report_body(report_size)
+        self.report_md5 = fixtures.get_md5(report)
+        self.bodies = {
+            'status': fixtures.load('orders/get_service_status.xml'),
+            'throttled': fixtures.load('503.xml'),
+            'error': b'<ErrorResponse/>',
+            'report': report,
+        }
+        for action in ('ListOrders', 'ListOrdersByNextToken'):
+            self.bodies[action] = fixtures.orders_page(action)
+            self.bodies[action, 'next'] = fixtures.orders_page(
+                action, next_token='{next_token}'
+            )
+
+    def get_page(self, action, page):
+        if page >= self.pages:
+            return self.bodies[action]
+        return self.bodies[action, 'next'].replace(
+            b'{next_token}', 'page-{}'.format(page + 1).encode('ascii')
+        )
+
+    def is_throttled(self, seller_id, action):
+        quota = self.quotas.get(action)
+        if quota is None:
+            return False
+        with self._lock:
+            now = time.monotonic()
+            bucket = self._buckets.get((seller_id, action))
+            if bucket is None:
+                bucket = self._buckets[seller_id, action] = TokenBucket(
+                    quota.max_burst, quota.restore_rate, now
+                )
+            if not bucket.available(now):
+                return True
+            bucket.reserve(now)
+            return False
+
+
+def serve(options, ready):
+    server = FakeMWSHTTPServer(('127.0.0.1', 0), **options)
+    ready.put(server.server_address[1])
+    server.serve_forever()
+
+
+class FakeMWSServer(object):
+    """
+    Runs a :class:`FakeMWSHTTPServer` in a child process.
+
+    :param latency: Seconds the server waits before answering.
+    :param quotas: Dictionary of operation to
+                   :class:`pymws.throttling.Quota` throttled by the
+                   server.
+    :param pages: Number of pages of orders.
+    :param report_size: Size in bytes of the report.
+    """
+
+    def __init__(self, **options):
+        self.options = options
+        self.process = None
+        self.url = None
+
+    def start(self):
+        ready = multiprocessing.Queue()
+        self.process = multiprocessing.Process(
+            target=serve, args=(self.options, ready)
+        )
+        self.process.daemon = True
+        self.process.start()
+        self.url = 'http://127.0.0.1:{}'.format(ready.get(timeout=30))
+        return self
+
+    def stop(self):
+        if self.process is not None:
+            self.process.terminate()
+            self.process.join()
+            self.process = None
+
+    def attach(self, client):
+        """
+        Send the requests of a client to this server.
+        """
+        client.marketplace = client.marketplace._replace(endpoint=self.url)
+        return client
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
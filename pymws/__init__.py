@@ -5,4 +5,5 @@ __email__ = 'help@fulfil.io'
 __version__ = '0.2.0'
 
 from .pymws import MWS              # noqa
+from .aio import AsyncMWS           # noqa
 from .exceptions import MWSError    # noqa
@@ -0,0 +1,256 @@
+"""
+asyncio client for Amazon MWS.
+
+:class:`AsyncMWS` exposes the same API clients as :class:`pymws.MWS`,
+but every operation returns an awaitable. Requests are signed and
+responses parsed by the same code as the synchronous client, only the
+transport is replaced by `aiohttp <https://docs.aiohttp.org>`_, which
+has to be installed separately (``pip install pymws[async]``).
+
+.. code-block:: python
+
+    async def fetch_orders(credentials, start_date):
+        async with AsyncMWS('US', **credentials) as client:
+            response = await client.orders.list_orders(
+                CreatedAfter=start_date
+            )
+            return response.Orders.getchildren()
+
+The number of requests in flight at any moment is bounded by
+`max_concurrency`. A session (and its connection pool) can be shared by
+many clients, so that one event loop can drive the calls of hundreds
+of sellers at once.
+
+Helpers that page through results on their own, like
+:meth:`pymws.fulfillment.inbound_shipment.InboundShipment.list_all_inbound_shipments`,
+the paginators and ``iter_*`` helpers (see :mod:`pymws.pagination`),
+and streaming downloads like :meth:`pymws.reports.Reports.stream_report`
+are synchronous and are not available on the asyncio client: they raise
+:class:`pymws.exceptions.MWSException`. So does
+:attr:`pymws.MWS.last_retry_stats`, which is per thread.
+"""  # noqa: E501
+import asyncio
+
+from .cache import CachedResponse
+from .exceptions import MWSException
+from .pymws import MWS, RequestAttempts
+
+try:
+    import aiohttp
+    from yarl import URL
+except ImportError:
+    aiohttp = None
+
+
+class AsyncResponse(object):
+    """
+    A fully read aiohttp response with the interface of a
+    :class:`requests.Response` that the response handling of
+    :class:`pymws.MWS` relies on.
+    """
+    __slots__ = ('status_code', 'headers', 'content', 'encoding')
+
+    def __init__(self, status_code, headers, content, encoding=None):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.encoding = encoding
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding or 'utf-8', 'replace')
+
+
+class AsyncMWS(MWS):
+    """
+    asyncio version of :class:`pymws.MWS`.
+
+    Accepts the same arguments as :class:`pymws.MWS` and:
+
+    :param max_concurrency: Maximum number of requests of this client
+                            in flight at once.
+    :param session: An optional :class:`aiohttp.ClientSession` shared
+                    with other clients. The client creates (and closes)
+                    its own session if none is given.
+    """
+
+    def __init__(self, *args, **kwargs):
+        if aiohttp is None:
+            raise MWSException(
+                'aiohttp is required for the asyncio client. '
+                'Install it with: pip install pymws[async]'
+            )
+        max_concurrency = kwargs.pop('max_concurrency', 100)
+        session = kwargs.pop('session', None)
+        super(AsyncMWS, self).__init__(*args, **kwargs)
+        self.max_concurrency = max_concurrency
+        self.session = session
+        self._owns_session = session is None
+        self._semaphore = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def close(self):
+        """
+        Close the session if it was created by this client.
+        """
+        if self._owns_session and self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    def _get_session(self):
+        if self.session is None:
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_concurrency)
+            )
+        return self.session
+
+    def _get_semaphore(self):
+        # Created lazily so that it belongs to the running loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    def stream(self, action, uri, req_params, version, chunk_size=65536):
+        raise MWSException(
+            'Responses of the asyncio client cannot be streamed, '
+            'streaming helpers only work with the synchronous client'
+        )
+
+    def fetch_stored(self, action, uri, req_params, version,
+                     chunk_size=65536):
+        raise MWSException(
+            'Responses of the asyncio client cannot be streamed, '
+            'streaming helpers only work with the synchronous client'
+        )
+
+    async def _request(self, http_verb, action, uri, req_params, version,
+                       body=None, content_type=None, close_body=False):
+        """
+        Build a request, parse the response and handle errors
+        """
+        try:
+            response = await self._send(
+                action,
+                lambda: self._build_request(
+                    http_verb, action, uri, req_params, version,
+                    body, content_type
+                ).prepare(),
+            )
+        finally:
+            if close_body:
+                body.close()
+        return self._parse_response(action, response)
+
+    async def _stored_get(self, action, uri, req_params, version):
+        """
+        Make a GET request unless its result is in the store.
+        """
+        key = self.store.get_key(action, req_params)
+        result = self.store.get(action, key)
+        if result is None:
+            response = await self._send(
+                action,
+                lambda: self._build_request(
+                    'GET', action, uri, req_params, version
+                ).prepare(),
+            )
+            result = self.store.put(
+                action, key, [response.content],
+                content_type=response.headers.get('content-type'),
+                encoding=response.encoding,
+                expected_md5=response.headers.get('Content-MD5'),
+            )
+        return self._parse_response(action, CachedResponse(
+            result.content_type or '', self.store.read(result),
+            result.encoding,
+        ))
+
+    async def _cached_get(self, action, uri, req_params, version):
+        """
+        Make a GET request unless its response is in the cache.
+        """
+        key = self._get_cache_key(action, uri, req_params, version)
+        response = self.cache.get(key)
+        if response is None:
+            response = await self._send(
+                action,
+                lambda: self._build_request(
+                    'GET', action, uri, req_params, version
+                ).prepare(),
+            )
+            self.cache.set(key, action, response)
+        return self._parse_response(action, response)
+
+    async def _send(self, action, prepare):
+        """
+        asyncio version of :meth:`pymws.MWS._send`.
+        """
+        attempts = RequestAttempts(self, action, prepare)
+        try:
+            while True:
+                attempts.start()
+                if self.throttle is not None:
+                    delay = self.throttle.reserve(
+                        self.merchant_id, self.marketplace.endpoint, action
+                    )
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                prepared = attempts.sign()
+                try:
+                    response = await self._send_prepared(prepared)
+                    attempts.check(response)
+                except Exception as error:
+                    delay = attempts.failed(error)
+                    if delay is None:
+                        raise
+                    await asyncio.sleep(delay)
+                else:
+                    attempts.succeeded()
+                    return response
+        finally:
+            attempts.record()
+
+    def _record_retry_stats(self, stats):
+        if self.retry is not None:
+            self.retry.record(stats)
+
+    @property
+    def last_retry_stats(self):
+        """
+        Not available on the asyncio client, where the requests of many
+        coroutines are made by the same thread. Use the totals of the
+        retry policy (:attr:`pymws.retry.RetryPolicy.stats`) or the
+        `attempt` of the events of a hook instead.
+        """
+        raise MWSException(
+            'last_retry_stats is not available on the asyncio client'
+        )
+
+    def _should_retry(self, error, attempt):
+        if self.retry is None:
+            return False
+        if isinstance(
+                error, (aiohttp.ClientConnectionError, asyncio.TimeoutError)):
+            return self.retry.retry_connection_errors and \
+                attempt < self.retry.max_attempts
+        return self.retry.should_retry(error, attempt)
+
+    async def _send_prepared(self, prepared):
+        async with self._get_semaphore():
+            async with self._get_session().request(
+                    prepared.method,
+                    # Already quoted the way MWS signed it
+                    URL(prepared.url, encoded=True),
+                    data=prepared.body,
+                    headers=prepared.headers) as response:
+                return AsyncResponse(
+                    response.status,
+                    response.headers,
+                    await response.read(),
+                    response.charset,
+                )
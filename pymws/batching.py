@@ -0,0 +1,227 @@
+"""
+Coalescing of frequent updates into few feeds.
+
+Submitting a feed for every inventory or price change quickly runs out
+of the SubmitFeed quota, which allows a feed every two minutes once the
+burst is used. A :class:`FeedBatcher` collects the updates, keeps only
+the last update of each SKU, and submits everything collected as a
+single feed.
+
+.. code-block:: python
+
+    batcher = FeedBatcher(
+        client,
+        XMLFeedBuilder(
+            '_POST_INVENTORY_AVAILABILITY_DATA_', merchant_id='1234'
+        ),
+        window=60,
+    )
+    with batcher:
+        for sku, quantity in warehouse.stock_changes():
+            batcher.put({'SKU': sku, 'Quantity': quantity})
+
+A feed is submitted when the oldest pending update has waited `window`
+seconds, when `max_records` SKUs are pending, or, with a throttle,
+as soon as the SubmitFeed quota has a request available and the updates
+have waited at least `min_window` seconds. Updates keep being collected
+while a feed is submitted.
+"""
+from collections import OrderedDict
+import threading
+import time
+
+
+class FeedBatcher(object):
+    """
+    Collect records, keep the last record of each key and submit them
+    in feeds written by `builder` (see :mod:`pymws.builders`).
+
+    :param client: The :class:`pymws.MWS` client submitting the feeds.
+    :param builder: The feed builder of the records.
+    :param key: Name of the field identifying the records, or a
+                function returning the key of a record.
+    :param window: Maximum number of seconds an update waits before
+                   being submitted.
+    :param min_window: Minimum number of seconds an update waits before
+                       being submitted when the quota allows it.
+    :param max_records: Number of pending records that triggers a
+                        submission.
+    :param throttle: :class:`pymws.throttling.Throttle` telling whether
+                     the SubmitFeed quota has a request available.
+                     Defaults to the throttle of the client.
+    :param on_submit: Function called with the response of each
+                      submission and the number of records in its feed.
+    :param poll_interval: Seconds between two checks of the background
+                          thread started by :meth:`start`.
+    """
+
+    def __init__(self, client, builder, key='SKU', window=60.0,
+                 min_window=5.0, max_records=10000, throttle=None,
+                 on_submit=None, poll_interval=1.0, clock=time.monotonic):
+        self.client = client
+        self.builder = builder
+        if callable(key):
+            self.get_key = key
+        else:
+            self.get_key = lambda record: record[key]
+        self.window = window
+        self.min_window = min_window
+        self.max_records = max_records
+        self.throttle = throttle if throttle is not None else \
+            client.throttle
+        self.on_submit = on_submit
+        self.poll_interval = poll_interval
+        self.clock = clock
+        self.submitted = 0
+        self.error = None
+        self._pending = OrderedDict()
+        self._first_put = None
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __len__(self):
+        return len(self._pending)
+
+    def put(self, record):
+        """
+        Add a record, replacing the pending record with the same key.
+        """
+        self._raise_error()
+        with self._lock:
+            key = self.get_key(record)
+            self._pending.pop(key, None)
+            self._pending[key] = record
+            if self._first_put is None:
+                self._first_put = self.clock()
+            full = len(self._pending) >= self.max_records
+        if full and self._thread is None:
+            self.flush()
+
+    def is_due(self):
+        """
+        Returns True if the pending records should be submitted now.
+        """
+        with self._lock:
+            if not self._pending:
+                return False
+            if len(self._pending) >= self.max_records:
+                return True
+            waited = self.clock() - self._first_put
+        if waited >= self.window:
+            return True
+        return waited >= self.min_window and self.throttle is not None and \
+            self.throttle.available(
+                self.client.merchant_id, self.client.marketplace.endpoint,
+                'SubmitFeed'
+            )
+
+    def maybe_flush(self):
+        """
+        Submit the pending records if they are due. Returns the
+        responses of the submissions.
+        """
+        if self.is_due():
+            return self.flush()
+        return []
+
+    def flush(self):
+        """
+        Submit all the pending records and return the responses of the
+        submissions (more than one if the builder splits the feed).
+
+        If a submission fails, the records of its feed and of the feeds
+        that were not submitted yet are pending again, unless they were
+        replaced in the meantime, and the error is raised. The feeds
+        submitted before it are not submitted again.
+        """
+        with self._flush_lock:
+            with self._lock:
+                records, self._pending = self._pending, OrderedDict()
+                self._first_put = None
+            if not records:
+                return []
+            items = list(records.items())
+            responses = []
+            offset = 0
+            try:
+                for feed, count in self.builder.build_counted(
+                        record for _, record in items):
+                    response = self.client.feeds.submit_feed(
+                        feed, self.builder.FeedType
+                    )
+                    offset += count
+                    self.submitted += count
+                    responses.append(response)
+                    if self.on_submit is not None:
+                        self.on_submit(response, count)
+            except Exception:
+                self._requeue(items[offset:])
+                raise
+            return responses
+
+    def _requeue(self, items):
+        with self._lock:
+            for key, record in items:
+                if key not in self._pending:
+                    self._pending[key] = record
+            if self._pending and self._first_put is None:
+                self._first_put = self.clock()
+
+    def start(self):
+        """
+        Submit the records from a background thread as they are due.
+        A failed submission does not stop the thread, the records are
+        submitted again when they are due and the error is raised by
+        the next :meth:`put` or by :meth:`close`.
+        """
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.maybe_flush()
+            except Exception as error:
+                # The records are pending again
+                self.error = error
+
+    def stop(self):
+        """
+        Stop the background thread without submitting the pending
+        records.
+        """
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def close(self):
+        """
+        Stop the background thread and submit the pending records.
+        """
+        self.stop()
+        self._raise_error()
+        return self.flush()
+
+    def _raise_error(self):
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            # Do not submit a feed, nor hide the error, the records
+            # stay pending
+            self.stop()
+            return
+        self.close()
@@ -0,0 +1,269 @@
+"""
+Builders writing feeds from records.
+
+Instead of rendering a whole feed into a string, a builder writes the
+feed for an iterable of records incrementally to a temporary file, and
+starts a new feed when the current one reaches `max_messages` or
+`max_bytes`. Each feed is yielded as a binary file that can be passed
+to :meth:`pymws.feeds.Feeds.submit_feed` as is, so even feeds for
+millions of SKUs are built and uploaded in constant memory.
+
+.. code-block:: python
+
+    builder = XMLFeedBuilder(
+        '_POST_INVENTORY_AVAILABILITY_DATA_', merchant_id='1234',
+    )
+    records = (
+        {'SKU': sku, 'Quantity': quantity}
+        for sku, quantity in warehouse.stock_levels()
+    )
+    for response in client.feeds.submit_records(builder, records):
+        print(response.FeedSubmissionInfo.FeedSubmissionId)
+
+XML records are dictionaries converted into the elements of the
+message: nested dictionaries become child elements, lists become
+repeated elements, keys starting with ``@`` become attributes and
+``#text`` is the text of an element with attributes::
+
+    {
+        'SKU': 'ABC-123',
+        'StandardPrice': {'@currency': 'USD', '#text': Decimal('9.99')},
+    }
+
+Flat file records are dictionaries keyed by the columns of the
+template (see :class:`FlatFileFeedBuilder`).
+"""
+from datetime import date, datetime
+from decimal import Decimal
+import tempfile
+
+from lxml import etree
+
+from .exceptions import MWSException
+
+
+#: The message type of the XML feed types.
+MESSAGE_TYPES = {
+    '_POST_PRODUCT_DATA_': 'Product',
+    '_POST_INVENTORY_AVAILABILITY_DATA_': 'Inventory',
+    '_POST_PRODUCT_PRICING_DATA_': 'Price',
+    '_POST_PRODUCT_OVERRIDES_DATA_': 'Override',
+    '_POST_PRODUCT_IMAGE_DATA_': 'ProductImage',
+    '_POST_PRODUCT_RELATIONSHIP_DATA_': 'Relationship',
+    '_POST_ORDER_ACKNOWLEDGEMENT_DATA_': 'OrderAcknowledgement',
+    '_POST_ORDER_FULFILLMENT_DATA_': 'OrderFulfillment',
+    '_POST_PAYMENT_ADJUSTMENT_DATA_': 'OrderAdjustment',
+    '_POST_FULFILLMENT_ORDER_REQUEST_DATA_': 'FulfillmentOrderRequest',
+}
+
+#: Size above which a feed is split, with a wide margin below the
+#: size MWS accepts.
+DEFAULT_MAX_BYTES = 100 * 1024 * 1024
+
+XSI = 'http://www.w3.org/2001/XMLSchema-instance'
+
+
+def to_text(value):
+    """
+    Returns the text of a value in a feed.
+    """
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return '{:f}'.format(value)
+    return u'{}'.format(value)
+
+
+def to_element(tag, value):
+    """
+    Convert a record value into an element named `tag`.
+    """
+    element = etree.Element(tag)
+    if isinstance(value, dict):
+        for key, child in value.items():
+            if key.startswith('@'):
+                element.set(key[1:], to_text(child))
+            elif key == '#text':
+                element.text = to_text(child)
+            elif isinstance(child, (list, tuple)):
+                for item in child:
+                    element.append(to_element(key, item))
+            elif child is not None:
+                element.append(to_element(key, child))
+    elif value is not None:
+        element.text = to_text(value)
+    return element
+
+
+class FeedBuilder(object):
+    """
+    Base class of the builders.
+
+    :param max_messages: Maximum number of records in a feed. No limit
+                         if None.
+    :param max_bytes: Size after which a feed is complete. A feed may
+                      go over it by the size of one record.
+    """
+
+    def __init__(self, FeedType, max_messages=None,
+                 max_bytes=DEFAULT_MAX_BYTES):
+        self.FeedType = FeedType
+        self.max_messages = max_messages
+        self.max_bytes = max_bytes
+
+    def build(self, records):
+        """
+        Write the records into as many feeds as needed and yield each
+        feed as a binary temporary file positioned at its start. A feed
+        must be consumed before the next one is written, and its file
+        is closed once the next one is asked for.
+        """
+        for f, _ in self.build_counted(records):
+            yield f
+
+    def build_counted(self, records):
+        """
+        Like :meth:`build`, but yield ``(feed, count)`` tuples, `count`
+        being the number of records written in the feed.
+        """
+        records = iter(records)
+        try:
+            record = next(records)
+        except StopIteration:
+            return
+        while record is not None:
+            f = tempfile.TemporaryFile()
+            try:
+                record, count = self._write_feed(f, record, records)
+                f.seek(0)
+                yield f, count
+            finally:
+                f.close()
+
+    def is_full(self, f, count):
+        return (
+            (self.max_messages is not None and
+             count >= self.max_messages) or
+            (self.max_bytes is not None and f.tell() >= self.max_bytes)
+        )
+
+    def _write_feed(self, f, record, records):
+        """
+        Write a feed starting with `record` and taking records from
+        `records` until the feed is full. Returns the first record of
+        the next feed, or None if there are no more records, and the
+        number of records written.
+        """
+        raise NotImplementedError
+
+
+class XMLFeedBuilder(FeedBuilder):
+    """
+    Builds XML feeds in an AmazonEnvelope, one message per record.
+
+    :param merchant_id: The merchant identifier of the envelope header.
+    :param message_type: The MessageType of the feed, looked up in
+                         :data:`MESSAGE_TYPES` if not given.
+    :param operation_type: The OperationType of the messages (Update,
+                           PartialUpdate or Delete). Not written if
+                           None.
+    :param purge_and_replace: Write a PurgeAndReplace element.
+    """
+
+    def __init__(self, FeedType, merchant_id, message_type=None,
+                 operation_type='Update', purge_and_replace=None,
+                 document_version='1.01', **kwargs):
+        super(XMLFeedBuilder, self).__init__(FeedType, **kwargs)
+        if message_type is None:
+            message_type = MESSAGE_TYPES.get(FeedType)
+            if message_type is None:
+                raise MWSException(
+                    'The message type of {} is not known'.format(FeedType)
+                )
+        self.merchant_id = merchant_id
+        self.message_type = message_type
+        self.operation_type = operation_type
+        self.purge_and_replace = purge_and_replace
+        self.document_version = document_version
+
+    def _write_feed(self, f, record, records):
+        count = 0
+        with etree.xmlfile(f, encoding='utf-8', buffered=False) as xf:
+            xf.write_declaration()
+            schema_location = '{%s}noNamespaceSchemaLocation' % XSI
+            with xf.element(
+                    'AmazonEnvelope',
+                    {schema_location: 'amzn-envelope.xsd'},
+                    nsmap={'xsi': XSI}):
+                xf.write(to_element('Header', {
+                    'DocumentVersion': self.document_version,
+                    'MerchantIdentifier': self.merchant_id,
+                }))
+                xf.write(to_element('MessageType', self.message_type))
+                if self.purge_and_replace is not None:
+                    xf.write(to_element(
+                        'PurgeAndReplace', self.purge_and_replace
+                    ))
+                while record is not None:
+                    count += 1
+                    xf.write(self.get_message(count, record))
+                    record = next(records, None)
+                    if self.is_full(f, count):
+                        break
+        return record, count
+
+    def get_message(self, message_id, record):
+        """
+        Returns the Message element of a record.
+        """
+        message = etree.Element('Message')
+        message.append(to_element('MessageID', message_id))
+        if self.operation_type is not None:
+            message.append(to_element('OperationType', self.operation_type))
+        message.append(to_element(self.message_type, record))
+        return message
+
+
+class FlatFileFeedBuilder(FeedBuilder):
+    """
+    Builds tab separated flat file feeds encoded in ISO-8859-1, one row
+    per record.
+
+    :param fieldnames: The columns of the feed, in order. Missing
+                       values are left empty.
+    :param header_lines: Lines written before the columns in each feed,
+                         like the TemplateType line of inventory
+                         templates.
+    """
+
+    def __init__(self, FeedType, fieldnames, header_lines=(), **kwargs):
+        super(FlatFileFeedBuilder, self).__init__(FeedType, **kwargs)
+        self.fieldnames = fieldnames
+        self.header_lines = header_lines
+
+    def _write_line(self, f, values):
+        for value in values:
+            if '\t' in value or '\n' in value or '\r' in value:
+                raise MWSException(
+                    'Flat file values cannot contain tabs or line '
+                    'breaks: {!r}'.format(value)
+                )
+        f.write(('\t'.join(values) + '\n').encode('iso-8859-1'))
+
+    def _write_feed(self, f, record, records):
+        for line in self.header_lines:
+            f.write((line + '\n').encode('iso-8859-1'))
+        self._write_line(f, self.fieldnames)
+        count = 0
+        while record is not None:
+            count += 1
+            self._write_line(f, [
+                '' if record.get(name) is None else to_text(record[name])
+                for name in self.fieldnames
+            ])
+            record = next(records, None)
+            if self.is_full(f, count):
+                break
+        return record, count
@@ -0,0 +1,306 @@
+"""
+Caching of idempotent read operations.
+
+Some operations are called over and over with the same parameters,
+while their result changes rarely or, like the content of a report or
+the result of a processed feed, never. A :class:`ResponseCache` given
+to the client answers repeated calls of those operations without a
+round trip to MWS, and so without using any quota.
+
+.. code-block:: python
+
+    client = MWS(
+        'US', merchant_id='1234', access_key_id='key',
+        secret_key='secret', cache=ResponseCache(MemoryBackend()),
+    )
+    client.reports.get_report(report_id)   # Sent to MWS
+    client.reports.get_report(report_id)   # Read from the cache
+
+Only the operations listed in the `ttls` of the cache are cached, for
+the number of seconds given. Responses are cached raw and parsed again
+on every hit, so that callers never share a parsed tree.
+
+Entries are kept in a backend: :class:`MemoryBackend` keeps the most
+recently used entries in the process, :class:`DiskBackend` keeps them
+in files so that they survive restarts and can be shared by processes.
+"""
+from collections import OrderedDict, namedtuple
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+from .signing import build_query_string
+
+
+#: Seconds the responses of an operation are cached for by default.
+#: Reports and feed processing results never change once available.
+DEFAULT_TTLS = {
+    'GetServiceStatus': 60,
+    'GetOrder': 60,
+    'GetReportCount': 60,
+    'GetReportRequestCount': 60,
+    'GetFeedSubmissionCount': 60,
+    'GetReport': 24 * 3600,
+    'GetFeedSubmissionResult': 24 * 3600,
+}
+
+#: Parameters that change with every request and are not part of the
+#: cache keys.
+VOLATILE_PARAMS = ('Timestamp', 'Signature')
+
+CacheEntry = namedtuple(
+    'CacheEntry', ['expires', 'content_type', 'encoding', 'content']
+)
+
+
+def get_cache_key(seller_id, endpoint, uri, version, action, params):
+    """
+    Returns the cache key of a call: a hash of the seller, the endpoint
+    and the canonical (sorted and quoted) parameters of the call.
+    """
+    params = dict(
+        (key, value) for key, value in params.items()
+        if key not in VOLATILE_PARAMS
+    )
+    params['Action'] = action
+    params['Version'] = version
+    key = '\n'.join([
+        seller_id or '', endpoint, uri, build_query_string(params)
+    ])
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+class CachedResponse(object):
+    """
+    A cached response with the interface of a :class:`requests.Response`
+    that the response handling of :class:`pymws.MWS` relies on.
+    """
+    __slots__ = ('status_code', 'headers', 'content', 'encoding')
+
+    def __init__(self, content_type, content, encoding=None):
+        self.status_code = 200
+        self.headers = {'content-type': content_type}
+        self.content = content
+        self.encoding = encoding
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding or 'utf-8', 'replace')
+
+
+class MemoryBackend(object):
+    """
+    Keeps the entries in memory and evicts the least recently used
+    ones.
+
+    :param max_entries: Maximum number of entries. No limit if None.
+    :param max_bytes: Maximum total size of the cached contents. No
+                      limit if None.
+    """
+
+    def __init__(self, max_entries=1000, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, entry):
+        with self._lock:
+            self._pop(key)
+            self._entries[key] = entry
+            self.size += len(entry.content)
+            while self._entries and (
+                    (self.max_entries is not None and
+                     len(self._entries) > self.max_entries) or
+                    (self.max_bytes is not None and
+                     self.size > self.max_bytes)):
+                self._pop(next(iter(self._entries)))
+
+    def delete(self, key):
+        with self._lock:
+            self._pop(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def _pop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= len(entry.content)
+
+
+class DiskBackend(object):
+    """
+    Keeps each entry in a file of `directory`. Files are written
+    atomically, so the same directory can be used by many processes.
+
+    :param max_bytes: Maximum total size of the files. The least
+                      recently used files are removed when it is
+                      exceeded. No limit if None.
+    """
+
+    def __init__(self, directory, max_bytes=None):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        self.size = sum(os.path.getsize(path) for path in self._paths())
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key)
+
+    def _paths(self):
+        return [
+            os.path.join(self.directory, name)
+            for name in os.listdir(self.directory)
+            if not name.startswith('.')
+        ]
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                header = json.loads(f.readline().decode('utf-8'))
+                content = f.read()
+        except (IOError, OSError, ValueError):
+            return None
+        try:
+            # The modification time records the last use
+            os.utime(path, None)
+        except OSError:
+            pass
+        return CacheEntry(
+            header['expires'], header['content_type'],
+            header['encoding'], content,
+        )
+
+    def set(self, key, entry):
+        header = json.dumps({
+            'expires': entry.expires,
+            'content_type': entry.content_type,
+            'encoding': entry.encoding,
+        }).encode('utf-8')
+        fd, tmp_path = tempfile.mkstemp(prefix='.', dir=self.directory)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(header + b'\n')
+            f.write(entry.content)
+        path = self._path(key)
+        with self._lock:
+            self.size -= self._getsize(path)
+            os.replace(tmp_path, path)
+            self.size += self._getsize(path)
+            if self.max_bytes is not None and self.size > self.max_bytes:
+                self._evict()
+
+    def delete(self, key):
+        path = self._path(key)
+        with self._lock:
+            self.size -= self._remove(path)
+
+    def clear(self):
+        with self._lock:
+            for path in self._paths():
+                self._remove(path)
+            self.size = 0
+
+    def _evict(self):
+        paths = sorted(self._paths(), key=self._getmtime)
+        self.size = sum(self._getsize(path) for path in paths)
+        for path in paths:
+            if self.size <= self.max_bytes:
+                break
+            self.size -= self._remove(path)
+
+    def _getsize(self, path):
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return 0
+
+    def _getmtime(self, path):
+        try:
+            return os.path.getmtime(path)
+        except OSError:
+            return 0
+
+    def _remove(self, path):
+        size = self._getsize(path)
+        try:
+            os.remove(path)
+        except OSError:
+            return 0
+        return size
+
+
+class ResponseCache(object):
+    """
+    Cache of the responses of idempotent read operations.
+
+    :param backend: Where the entries are kept, a :class:`MemoryBackend`
+                    by default.
+    :param ttls: Dictionary of the operations to cache and the number of
+                 seconds to cache them for, :data:`DEFAULT_TTLS` by
+                 default. Use ``dict(DEFAULT_TTLS, ListOrders=30)`` to
+                 cache more operations.
+    """
+
+    def __init__(self, backend=None, ttls=None, clock=time.time):
+        self.backend = backend if backend is not None else MemoryBackend()
+        self.ttls = DEFAULT_TTLS if ttls is None else ttls
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+
+    def is_cacheable(self, action):
+        return bool(self.ttls.get(action))
+
+    def get(self, key):
+        """
+        Returns the cached response for a key, or None if there is no
+        entry or the entry has expired.
+        """
+        entry = self.backend.get(key)
+        if entry is not None and entry.expires <= self.clock():
+            self.backend.delete(key)
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return CachedResponse(
+            entry.content_type, entry.content, entry.encoding
+        )
+
+    def set(self, key, action, response):
+        """
+        Cache a successful response of an action.
+        """
+        ttl = self.ttls.get(action)
+        if not ttl:
+            return
+        self.backend.set(key, CacheEntry(
+            self.clock() + ttl,
+            response.headers.get('content-type', ''),
+            response.encoding,
+            response.content,
+        ))
+
+    def clear(self):
+        self.backend.clear()
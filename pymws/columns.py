@@ -0,0 +1,350 @@
+"""
+Typed, columnar parsing of flat file reports.
+
+Instead of a dictionary of strings per row, the report is parsed into
+one array per column with numeric and date columns converted in bulk,
+which is both far more compact and ready for vectorised processing.
+
+.. code-block:: python
+
+    columns = client.reports.get_report_columns(
+        report_id, ReportType='_GET_FLAT_FILE_OPEN_LISTINGS_DATA_'
+    )
+    total_units = sum(columns['quantity'])
+
+    # With numpy installed, columns can be numpy arrays
+    columns = client.reports.get_report_columns(
+        report_id, ReportType='_GET_FLAT_FILE_OPEN_LISTINGS_DATA_',
+        as_numpy=True,
+    )
+    dataframe = pandas.DataFrame(columns)
+
+Column types of the known report types are listed in :data:`SCHEMAS`.
+Columns that are not part of the schema are kept as lists of strings.
+"""
+from array import array
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+import re
+import warnings
+
+from .exceptions import MWSException
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+#: Column types
+INT = 'int'
+FLOAT = 'float'
+DATE = 'date'
+BOOL = 'bool'
+STR = 'str'
+
+
+_INVENTORY_QUANTITIES = dict.fromkeys([
+    'mfn-fulfillable-quantity',
+    'afn-warehouse-quantity',
+    'afn-fulfillable-quantity',
+    'afn-unsellable-quantity',
+    'afn-reserved-quantity',
+    'afn-total-quantity',
+    'afn-inbound-working-quantity',
+    'afn-inbound-shipped-quantity',
+    'afn-inbound-receiving-quantity',
+], INT)
+
+_ORDER_AMOUNTS = dict.fromkeys([
+    'item-price',
+    'item-tax',
+    'shipping-price',
+    'shipping-tax',
+    'gift-wrap-price',
+    'gift-wrap-tax',
+    'item-promotion-discount',
+    'ship-promotion-discount',
+], FLOAT)
+
+_SETTLEMENT = {
+    'settlement-start-date': DATE,
+    'settlement-end-date': DATE,
+    'deposit-date': DATE,
+    'total-amount': FLOAT,
+    'amount': FLOAT,
+    'posted-date': DATE,
+    'posted-date-time': DATE,
+    'quantity-purchased': INT,
+}
+
+#: Column types of known report types
+SCHEMAS = {
+    '_GET_FLAT_FILE_OPEN_LISTINGS_DATA_': {
+        'price': FLOAT,
+        'quantity': INT,
+    },
+    '_GET_MERCHANT_LISTINGS_DATA_': {
+        'price': FLOAT,
+        'quantity': INT,
+        'open-date': DATE,
+        'item-is-marketplace': BOOL,
+        'pending-quantity': INT,
+    },
+    '_GET_FBA_FULFILLMENT_CURRENT_INVENTORY_DATA_': {
+        'snapshot-date': DATE,
+        'quantity': INT,
+    },
+    '_GET_AFN_INVENTORY_DATA_': {
+        'Quantity Available': INT,
+    },
+    '_GET_FBA_MYI_UNSUPPRESSED_INVENTORY_DATA_': dict(
+        _INVENTORY_QUANTITIES,
+        **{
+            'your-price': FLOAT,
+            'mfn-listing-exists': BOOL,
+            'afn-listing-exists': BOOL,
+            'per-unit-volume': FLOAT,
+        }
+    ),
+    '_GET_FLAT_FILE_ALL_ORDERS_DATA_BY_LAST_UPDATE_': dict(
+        _ORDER_AMOUNTS,
+        **{
+            'purchase-date': DATE,
+            'last-updated-date': DATE,
+            'quantity': INT,
+        }
+    ),
+    '_GET_FLAT_FILE_ALL_ORDERS_DATA_BY_ORDER_DATE_': dict(
+        _ORDER_AMOUNTS,
+        **{
+            'purchase-date': DATE,
+            'last-updated-date': DATE,
+            'quantity': INT,
+        }
+    ),
+    '_GET_V2_SETTLEMENT_REPORT_DATA_FLAT_FILE_': _SETTLEMENT,
+    '_GET_V2_SETTLEMENT_REPORT_DATA_FLAT_FILE_V2_': _SETTLEMENT,
+}
+
+
+#: UTC offsets (in hours) of the time zone abbreviations used in reports
+TIMEZONES = {
+    'UTC': 0, 'GMT': 0, 'Z': 0,
+    'PST': -8, 'PDT': -7,
+    'MST': -7, 'MDT': -6,
+    'CST': -6, 'CDT': -5,
+    'EST': -5, 'EDT': -4,
+    'BST': 1, 'CET': 1, 'CEST': 2,
+    'IST': 5.5, 'JST': 9,
+}
+
+_DATE_RE = re.compile(
+    r'^(?:(?P<year>\d{4})-(?P<month>\d{1,2})-(?P<day>\d{1,2})'
+    r'|(?P<eu_day>\d{1,2})\.(?P<eu_month>\d{1,2})\.(?P<eu_year>\d{4}))'
+    r'(?:[T ](?P<hour>\d{1,2}):(?P<minute>\d{2})(?::(?P<second>\d{2}))?'
+    r'(?:\.\d+)?)?'
+    r'\s*(?:(?P<offset>[+-]\d{2}:?\d{2})|(?P<tz>[A-Z]{1,4}))?$'
+)
+
+
+def parse_report_date(value):
+    """
+    Parse the date and datetime formats found in flat file reports
+    (``2020-08-09``, ``2020-08-09T16:45:20+00:00``,
+    ``2020-08-09 16:45:20 PDT``, ``09.08.2020 16:45:20 UTC``).
+
+    Returns a timezone aware datetime in UTC when the value has a
+    timezone, a naive datetime otherwise and None for empty values.
+    """
+    value = value.strip()
+    if not value:
+        return None
+    match = _DATE_RE.match(value)
+    if match is None:
+        raise MWSException('{} is not a valid report date'.format(value))
+    parts = match.groupdict()
+    result = datetime(
+        int(parts['year'] or parts['eu_year']),
+        int(parts['month'] or parts['eu_month']),
+        int(parts['day'] or parts['eu_day']),
+        int(parts['hour'] or 0),
+        int(parts['minute'] or 0),
+        int(parts['second'] or 0),
+    )
+    if parts['offset']:
+        offset = parts['offset'].replace(':', '')
+        hours = int(offset[1:3]) + int(offset[3:5]) / 60.0
+        if offset[0] == '-':
+            hours = -hours
+    elif parts['tz']:
+        if parts['tz'] not in TIMEZONES:
+            raise MWSException(
+                '{} is not a known timezone'.format(parts['tz'])
+            )
+        hours = TIMEZONES[parts['tz']]
+    else:
+        return result
+    return (result - timedelta(hours=hours)).replace(tzinfo=timezone.utc)
+
+
+# Spaces and apostrophes grouping thousands
+_GROUPING_RE = re.compile(r"[\s']")
+
+# An integer with its thousands grouped: 1,200 or 1.234.567
+_GROUPED_INT_RE = re.compile(r"^[+-]?\d{1,3}(?:[\s',.]\d{3})+$")
+
+
+def _to_int(value):
+    try:
+        return int(value)
+    except ValueError:
+        if _GROUPED_INT_RE.match(value) is None:
+            raise
+        return int(re.sub(r"[\s',.]", '', value))
+
+
+def _int_to_float(value):
+    """
+    Convert a value of an integer column that has missing or decimal
+    values, where a single comma groups thousands.
+    """
+    if value and _GROUPED_INT_RE.match(value):
+        return float(_to_int(value))
+    return _to_float(value)
+
+
+def _to_float(value):
+    if not value:
+        return float('nan')
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    number = _GROUPING_RE.sub('', value)
+    if ',' in number and '.' in number:
+        # The last separator is the decimal one: 1,234.56 or 1.234,56
+        decimal = max(',', '.', key=number.rindex)
+    elif number.count(',') == 1:
+        # Decimal comma used by some european reports
+        decimal = ','
+    elif number.count('.') == 1:
+        decimal = '.'
+    else:
+        # Only thousands separators: 1,234,567 or 1.234.567
+        decimal = None
+    for separator in ',.':
+        if separator != decimal:
+            number = number.replace(separator, '')
+    if decimal is not None:
+        number = number.replace(decimal, '.')
+    if not number:
+        return float('nan')
+    try:
+        return float(number)
+    except ValueError:
+        warnings.warn(
+            '{!r} is not a valid number, it is read as NaN'.format(value),
+            stacklevel=2,
+        )
+        return float('nan')
+
+
+def _convert(kind, values):
+    """
+    Convert a batch of string values of a column.
+    """
+    if kind == INT:
+        if all(values):
+            try:
+                return array('q', map(_to_int, values))
+            except ValueError:
+                # Decimals, read like floats
+                pass
+        # Missing values cannot be represented in an integer array
+        return array('d', map(_int_to_float, values))
+    elif kind == FLOAT:
+        return array('d', map(_to_float, values))
+    elif kind == DATE:
+        return list(map(parse_report_date, values))
+    elif kind == BOOL:
+        return [
+            value.lower() in ('true', 'y', 'yes', '1') if value else None
+            for value in values
+        ]
+    return values
+
+
+def _extend(column, values):
+    if isinstance(column, array) and isinstance(values, array) and \
+            column.typecode != values.typecode:
+        # An integer column with missing values becomes a float column
+        column = array('d', column)
+        values = array('d', values)
+    column.extend(values)
+    return column
+
+
+def _to_numpy(kind, column):
+    if isinstance(column, array):
+        return numpy.frombuffer(column, dtype=column.typecode)
+    if kind == DATE:
+        return numpy.array([
+            value.replace(tzinfo=None) if value is not None else None
+            for value in column
+        ], dtype='datetime64[s]')
+    return numpy.array(column, dtype=object)
+
+
+def to_columns(reader, schema=None, as_numpy=False, batch_size=10000):
+    """
+    Convert the rows of a :class:`pymws.utils.XSVReader` in tuple mode
+    into an ordered dictionary of column name to column values.
+
+    Integer and float columns are :class:`array.array` (floats with NaN
+    for missing values), date columns are lists of datetimes and bool
+    columns lists of booleans. With `as_numpy`, every column is
+    converted into a numpy array.
+
+    Numbers may have a decimal comma and their thousands grouped
+    (``1,234.56``, ``1.234,56``), numeric values that cannot be read
+    are NaN and a warning is issued.
+
+    Rows are converted in batches of `batch_size` so that the string
+    values of at most one batch are held in memory.
+    """
+    if as_numpy and numpy is None:
+        raise MWSException('numpy is required to build numpy columns')
+    schema = schema or {}
+    fieldnames = reader.fieldnames
+    kinds = [schema.get(name, STR) for name in fieldnames]
+    columns = [None] * len(fieldnames)
+    width = len(fieldnames)
+
+    batch = []
+    rows = iter(reader)
+    while True:
+        del batch[:]
+        for row in rows:
+            if len(row) != width:
+                row = (tuple(row) + ('',) * width)[:width]
+            batch.append(row)
+            if len(batch) >= batch_size:
+                break
+        if not batch:
+            break
+        for index, values in enumerate(zip(*batch)):
+            values = _convert(kinds[index], list(values))
+            if columns[index] is None:
+                columns[index] = values
+            else:
+                columns[index] = _extend(columns[index], values)
+
+    result = OrderedDict()
+    for name, kind, column in zip(fieldnames, kinds, columns):
+        if column is None:
+            column = _convert(kind, [])
+        if as_numpy:
+            column = _to_numpy(kind, column)
+        result[name] = column
+    return result
@@ -0,0 +1,54 @@
+"""
+Helpers to run MWS calls concurrently on a pool of threads.
+
+MWS calls spend nearly all their time waiting on the network, so
+running them on threads is an easy way to speed up stages that make a
+call per order or per shipment. Share a :class:`pymws.throttling.Throttle`
+between the calls to keep them within the quota of the operation.
+"""
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+def map_concurrent(func, items, max_workers=4, ordered=True):
+    """
+    Call `func` for every item on a pool of `max_workers` threads and
+    yield ``(item, result)`` tuples.
+
+    Items are submitted as results are consumed, so no more than twice
+    `max_workers` results are held in memory at once, however many
+    items there are.
+
+    :param ordered: Yield results in the order of the items. Otherwise
+                    results are yielded as soon as they complete.
+    """
+    items = iter(items)
+    window = max_workers * 2
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    pending = deque()
+    try:
+        while True:
+            while len(pending) < window:
+                try:
+                    item = next(items)
+                except StopIteration:
+                    break
+                pending.append((item, executor.submit(func, item)))
+            if not pending:
+                return
+            if ordered:
+                item, future = pending.popleft()
+            else:
+                done, _ = wait(
+                    [future for _, future in pending],
+                    return_when=FIRST_COMPLETED,
+                )
+                for item, future in pending:
+                    if future in done:
+                        break
+                pending.remove((item, future))
+            yield item, future.result()
+    finally:
+        for _, future in pending:
+            future.cancel()
+        executor.shutdown(wait=True)
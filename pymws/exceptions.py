@@ -10,11 +10,42 @@ class MWSException(Exception):
     pass
 
 
+class ContentMD5Mismatch(MWSException):
+    """The MD5 of a downloaded body does not match its Content-MD5
+    header."""
+    pass
+
+
+class ProcessingCancelled(MWSException):
+    """A report request or feed submission was cancelled before it
+    was processed."""
+    pass
+
+
+class ProcessingTimeout(MWSException):
+    """Report requests or feed submissions were not processed in the
+    time given.
+
+    :param pending: The ids of the requests still being processed.
+    """
+
+    def __init__(self, message, pending=None):
+        super(ProcessingTimeout, self).__init__(message)
+        self.pending = pending or []
+
+
 class MWSError(MWSException):
     """
     Parent class of all Amazon returned Errors.
+
+    :param code: The error code returned by Amazon, if any.
+    :param status_code: HTTP status code of the response.
     """
-    pass
+
+    def __init__(self, message, code=None, status_code=None):
+        super(MWSError, self).__init__(message)
+        self.code = code
+        self.status_code = status_code
 
 
 class AccessDenied(MWSError):
@@ -1,4 +1,10 @@
-from .utils import flatten_list
+from builtins import str as text
+import os
+from pathlib import PurePath
+
+from .pagination import Paginator
+from .tracking import FeedTracker
+from .utils import flatten_list, iter_file_chunks, spool_chunks
 
 
 class Feeds(object):
@@ -28,7 +34,18 @@ class Feeds(object):
         """
         Uploads a feed for processing by Amazon MWS.
 
-        :param FeedContent: String or base string content
+        :param FeedContent: Content of the feed. Large feeds do not have
+                            to be loaded in memory, the content can be:
+
+                            * a string or bytes,
+                            * a binary file object, uploaded from its
+                              current position,
+                            * a path (:class:`pathlib.Path`) to a file,
+                            * an iterable of string or bytes chunks,
+                              written to a temporary file first.
+
+                            Strings are encoded in ISO-8859-1 for flat
+                            file feeds and in UTF-8 otherwise.
         :param FeedType: Type of feed
                          (see `MWS docs <https://docs.developer.amazonservices.com/en_US/feeds/Feeds_FeedType.html>`_)
         :param ContentType: Set the content type of feed.
@@ -38,19 +55,76 @@ class Feeds(object):
 
         `Learn more <https://docs.developer.amazonservices.com/en_US/feeds/Feeds_SubmitFeed.html>`_
         """    # noqa: E501
+        return self._submit_feed(FeedContent, FeedType, ContentType, kwargs)
+
+    def _submit_feed(self, FeedContent, FeedType, ContentType, kwargs,
+                     close_body=False):
+        """
+        Submit a feed. With `close_body`, `FeedContent` is a binary file
+        closed once the request is done.
+        """
         kwargs['FeedType'] = FeedType
+        encoding = 'utf-8'
+        if '_FLAT_FILE_' in FeedType:
+            encoding = 'iso-8859-1'
         if ContentType is None:
             if '_FLAT_FILE_' in FeedType:
                 ContentType = \
                     'text/tab-separated-values; charset=iso-8859-1'
-                FeedContent = FeedContent.encode('iso-8859-1')
             else:
                 ContentType = 'text/xml'
+
+        if isinstance(FeedContent, text):
+            FeedContent = FeedContent.encode(encoding)
+        elif isinstance(FeedContent, PurePath):
+            FeedContent = open(str(FeedContent), 'rb')
+            close_body = True
+        elif not isinstance(FeedContent, bytes) and (
+                not hasattr(FeedContent, 'read') or
+                isinstance(FeedContent.read(0), text)):
+            # Iterables and text files are encoded into a temporary
+            # file, hashing them in the same pass
+            if hasattr(FeedContent, 'read'):
+                FeedContent = iter_file_chunks(FeedContent)
+            FeedContent, kwargs['ContentMD5Value'] = spool_chunks(
+                FeedContent, encoding
+            )
+            close_body = True
+        # The client closes the files opened here once the request is
+        # done, which for the asyncio client is after this returns.
         return self.client.post(
             'SubmitFeed', self.URI, kwargs, self.VERSION,
-            FeedContent, ContentType
+            FeedContent, ContentType, close_body=close_body,
         )
 
+    def submit_records(self, builder, records, **kwargs):
+        """
+        Write records into feeds with a builder
+        (see :mod:`pymws.builders`) and submit each feed as soon as it
+        is written. Yields the response of each submission.
+
+        .. code-block:: python
+
+            builder = XMLFeedBuilder(
+                '_POST_INVENTORY_AVAILABILITY_DATA_', merchant_id='1234'
+            )
+            submission_ids = [
+                response.FeedSubmissionInfo.FeedSubmissionId.text
+                for response in client.feeds.submit_records(builder, rows)
+            ]
+        """
+        for feed in builder.build(records):
+            # The builder closes its file once the next feed is asked
+            # for, possibly before an asyncio request is awaited. The
+            # request gets its own handle on the file, closed once the
+            # request is done.
+            body = os.fdopen(os.dup(feed.fileno()), 'rb')
+            params = dict(kwargs)
+            yield self._submit_feed(
+                body, builder.FeedType, params.pop('ContentType', None),
+                params, close_body=True,
+            )
+
     def get_feed_submission_list(self, **kwargs):
         """
         Returns a list of all feed submissions submitted in the previous 90 days.
@@ -74,6 +148,18 @@ class Feeds(object):
             {'NextToken': NextToken}, self.VERSION
         )
 
+    def iter_feed_submission_list(self, prefetch=0, **kwargs):
+        """
+        Iterate over the FeedSubmissionInfo of
+        :meth:`get_feed_submission_list` and all the following pages.
+        """
+        return Paginator(
+            lambda: self.get_feed_submission_list(**kwargs),
+            self.get_feed_submission_list_by_next_token,
+            'FeedSubmissionInfo',
+            prefetch=prefetch,
+        )
+
     def get_feed_submission_count(self, **kwargs):
         """
         Returns a count of the feeds submitted in the previous 90 days.
@@ -106,3 +192,36 @@ class Feeds(object):
             {'FeedSubmissionId': FeedSubmissionId},
             self.VERSION
         )
+
+    def iter_feed_submission_results(self, FeedSubmissionIds, max_workers=4,
+                                     poller=None, timeout=None):
+        """
+        Wait for feed submissions to be processed and yield
+        ``(FeedSubmissionInfo, result)`` tuples as they are done
+        (see :meth:`pymws.tracking.FeedTracker.iter_results`).
+
+        The status of the submissions is checked in batches of up to
+        100 submissions per call.
+        """
+        tracker = FeedTracker(self.client, poller=poller, timeout=timeout)
+        for feed_submission_id in FeedSubmissionIds:
+            tracker.add(feed_submission_id)
+        return tracker.iter_results(max_workers=max_workers)
+
+    def iter_feed_submission_result(self, FeedSubmissionId,
+                                    records='ProcessingReport.Result'):
+        """
+        Parse the processing report of a feed as it is downloaded and
+        yield its results as dictionaries, instead of building the whole
+        report in memory like :meth:`get_feed_submission_result`.
+
+        The summary of the report (StatusCode, MessagesProcessed, ...)
+        is available in the ``fields`` of the returned
+        :class:`pymws.xmlstream.RecordStream` once the results have
+        been consumed.
+        """
+        return self.client.get_records(
+            'GetFeedSubmissionResult', self.URI,
+            {'FeedSubmissionId': FeedSubmissionId},
+            self.VERSION, records
+        )
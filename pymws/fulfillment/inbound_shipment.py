@@ -1,3 +1,5 @@
+from ..concurrency import map_concurrent
+from ..pagination import Paginator, stream_paginator
 from ..utils import flatten_list
 
 
@@ -13,33 +15,49 @@ class InboundShipment(object):
         """
         Learn more: https://docs.developer.amazonservices.com/en_US/fba_inbound/FBAInbound_ListInboundShipments.html  # noqa
         """
-        flatten_list(kwargs, "ShipmentStatusList", "member")
-        flatten_list(kwargs, "ShipmentIdList", "member")
         return self.client.get(
-            "ListInboundShipments", self.URI, kwargs, self.VERSION
+            "ListInboundShipments", self.URI,
+            self._get_list_inbound_shipments_params(kwargs), self.VERSION
         )
 
-    def list_all_inbound_shipments(self, **kwargs):
-        "Gets all the inboud shipments using next token"
-        if "NextToken" in kwargs:
-            response = self.list_inbound_shipments_by_next_token(
-                kwargs["NextToken"]
-            )
-        else:
-            response = self.list_inbound_shipments(**kwargs)
+    def _get_list_inbound_shipments_params(self, kwargs):
+        flatten_list(kwargs, "ShipmentStatusList", "member")
+        flatten_list(kwargs, "ShipmentIdList", "member")
+        return kwargs
 
-        if not hasattr(response.ShipmentData, "member"):
-            # No shipments
-            return []
+    def iter_inbound_shipments(self, prefetch=0, stream=False, **kwargs):
+        """
+        Iterate over the inbound shipments of all the pages.
 
-        shipments = list(response.ShipmentData.member)
+        With `stream`, pages are parsed as they are downloaded and
+        shipments are yielded as dictionaries (see :mod:`pymws.xmlstream`).
+        """
+        if stream:
+            return stream_paginator(
+                self.client, self.URI, self.VERSION,
+                "ListInboundShipments",
+                self._get_list_inbound_shipments_params(kwargs),
+                "ListInboundShipmentsByNextToken", "ShipmentData.member",
+            )
+        return Paginator(
+            lambda: self.list_inbound_shipments(**kwargs),
+            self.list_inbound_shipments_by_next_token,
+            "ShipmentData.member",
+            prefetch=prefetch,
+        )
 
-        next_token = getattr(response, "NextToken")
+    def list_all_inbound_shipments(self, **kwargs):
+        "Gets all the inboud shipments using next token"
+        next_token = kwargs.pop("NextToken", None)
         if next_token:
-            shipments.extend(
-                self.list_all_inbound_shipments(NextToken=str(next_token))
-            )
-        return shipments
+            return list(Paginator(
+                lambda: self.list_inbound_shipments_by_next_token(
+                    next_token
+                ),
+                self.list_inbound_shipments_by_next_token,
+                "ShipmentData.member",
+            ))
+        return list(self.iter_inbound_shipments(**kwargs))
 
     def list_inbound_shipments_by_next_token(self, NextToken):
         """
@@ -67,29 +85,65 @@ class InboundShipment(object):
             {"ShipmentId": ShipmentId}, self.VERSION
         )
 
+    def iter_inbound_shipment_items(self, ShipmentId, prefetch=0,
+                                    stream=False):
+        """
+        Iterate over the items of a shipment from all the pages.
+
+        With `stream`, pages are parsed as they are downloaded and items
+        are yielded as dictionaries (see :mod:`pymws.xmlstream`).
+        """
+        if stream:
+            return stream_paginator(
+                self.client, self.URI, self.VERSION,
+                "ListInboundShipmentItems", {"ShipmentId": ShipmentId},
+                "ListInboundShipmentItemsByNextToken", "ItemData.member",
+            )
+        return Paginator(
+            lambda: self.list_inbound_shipment_items(ShipmentId),
+            self.list_inbound_shipment_items_by_next_token,
+            "ItemData.member",
+            prefetch=prefetch,
+        )
+
     def list_all_inbound_shipment_items(self, ShipmentId, NextToken=None):
         "Gets all the inboud shipment items using next token"
         if NextToken:
-            response = self.list_inbound_shipment_items_by_next_token(
-                NextToken
-            )
-        else:
-            response = self.list_inbound_shipment_items(ShipmentId)
-
-        if not hasattr(response.ItemData, "member"):
-            # No items
-            return []
-
-        items = list(response.ItemData.member)
-
-        next_token = getattr(response, "NextToken")
-        if next_token:
-            items.extend(
-                self.list_all_inbound_shipment_items(
-                    ShipmentId, NextToken=str(next_token)
-                )
-            )
-        return items
+            return list(Paginator(
+                lambda: self.list_inbound_shipment_items_by_next_token(
+                    NextToken
+                ),
+                self.list_inbound_shipment_items_by_next_token,
+                "ItemData.member",
+            ))
+        return list(self.iter_inbound_shipment_items(ShipmentId))
+
+    def iter_items_by_shipment(self, ShipmentIds, max_workers=1,
+                               ordered=True):
+        """
+        Fetch the items of many shipments and yield
+        ``(ShipmentId, items)`` tuples.
+
+        With `max_workers` greater than 1 the items of several shipments
+        are fetched concurrently
+        (see :func:`pymws.concurrency.map_concurrent`).
+
+        .. code-block:: python
+
+            shipment_ids = [
+                shipment.ShipmentId.text for shipment in
+                inbound.iter_inbound_shipments(ShipmentStatusList=["WORKING"])
+            ]
+            for shipment_id, items in inbound.iter_items_by_shipment(
+                    shipment_ids, max_workers=4):
+                ...
+        """
+        return map_concurrent(
+            self.list_all_inbound_shipment_items,
+            ShipmentIds,
+            max_workers=max_workers,
+            ordered=ordered,
+        )
 
     def list_inbound_shipment_items_by_next_token(self, NextToken):
         """
@@ -0,0 +1,274 @@
+"""
+Instrumentation of the requests made by a client.
+
+Hooks are objects called before and after every request sent to MWS,
+including each retry. They receive a :class:`RequestEvent` describing
+the request: the time it took to sign, send and parse it, the size and
+status of the response, and the quota headers MWS returned.
+
+.. code-block:: python
+
+    histograms = HistogramHook()
+    client = MWS(..., hooks=[LoggingHook(), histograms])
+    client.orders.list_orders(CreatedAfter=start_date)
+    print(histograms.get_summary('ListOrders'))
+
+A hook implements any of the `before_request` and `after_request`
+methods of :class:`Hook`. Exceptions raised by a hook are not caught.
+"""
+from bisect import bisect_left
+from collections import defaultdict
+import logging
+import threading
+
+from .columns import parse_report_date
+
+
+#: Upper bounds in seconds of the buckets of :class:`HistogramHook`.
+DEFAULT_BUCKETS = (
+    0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, float('inf'),
+)
+
+
+def to_number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class RequestEvent(object):
+    """
+    A request sent to MWS.
+
+    Times are in seconds and None until known. `sign_time` is 0 for
+    retries that send the request signed for a previous attempt.
+    `parse_time` is None for streamed responses, and `bytes` is then
+    the Content-Length of the response.
+    """
+    __slots__ = (
+        'action', 'seller_id', 'endpoint', 'attempt', 'throttle_time',
+        'sign_time', 'network_time', 'parse_time', 'status_code', 'bytes',
+        'request_id', 'quota_max', 'quota_remaining', 'quota_resets_on',
+        'error',
+    )
+
+    def __init__(self, action, seller_id, endpoint, attempt=1):
+        self.action = action
+        self.seller_id = seller_id
+        self.endpoint = endpoint
+        self.attempt = attempt
+        self.throttle_time = 0.0
+        self.sign_time = 0.0
+        self.network_time = None
+        self.parse_time = None
+        self.status_code = None
+        self.bytes = None
+        self.request_id = None
+        self.quota_max = None
+        self.quota_remaining = None
+        self.quota_resets_on = None
+        self.error = None
+
+    def set_response(self, response, stream=False):
+        """
+        Fill the event with the status and headers of a response.
+        """
+        headers = response.headers
+        self.status_code = response.status_code
+        if stream:
+            self.bytes = to_number(headers.get('Content-Length'))
+            if self.bytes is not None:
+                self.bytes = int(self.bytes)
+        else:
+            self.bytes = len(response.content)
+        self.request_id = headers.get('x-mws-request-id') or \
+            headers.get('x-amzn-RequestId')
+        self.quota_max = to_number(headers.get('x-mws-quota-max'))
+        self.quota_remaining = to_number(
+            headers.get('x-mws-quota-remaining')
+        )
+        resets_on = headers.get('x-mws-quota-resetsOn')
+        if resets_on:
+            self.quota_resets_on = parse_report_date(resets_on)
+
+    @property
+    def total_time(self):
+        """
+        The time spent signing, sending and parsing the request, without
+        the wait for the throttle.
+        """
+        return sum(
+            t for t in (self.sign_time, self.network_time, self.parse_time)
+            if t is not None
+        )
+
+    def __repr__(self):
+        return '<RequestEvent {} attempt={} status={} time={:.3f}>'.format(
+            self.action, self.attempt, self.status_code, self.total_time
+        )
+
+
+class Hook(object):
+    """
+    Base class of the hooks, doing nothing.
+    """
+
+    def before_request(self, event):
+        """
+        Called before the request is sent, once it is signed.
+        """
+
+    def after_request(self, event):
+        """
+        Called once the response is parsed, or once its headers are
+        received for streamed responses, or when the request failed.
+        """
+
+
+class LoggingHook(Hook):
+    """
+    Log a line for each request.
+
+    :param logger: The logger, ``pymws.requests`` by default.
+    :param level: Level of the successful requests.
+    :param slow: Requests taking more seconds than this are logged as
+                 warnings, like failed requests.
+    """
+
+    def __init__(self, logger=None, level=logging.INFO, slow=None):
+        self.logger = logger or logging.getLogger('pymws.requests')
+        self.level = level
+        self.slow = slow
+
+    def after_request(self, event):
+        level = self.level
+        if event.error is not None or (
+                self.slow is not None and event.total_time > self.slow):
+            level = logging.WARNING
+        if not self.logger.isEnabledFor(level):
+            return
+        self.logger.log(
+            level,
+            '%s seller=%s attempt=%d status=%s time=%.3fs sign=%.3fs '
+            'network=%s parse=%s bytes=%s quota=%s/%s request_id=%s%s',
+            event.action, event.seller_id, event.attempt, event.status_code,
+            event.total_time, event.sign_time,
+            format_time(event.network_time), format_time(event.parse_time),
+            event.bytes, event.quota_remaining, event.quota_max,
+            event.request_id,
+            '' if event.error is None else ' error={!r}'.format(event.error),
+        )
+
+
+def format_time(value):
+    return '-' if value is None else '{:.3f}s'.format(value)
+
+
+class Histogram(object):
+    """
+    Counts of values in buckets with upper bounds `buckets`.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q):
+        """
+        Returns the upper bound of the bucket holding the `q` quantile,
+        or None if nothing was observed.
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return self.buckets[-1]
+
+    @property
+    def mean(self):
+        return self.sum / self.count if self.count else None
+
+
+class HistogramHook(Hook):
+    """
+    Keep, in memory, histograms of the times of the requests of each
+    action, the number of requests, errors and bytes, and the lowest
+    quota remaining seen.
+    """
+    TIMES = ('total_time', 'network_time', 'parse_time', 'throttle_time')
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._actions = defaultdict(self._new_stats)
+
+    def _new_stats(self):
+        stats = dict(
+            (name, Histogram(self.buckets)) for name in self.TIMES
+        )
+        stats.update(requests=0, errors=0, bytes=0, min_quota_remaining=None)
+        return stats
+
+    def after_request(self, event):
+        with self._lock:
+            stats = self._actions[event.action]
+            stats['requests'] += 1
+            if event.error is not None:
+                stats['errors'] += 1
+            if event.bytes:
+                stats['bytes'] += event.bytes
+            for name in self.TIMES:
+                value = getattr(event, name)
+                if value is not None:
+                    stats[name].observe(value)
+            if event.quota_remaining is not None and (
+                    stats['min_quota_remaining'] is None or
+                    event.quota_remaining < stats['min_quota_remaining']):
+                stats['min_quota_remaining'] = event.quota_remaining
+
+    @property
+    def actions(self):
+        with self._lock:
+            return sorted(self._actions)
+
+    def get_histogram(self, action, name='total_time'):
+        """
+        Returns the :class:`Histogram` of a time of an action.
+        """
+        with self._lock:
+            stats = self._actions.get(action) or self._new_stats()
+            return stats[name]
+
+    def get_summary(self, action):
+        """
+        Returns a dictionary of the counts of an action and the mean,
+        median and 99th percentile of its total time.
+        """
+        with self._lock:
+            stats = self._actions.get(action) or self._new_stats()
+            total_time = stats['total_time']
+            return {
+                'requests': stats['requests'],
+                'errors': stats['errors'],
+                'bytes': stats['bytes'],
+                'min_quota_remaining': stats['min_quota_remaining'],
+                'mean': total_time.mean,
+                'p50': total_time.quantile(0.5),
+                'p99': total_time.quantile(0.99),
+            }
+
+    def reset(self):
+        with self._lock:
+            self._actions.clear()
@@ -0,0 +1,287 @@
+"""
+Compact, typed models for the main MWS entities.
+
+lxml elements are convenient to browse, but every element keeps the
+whole parsed document alive. When records are kept around, for example
+in a cache, convert them into models: slotted objects with typed values
+(:class:`~decimal.Decimal` amounts, datetimes, integers and booleans)
+that keep no reference to the document.
+
+.. code-block:: python
+
+    orders = [
+        Order.from_element(order)
+        for order in client.orders.iter_orders(CreatedAfter=start_date)
+    ]
+    print(orders[0].OrderTotal, orders[0].PurchaseDate)
+
+Models can also be built straight from streamed records, without ever
+building a tree for the page
+(see :class:`pymws.xmlstream.RecordStream`)::
+
+    stream = client.get_records(
+        'ListOrders', Orders.URI, params, Orders.VERSION, 'Orders.Order',
+        convert=Order.from_element,
+    )
+
+Attributes are named after the MWS elements, the same way the API
+parameters are.
+"""
+from decimal import Decimal
+
+from .columns import parse_report_date
+from .xmlstream import element_to_dict
+
+
+def to_text(value):
+    if value is None:
+        return None
+    return value.strip()
+
+
+def to_int(value):
+    if value is None or not value.strip():
+        return None
+    return int(value)
+
+
+def to_decimal(value):
+    if value is None or not value.strip():
+        return None
+    return Decimal(value.strip())
+
+
+def to_bool(value):
+    if value is None or not value.strip():
+        return None
+    return value.strip().lower() == 'true'
+
+
+def to_datetime(value):
+    if value is None:
+        return None
+    return parse_report_date(value)
+
+
+def to_dict(value):
+    return value or None
+
+
+def get_path(data, path):
+    """
+    Returns the value found under the dotted `path` of a record
+    dictionary, taking the first of repeated elements.
+    """
+    for name in path.split('.'):
+        if isinstance(data, list):
+            data = data[0]
+        if not isinstance(data, dict):
+            return None
+        data = data.get(name)
+    if isinstance(data, list):
+        data = data[0]
+    return data
+
+
+class Model(object):
+    """
+    Base class of the models.
+
+    Subclasses list their `FIELDS` as ``(name, path, converter)``
+    tuples, where `path` is the dotted path of the element in the
+    record, and declare the same names in `__slots__`.
+    """
+    __slots__ = ()
+    FIELDS = ()
+
+    def __init__(self, **kwargs):
+        for name in self.__slots__:
+            setattr(self, name, kwargs.pop(name, None))
+        if kwargs:
+            raise TypeError(
+                '{} has no fields {}'.format(
+                    self.__class__.__name__, ', '.join(sorted(kwargs))
+                )
+            )
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Build a model from a record dictionary
+        (see :func:`pymws.xmlstream.element_to_dict`).
+        """
+        return cls(**dict(
+            (name, converter(get_path(data, path)))
+            for name, path, converter in cls.FIELDS
+        ))
+
+    @classmethod
+    def from_element(cls, element):
+        """
+        Build a model from an lxml (objectify) element.
+        """
+        return cls.from_dict(element_to_dict(element))
+
+    def to_dict(self):
+        return dict(
+            (name, getattr(self, name)) for name in self.__slots__
+        )
+
+    def __eq__(self, other):
+        return type(self) is type(other) and \
+            self.to_dict() == other.to_dict()
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return '<{} {}>'.format(
+            self.__class__.__name__,
+            ' '.join(
+                '{}={!r}'.format(name, getattr(self, name))
+                for name in self.__slots__[:2]
+            )
+        )
+
+
+def to_models(records, model):
+    """
+    Convert an iterable of elements or record dictionaries into models.
+    """
+    for record in records:
+        if isinstance(record, dict):
+            yield model.from_dict(record)
+        else:
+            yield model.from_element(record)
+
+
+def _fields(*fields):
+    """
+    Returns the FIELDS and __slots__ of a model.
+    """
+    return fields, tuple(name for name, _, _ in fields)
+
+
+class Order(Model):
+    "An order of ListOrders or GetOrder"
+    FIELDS, __slots__ = _fields(
+        ('AmazonOrderId', 'AmazonOrderId', to_text),
+        ('SellerOrderId', 'SellerOrderId', to_text),
+        ('PurchaseDate', 'PurchaseDate', to_datetime),
+        ('LastUpdateDate', 'LastUpdateDate', to_datetime),
+        ('OrderStatus', 'OrderStatus', to_text),
+        ('OrderType', 'OrderType', to_text),
+        ('FulfillmentChannel', 'FulfillmentChannel', to_text),
+        ('SalesChannel', 'SalesChannel', to_text),
+        ('MarketplaceId', 'MarketplaceId', to_text),
+        ('ShipServiceLevel', 'ShipServiceLevel', to_text),
+        ('OrderTotal', 'OrderTotal.Amount', to_decimal),
+        ('CurrencyCode', 'OrderTotal.CurrencyCode', to_text),
+        ('NumberOfItemsShipped', 'NumberOfItemsShipped', to_int),
+        ('NumberOfItemsUnshipped', 'NumberOfItemsUnshipped', to_int),
+        ('PaymentMethod', 'PaymentMethod', to_text),
+        ('BuyerEmail', 'BuyerEmail', to_text),
+        ('BuyerName', 'BuyerName', to_text),
+        ('EarliestShipDate', 'EarliestShipDate', to_datetime),
+        ('LatestShipDate', 'LatestShipDate', to_datetime),
+        ('IsBusinessOrder', 'IsBusinessOrder', to_bool),
+        ('IsPrime', 'IsPrime', to_bool),
+        ('IsPremiumOrder', 'IsPremiumOrder', to_bool),
+        ('IsReplacementOrder', 'IsReplacementOrder', to_bool),
+        ('ShippingAddress', 'ShippingAddress', to_dict),
+    )
+
+
+class OrderItem(Model):
+    "An order item of ListOrderItems"
+    FIELDS, __slots__ = _fields(
+        ('OrderItemId', 'OrderItemId', to_text),
+        ('SellerSKU', 'SellerSKU', to_text),
+        ('ASIN', 'ASIN', to_text),
+        ('Title', 'Title', to_text),
+        ('QuantityOrdered', 'QuantityOrdered', to_int),
+        ('QuantityShipped', 'QuantityShipped', to_int),
+        ('ItemPrice', 'ItemPrice.Amount', to_decimal),
+        ('ItemTax', 'ItemTax.Amount', to_decimal),
+        ('ShippingPrice', 'ShippingPrice.Amount', to_decimal),
+        ('ShippingTax', 'ShippingTax.Amount', to_decimal),
+        ('ShippingDiscount', 'ShippingDiscount.Amount', to_decimal),
+        ('PromotionDiscount', 'PromotionDiscount.Amount', to_decimal),
+        ('CurrencyCode', 'ItemPrice.CurrencyCode', to_text),
+        ('ConditionId', 'ConditionId', to_text),
+        ('IsGift', 'IsGift', to_bool),
+    )
+
+
+class ReportInfo(Model):
+    "A report of GetReportList"
+    FIELDS, __slots__ = _fields(
+        ('ReportId', 'ReportId', to_text),
+        ('ReportType', 'ReportType', to_text),
+        ('ReportRequestId', 'ReportRequestId', to_text),
+        ('AvailableDate', 'AvailableDate', to_datetime),
+        ('Acknowledged', 'Acknowledged', to_bool),
+    )
+
+
+class ReportRequestInfo(Model):
+    "A report request of GetReportRequestList or RequestReport"
+    FIELDS, __slots__ = _fields(
+        ('ReportRequestId', 'ReportRequestId', to_text),
+        ('ReportType', 'ReportType', to_text),
+        ('ReportProcessingStatus', 'ReportProcessingStatus', to_text),
+        ('GeneratedReportId', 'GeneratedReportId', to_text),
+        ('StartDate', 'StartDate', to_datetime),
+        ('EndDate', 'EndDate', to_datetime),
+        ('Scheduled', 'Scheduled', to_bool),
+        ('SubmittedDate', 'SubmittedDate', to_datetime),
+        ('StartedProcessingDate', 'StartedProcessingDate', to_datetime),
+        ('CompletedDate', 'CompletedDate', to_datetime),
+    )
+
+
+class FeedSubmissionInfo(Model):
+    "A feed submission of GetFeedSubmissionList or SubmitFeed"
+    FIELDS, __slots__ = _fields(
+        ('FeedSubmissionId', 'FeedSubmissionId', to_text),
+        ('FeedType', 'FeedType', to_text),
+        ('FeedProcessingStatus', 'FeedProcessingStatus', to_text),
+        ('SubmittedDate', 'SubmittedDate', to_datetime),
+        ('StartedProcessingDate', 'StartedProcessingDate', to_datetime),
+        ('CompletedProcessingDate', 'CompletedProcessingDate', to_datetime),
+    )
+
+
+class InboundShipment(Model):
+    "A shipment (member) of ListInboundShipments"
+    FIELDS, __slots__ = _fields(
+        ('ShipmentId', 'ShipmentId', to_text),
+        ('ShipmentName', 'ShipmentName', to_text),
+        ('ShipmentStatus', 'ShipmentStatus', to_text),
+        ('DestinationFulfillmentCenterId',
+         'DestinationFulfillmentCenterId', to_text),
+        ('LabelPrepType', 'LabelPrepType', to_text),
+        ('AreCasesRequired', 'AreCasesRequired', to_bool),
+        ('ConfirmedNeedByDate', 'ConfirmedNeedByDate', to_datetime),
+        ('BoxContentsSource', 'BoxContentsSource', to_text),
+        ('ShipFromAddress', 'ShipFromAddress', to_dict),
+    )
+
+
+class FulfillmentOrder(Model):
+    "The FulfillmentOrder of GetFulfillmentOrder"
+    FIELDS, __slots__ = _fields(
+        ('SellerFulfillmentOrderId', 'SellerFulfillmentOrderId', to_text),
+        ('DisplayableOrderId', 'DisplayableOrderId', to_text),
+        ('DisplayableOrderDateTime', 'DisplayableOrderDateTime',
+         to_datetime),
+        ('DisplayableOrderComment', 'DisplayableOrderComment', to_text),
+        ('FulfillmentOrderStatus', 'FulfillmentOrderStatus', to_text),
+        ('FulfillmentAction', 'FulfillmentAction', to_text),
+        ('FulfillmentPolicy', 'FulfillmentPolicy', to_text),
+        ('ShippingSpeedCategory', 'ShippingSpeedCategory', to_text),
+        ('MarketplaceId', 'MarketplaceId', to_text),
+        ('ReceivedDateTime', 'ReceivedDateTime', to_datetime),
+        ('StatusUpdatedDateTime', 'StatusUpdatedDateTime', to_datetime),
+        ('DestinationAddress', 'DestinationAddress', to_dict),
+    )
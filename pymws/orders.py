@@ -1,4 +1,12 @@
-from .utils import flatten_list
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from .concurrency import map_concurrent
+from .pagination import (
+    Paginator, get_next_token, get_records, stream_paginator
+)
+from .utils import chunked, flatten_list
 
 
 class Orders(object):
@@ -21,10 +29,20 @@ class Orders(object):
         page2 = client.orders.list_orders_by_next_token(
             response.NextToken
         )
+
+    or let the client go through the pages:
+
+    .. code-block:: python
+
+        for order in client.orders.iter_orders(CreatedAfter=start_date):
+            print(order.AmazonOrderId)
     """
     VERSION = '2013-09-01'
     URI = '/Orders/' + VERSION
 
+    #: Maximum number of AmazonOrderId values in a GetOrder call
+    MAX_ORDER_IDS = 50
+
     def __init__(self, client):
         self.client = client
 
@@ -34,15 +52,19 @@ class Orders(object):
 
         `Learn more <http://docs.developer.amazonservices.com/en_US/orders-2013-09-01/Orders_ListOrders.html>`__
         """     # noqa: E501
+        return self.client.get(
+            'ListOrders', self.URI,
+            self._get_list_orders_params(kwargs), self.VERSION
+        )
+
+    def _get_list_orders_params(self, kwargs):
         if 'MarketplaceId.Id.1' not in kwargs:
             # Not a single marketplace id is specified.
             # fallback to the default marketplace
             kwargs['MarketplaceId.Id.1'] = self.client.marketplace.id
 
         flatten_list(kwargs, 'FulfillmentChannel', 'Channel')
-        return self.client.get(
-            'ListOrders', self.URI, kwargs, self.VERSION
-        )
+        return kwargs
 
     def list_orders_by_next_token(self, NextToken):
         """
@@ -59,17 +81,158 @@ class Orders(object):
             {'NextToken': NextToken}, self.VERSION
         )
 
+    def iter_orders(self, prefetch=0, stream=False, **kwargs):
+        """
+        Iterate over the orders of :meth:`list_orders` and all the
+        following pages.
+
+        :param prefetch: Number of pages to fetch in the background
+                         (see :class:`pymws.pagination.Paginator`).
+        :param stream: Parse the pages as they are downloaded and yield
+                       orders as dictionaries instead of lxml elements
+                       (see :mod:`pymws.xmlstream`).
+        """
+        if stream:
+            return stream_paginator(
+                self.client, self.URI, self.VERSION,
+                'ListOrders', self._get_list_orders_params(kwargs),
+                'ListOrdersByNextToken', 'Orders.Order',
+            )
+        return Paginator(
+            lambda: self.list_orders(**kwargs),
+            self.list_orders_by_next_token,
+            'Orders.Order',
+            prefetch=prefetch,
+        )
+
+    def backfill_orders(self, CreatedAfter, CreatedBefore, shards=None,
+                        max_workers=4, min_window=3600, **kwargs):
+        """
+        Iterate over the orders created between two datetimes, fetching
+        sub-windows of the range concurrently instead of following a
+        single long NextToken chain.
+
+        The range is split into `shards` windows (`max_workers` by
+        default) fetched on a pool of `max_workers` threads. A window
+        that does not fit in a page is split in two, until windows are
+        `min_window` seconds long, so dense periods are fetched by more
+        workers. Orders are yielded in the order of the windows, the
+        first page of a split window before its halves, each order once.
+        Only the ids of the orders that the next windows can list again
+        are kept, so memory does not grow with the range.
+
+        Share a :class:`pymws.throttling.Throttle` with the client so
+        that the workers wait for the ListOrders quota instead of being
+        throttled:
+
+        .. code-block:: python
+
+            client = MWS(..., throttle=Throttle())
+            orders = client.orders.backfill_orders(
+                datetime(2019, 1, 1), datetime(2020, 1, 1), max_workers=6,
+            )
+            for order in orders:
+                print(order.AmazonOrderId)
+
+        :param kwargs: Other parameters of :meth:`list_orders`.
+        """
+        shards = shards or max_workers
+        step = (CreatedBefore - CreatedAfter) / shards
+        windows = [
+            (CreatedAfter + step * index, CreatedAfter + step * (index + 1))
+            for index in range(shards)
+        ]
+        windows[-1] = (windows[-1][0], CreatedBefore)
+        min_window = timedelta(seconds=min_window)
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        # Each window comes with the ids of the first pages of the split
+        # windows it is a part of, which list its orders again
+        pending = deque(
+            (window, executor.submit(
+                self._fetch_window, window, min_window, kwargs
+            ), frozenset())
+            for window in windows
+        )
+        # The ids of the window yielded last, orders created at the
+        # boundary of two windows are listed by both
+        previous = frozenset()
+        try:
+            while pending:
+                (after, before), future, skip = pending.popleft()
+                orders, split = future.result()
+                order_ids = [order.AmazonOrderId.text for order in orders]
+                if split:
+                    # Too dense, fetch the halves in place of the window
+                    middle = after + (before - after) / 2
+                    halves_skip = skip.union(order_ids)
+                    for window in ((middle, before), (after, middle)):
+                        pending.appendleft((window, executor.submit(
+                            self._fetch_window, window, min_window, kwargs
+                        ), halves_skip))
+                for order_id, order in zip(order_ids, orders):
+                    if order_id not in skip and order_id not in previous:
+                        yield order
+                if not split:
+                    previous = frozenset(order_ids)
+        finally:
+            for _, future, _ in pending:
+                future.cancel()
+            executor.shutdown(wait=True)
+
+    def _fetch_window(self, window, min_window, kwargs):
+        """
+        Returns the orders created in a window and whether it has to be
+        split, when it has more than a page of orders and can be. The
+        orders are then only those of the first page, the halves list
+        them again.
+        """
+        after, before = window
+        response = self.list_orders(
+            CreatedAfter=after, CreatedBefore=before, **dict(kwargs)
+        )
+        next_token = get_next_token(response)
+        orders = list(get_records(response, 'Orders.Order'))
+        if next_token is not None and before - after >= min_window * 2:
+            return orders, True
+        while next_token is not None:
+            response = self.list_orders_by_next_token(next_token)
+            orders.extend(get_records(response, 'Orders.Order'))
+            next_token = get_next_token(response)
+        return orders, False
+
     def get_order(self, AmazonOrderId):
         """
         Returns orders based on the AmazonOrderId values that you specify.
 
+        :param AmazonOrderId: An order id, or a list of up to 50 order ids.
+
         `Learn more <http://docs.developer.amazonservices.com/en_US/orders-2013-09-01/Orders_GetOrder.html>`__
         """     # noqa: E501
+        if isinstance(AmazonOrderId, (list, tuple)):
+            kwargs = {'AmazonOrderId': AmazonOrderId}
+            flatten_list(kwargs, 'AmazonOrderId', 'Id')
+        else:
+            kwargs = {'AmazonOrderId.Id.1': AmazonOrderId}
         return self.client.get(
-            'GetOrder', self.URI,
-            {'AmazonOrderId.Id.1': AmazonOrderId}, self.VERSION
+            'GetOrder', self.URI, kwargs, self.VERSION
         )
 
+    def iter_orders_by_id(self, AmazonOrderIds, max_workers=1):
+        """
+        Iterate over the orders of any number of AmazonOrderIds, making
+        as few GetOrder calls as possible (50 order ids per call).
+
+        With `max_workers` greater than 1, the calls are made
+        concurrently. Share a :class:`pymws.throttling.Throttle` with
+        the client to keep concurrent calls within the quota.
+        """
+        for _, response in map_concurrent(
+                self.get_order,
+                chunked(AmazonOrderIds, self.MAX_ORDER_IDS),
+                max_workers=max_workers):
+            for order in get_records(response, 'Orders.Order'):
+                yield order
+
     def list_order_items(self, AmazonOrderId):
         """
         Returns order items based on the AmazonOrderId that you specify.
@@ -92,6 +255,52 @@ class Orders(object):
             {'NextToken': NextToken}, self.VERSION
         )
 
+    def iter_order_items(self, AmazonOrderId, prefetch=0):
+        """
+        Iterate over all the order items of an order.
+        """
+        return Paginator(
+            lambda: self.list_order_items(AmazonOrderId),
+            self.list_order_items_by_next_token,
+            'OrderItems.OrderItem',
+            prefetch=prefetch,
+        )
+
+    def iter_order_items_by_order(self, AmazonOrderIds, max_workers=4,
+                                  ordered=True):
+        """
+        Fetch all the order items (including the next pages) of many
+        orders on a pool of `max_workers` threads and yield
+        ``(AmazonOrderId, items)`` tuples.
+
+        :param ordered: Yield the orders in the order they were given.
+                        Otherwise orders are yielded as soon as their
+                        items have been fetched.
+
+        Share a :class:`pymws.throttling.Throttle` with the client so
+        that the workers wait for the ListOrderItems quota instead of
+        being throttled:
+
+        .. code-block:: python
+
+            client = MWS(..., throttle=Throttle())
+            order_ids = [
+                order.AmazonOrderId.text
+                for order in client.orders.iter_orders(CreatedAfter=start)
+            ]
+            results = client.orders.iter_order_items_by_order(order_ids)
+            for order_id, items in results:
+                ...
+        """
+        return map_concurrent(
+            lambda AmazonOrderId: list(
+                self.iter_order_items(AmazonOrderId)
+            ),
+            AmazonOrderIds,
+            max_workers=max_workers,
+            ordered=ordered,
+        )
+
     def get_service_status(self):
         """
         Returns the operational status of the Orders API section.
@@ -0,0 +1,183 @@
+"""
+Lazy iteration over paged MWS operations.
+
+Operations that return more results than fit in a response return a
+`NextToken` that has to be passed to the matching `*ByNextToken`
+operation to get the next page. A :class:`Paginator` does that for you
+and yields the records of each page as they are consumed.
+
+.. code-block:: python
+
+    for order in client.orders.iter_orders(CreatedAfter=start_date):
+        print(order.AmazonOrderId)
+
+Only the page being consumed is referenced by the paginator; once its
+records have been yielded the page is released. With `prefetch`, the
+next pages are fetched in a background thread while the current one is
+consumed, holding at most `prefetch` pages in memory in addition to the
+current one.
+"""
+import inspect
+import threading
+
+from .exceptions import MWSException
+from .xmlstream import RecordStream
+
+try:
+    import queue
+except ImportError:
+    # py2
+    import Queue as queue
+
+
+def check_page(response):
+    """
+    Raise :class:`pymws.exceptions.MWSException` if a page is an
+    awaitable returned by :class:`pymws.aio.AsyncMWS`, which has no
+    records nor NextToken until it is awaited.
+    """
+    if inspect.isawaitable(response):
+        if inspect.iscoroutine(response):
+            # Avoid the "never awaited" warning
+            response.close()
+        raise MWSException(
+            'Pages of the asyncio client have to be awaited, paginators '
+            'and iter_* helpers only work with the synchronous client'
+        )
+
+
+def get_next_token(response):
+    """
+    Returns the NextToken of a response or None if this was the last
+    page.
+    """
+    check_page(response)
+    if isinstance(response, RecordStream):
+        return response.next_token
+    has_next = getattr(response, 'HasNext', None)
+    if has_next is not None and not has_next:
+        return None
+    next_token = getattr(response, 'NextToken', None)
+    if next_token is None or not next_token.text:
+        return None
+    return next_token.text.strip() or None
+
+
+def get_records(response, path):
+    """
+    Returns the records found under the dotted `path` of a response,
+    (``Orders.Order`` for example), or an empty list if there are none.
+    """
+    check_page(response)
+    if isinstance(response, RecordStream):
+        return response
+    element = response
+    for name in path.split('.'):
+        element = getattr(element, name, None)
+        if element is None:
+            return []
+    return element
+
+
+class Paginator(object):
+    """
+    Iterate over the records of a paged MWS operation.
+
+    :param first_page: Function returning the first page.
+    :param next_page: Function returning the page for a NextToken.
+    :param records: Dotted path of the records in a page.
+    :param prefetch: Number of pages to fetch ahead in a background
+                     thread. Pages are fetched one after another when
+                     0 (default).
+    """
+    _DONE = object()
+
+    def __init__(self, first_page, next_page, records, prefetch=0):
+        self.first_page = first_page
+        self.next_page = next_page
+        self.records = records
+        self.prefetch = prefetch
+
+    def __iter__(self):
+        for page in self.pages():
+            for record in get_records(page, self.records):
+                yield record
+
+    def pages(self):
+        """
+        Iterate over the pages (the responses) instead of the records.
+        """
+        if self.prefetch:
+            return self._prefetched_pages()
+        return self._pages()
+
+    def _pages(self):
+        page = self.first_page()
+        while True:
+            yield page
+            next_token = get_next_token(page)
+            if next_token is None:
+                return
+            page = self.next_page(next_token)
+
+    def _prefetched_pages(self):
+        pages = queue.Queue(maxsize=self.prefetch)
+        stop = threading.Event()
+
+        def put(item):
+            while not stop.is_set():
+                try:
+                    pages.put(item, timeout=0.1)
+                except queue.Full:
+                    continue
+                return True
+            return False
+
+        def fetch():
+            try:
+                for page in self._pages():
+                    if not put((page, None)):
+                        return
+                put((self._DONE, None))
+            except Exception as error:
+                put((None, error))
+
+        thread = threading.Thread(target=fetch)
+        thread.daemon = True
+        thread.start()
+        try:
+            while True:
+                page, error = pages.get()
+                if error is not None:
+                    raise error
+                if page is self._DONE:
+                    return
+                yield page
+        finally:
+            # Stop the fetcher if the consumer stops early
+            stop.set()
+
+
+def stream_paginator(client, uri, version, action, params, next_action,
+                     records, convert=None):
+    """
+    Returns a :class:`Paginator` whose pages are parsed as they are
+    downloaded and yield lightweight records
+    (see :class:`pymws.xmlstream.RecordStream`).
+
+    Streamed pages cannot be prefetched, since the NextToken of a page
+    is only known once its records have been consumed.
+    """
+    kwargs = {}
+    if convert is not None:
+        kwargs['convert'] = convert
+    return Paginator(
+        lambda: client.get_records(
+            action, uri, params, version, records, **kwargs
+        ),
+        lambda NextToken: client.get_records(
+            next_action, uri, {'NextToken': NextToken}, version, records,
+            **kwargs
+        ),
+        records,
+    )
@@ -0,0 +1,196 @@
+"""
+A pool of clients for many sellers sharing connections.
+
+Every :class:`pymws.MWS` instance has a session, and so a connection
+pool, of its own. When working with hundreds of sellers, that is
+hundreds of connection pools and TLS handshakes to the same few MWS
+hosts. A :class:`MWSPool` hands out clients with their own credentials
+that share one connection pool per MWS host.
+
+.. code-block:: python
+
+    pool = MWSPool(
+        access_key_id='key', secret_key='secret',
+        pool_maxsize=50, max_concurrency=100,
+        max_concurrency_per_seller=4,
+        throttle=Throttle(),
+    )
+    for seller in sellers:
+        client = pool.client('US', seller.merchant_id, seller.auth_token)
+        client.orders.list_orders(CreatedAfter=start_date)
+"""
+from contextlib import contextmanager
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .pymws import MWS
+from .utils import get_marketplace
+
+try:
+    from urllib.parse import urlparse
+except ImportError:
+    # py2
+    from urlparse import urlparse
+
+
+class ConcurrencyLimiter(object):
+    """
+    Limits the number of requests in flight, across all sellers and
+    for each seller.
+
+    :param max_concurrency: Maximum number of requests in flight. No
+                            limit if None.
+    :param max_concurrency_per_seller: Maximum number of requests in
+                                       flight for a single seller. No
+                                       limit if None.
+    """
+
+    def __init__(self, max_concurrency=None, max_concurrency_per_seller=None):
+        self.max_concurrency = max_concurrency
+        self.max_concurrency_per_seller = max_concurrency_per_seller
+        self._global = None
+        if max_concurrency:
+            self._global = threading.BoundedSemaphore(max_concurrency)
+        self._sellers = {}
+        self._lock = threading.Lock()
+
+    def _get_seller_semaphore(self, seller_id):
+        if not self.max_concurrency_per_seller:
+            return None
+        with self._lock:
+            semaphore = self._sellers.get(seller_id)
+            if semaphore is None:
+                semaphore = self._sellers[seller_id] = \
+                    threading.BoundedSemaphore(
+                        self.max_concurrency_per_seller
+                    )
+            return semaphore
+
+    @contextmanager
+    def __call__(self, seller_id):
+        """
+        Context manager that holds a slot for a request of the seller.
+        """
+        seller = self._get_seller_semaphore(seller_id)
+        # Take the seller slot first, so that a seller waiting on its
+        # own limit does not hold a global slot
+        if seller is not None:
+            seller.acquire()
+        try:
+            if self._global is not None:
+                self._global.acquire()
+            try:
+                yield
+            finally:
+                if self._global is not None:
+                    self._global.release()
+        finally:
+            if seller is not None:
+                seller.release()
+
+
+class MWSPool(object):
+    """
+    Hands out :class:`pymws.MWS` clients that share one HTTP connection
+    pool per MWS host.
+
+    :param access_key_id: Access key of your app, used by all clients
+                          unless given when getting a client.
+    :param secret_key: Secret key of your app, used by all clients
+                       unless given when getting a client.
+    :param pool_connections: Number of connection pools to cache in each
+                             session.
+    :param pool_maxsize: Maximum number of connections kept open to each
+                         MWS host.
+    :param max_concurrency: Maximum number of requests in flight across
+                            all clients.
+    :param max_concurrency_per_seller: Maximum number of requests in
+                                       flight for a seller.
+    :param throttle: :class:`pymws.throttling.Throttle` shared by the
+                     clients.
+    :param retry: :class:`pymws.retry.RetryPolicy` shared by the
+                  clients.
+    :param cache: :class:`pymws.cache.ResponseCache` shared by the
+                  clients.
+    :param store: :class:`pymws.store.ResultStore` shared by the
+                  clients.
+    :param hooks: Hooks of all the clients (see :mod:`pymws.hooks`).
+    """
+
+    def __init__(
+            self, access_key_id=None, secret_key=None,
+            pool_connections=10, pool_maxsize=10,
+            max_concurrency=None, max_concurrency_per_seller=None,
+            throttle=None, retry=None, cache=None,
+            store=None, hooks=None):
+        self.access_key_id = access_key_id
+        self.secret_key = secret_key
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.throttle = throttle
+        self.retry = retry
+        self.cache = cache
+        self.store = store
+        self.hooks = hooks
+        self.limiter = ConcurrencyLimiter(
+            max_concurrency, max_concurrency_per_seller
+        )
+        self._sessions = {}
+        self._clients = {}
+        self._lock = threading.Lock()
+
+    def get_session(self, endpoint):
+        """
+        Returns the session shared by the clients of an MWS endpoint.
+        """
+        host = urlparse(endpoint).netloc
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = self._sessions[host] = requests.Session()
+                session.mount('https://', HTTPAdapter(
+                    pool_connections=self.pool_connections,
+                    pool_maxsize=self.pool_maxsize,
+                ))
+            return session
+
+    def client(self, marketplace, merchant_id, auth_token=None,
+               access_key_id=None, secret_key=None):
+        """
+        Returns a client for a seller in a marketplace. The same client
+        is returned for the same seller and credentials.
+        """
+        marketplace = get_marketplace(marketplace)
+        access_key_id = access_key_id or self.access_key_id
+        secret_key = secret_key or self.secret_key
+        key = (
+            marketplace.id, merchant_id, auth_token,
+            access_key_id, secret_key,
+        )
+        with self._lock:
+            client = self._clients.get(key)
+        if client is None:
+            client = MWS(
+                marketplace.id, merchant_id=merchant_id,
+                access_key_id=access_key_id, secret_key=secret_key,
+                auth_token=auth_token,
+                throttle=self.throttle, retry=self.retry,
+                session=self.get_session(marketplace.endpoint),
+                limiter=self.limiter, cache=self.cache, store=self.store,
+                hooks=self.hooks,
+            )
+            with self._lock:
+                client = self._clients.setdefault(key, client)
+        return client
+
+    def close(self):
+        """
+        Close the connections of all the sessions.
+        """
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+            self._clients.clear()
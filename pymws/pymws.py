@@ -1,33 +1,35 @@
 """Main module."""
-import base64
-import hashlib
-import hmac
 from builtins import str as text
-from datetime import date, datetime
+import threading
+import time
 
 import requests
-from lxml import objectify
+from requests.utils import rewind_body
+from lxml import etree, objectify
 
+from .cache import CachedResponse, get_cache_key
 from .exceptions import MWSError, AccessDenied, QuotaExceeded, RequestThrottled
 from .feeds import Feeds
+from .hooks import RequestEvent
 from .orders import Orders
 from .products import Products
 from .reports import Reports
+from .retry import RetryStats
+from .xmlstream import RecordStream, element_to_dict
+from .signing import MWS_SAFE, Signer, build_query_string  # noqa: F401
 from .fulfillment.outbound_shipment import OutboundShipment
 from .fulfillment.inbound_shipment import InboundShipment
-from .utils import get_marketplace, parse_xsv, get_md5_hash
+from .utils import (
+    get_marketplace, parse_xsv, get_md5_hash, iter_md5_verified
+)
 
 try:
-    from urllib.parse import urlparse, quote
+    from urllib.parse import quote
 except ImportError:
     # py2
-    from urlparse import urlparse
     from urllib import quote
 
 
-MWS_SAFE = '-_.~'.encode('utf-8')
-
-
 class MWS(object):
     """
     Primary client class that acts as a gateway to all of the
@@ -48,19 +50,51 @@ class MWS(object):
     :param secret_key: Secret key of your app
     :param auth_token: Token obtained by the merchant after
                        installing your app.
+    :param throttle: An optional :class:`pymws.throttling.Throttle`
+                     that holds requests until the quota of the
+                     operation allows them. The same throttle can be
+                     shared by clients in many threads.
+    :param retry: An optional :class:`pymws.retry.RetryPolicy` used
+                  to retry throttled requests and server errors.
+    :param session: An optional :class:`requests.Session` to share
+                    connections with other clients.
+    :param limiter: An optional callable returning a context manager
+                    held while a request of the seller is in flight
+                    (see :class:`pymws.pool.ConcurrencyLimiter`).
+    :param cache: An optional :class:`pymws.cache.ResponseCache` that
+                  answers repeated calls of read operations.
+    :param store: An optional :class:`pymws.store.ResultStore` keeping
+                  the downloaded reports and feed processing results.
+    :param hooks: An optional list of hooks called before and after
+                  every request (see :mod:`pymws.hooks`).
     """
 
+    #: Seconds after which a request that is retried is signed again.
+    #: MWS rejects requests whose Timestamp is more than 15 minutes
+    #: old, which throttling and backoff can add up to.
+    resign_after = 300
+
     def __init__(
                 self,
                 marketplace, merchant_id=None,
                 access_key_id=None, secret_key=None,
-                auth_token=None):
+                auth_token=None, throttle=None, retry=None,
+                session=None, limiter=None, cache=None, store=None,
+                hooks=None):
         self.marketplace = get_marketplace(marketplace)
         self.merchant_id = merchant_id
         self.access_key_id = access_key_id
         self.secret_key = secret_key
         self.auth_token = auth_token
-        self.session = requests.Session()
+        self.throttle = throttle
+        self.retry = retry
+        self.limiter = limiter
+        self.cache = cache
+        self.store = store
+        self.hooks = list(hooks or [])
+        self._local = threading.local()
+        self.clock = time.monotonic
+        self.session = session or requests.Session()
         self.user_agent = 'pymws/0.1 (Language=Python)'
 
     @property
@@ -114,24 +148,170 @@ class MWS(object):
         return InboundShipment(self)
 
     def get(self, action, uri, req_params, version):
+        if self.store is not None and \
+                self.store.get_key(action, req_params) is not None:
+            return self._stored_get(action, uri, req_params, version)
+        if self.cache is not None and self.cache.is_cacheable(action):
+            return self._cached_get(action, uri, req_params, version)
         return self._request(
             'GET',
             action, uri, req_params, version
         )
 
     def post(self, action, uri, req_params, version,
-             body=None, content_type=None):
+             body=None, content_type=None, close_body=False):
+        """
+        Make a POST request. With `close_body`, the body file is closed
+        once the request is done, whether it succeeded or not.
+        """
         return self._request(
             'POST',
-            action, uri, req_params, version, body, content_type
+            action, uri, req_params, version, body, content_type,
+            close_body,
+        )
+
+    def stream(self, action, uri, req_params, version, chunk_size=65536):
+        """
+        Make a GET request and return an iterator over the raw response
+        body in chunks of `chunk_size` bytes, without loading the body
+        in memory.
+
+        If the response has a Content-MD5 header, the hash is computed
+        as the chunks are consumed and
+        :class:`pymws.exceptions.ContentMD5Mismatch` is raised after
+        the last chunk if it does not match.
+
+        Results kept by the :class:`pymws.store.ResultStore` of the
+        client are read from the store, and downloaded into it first
+        if they are not there yet.
+        """
+        if self.store is not None and \
+                self.store.get_key(action, req_params) is not None:
+            result = self.fetch_stored(
+                action, uri, req_params, version, chunk_size
+            )
+            return self.store.iter_chunks(result, chunk_size)
+        response = self._send(
+            action,
+            lambda: self._prepare_request(
+                'GET', action, uri, req_params, version
+            ),
+            stream=True,
+        )
+        return iter_md5_verified(
+            self._iter_content(response, chunk_size),
+            response.headers.get('Content-MD5'),
         )
 
+    def get_records(self, action, uri, req_params, version, records,
+                    convert=element_to_dict):
+        """
+        Make a GET request and return a
+        :class:`pymws.xmlstream.RecordStream` that parses the XML
+        response as it is downloaded and yields a record for each
+        element found at the dotted `records` path.
+        """
+        return RecordStream(
+            self.stream(action, uri, req_params, version), records, convert
+        )
+
+    def fetch_stored(self, action, uri, req_params, version,
+                     chunk_size=65536):
+        """
+        Returns the :class:`pymws.store.StoredResult` of a call whose
+        result is kept by the store of the client, downloading it into
+        the store if it is not there yet.
+        """
+        key = self.store.get_key(action, req_params)
+        result = self.store.get(action, key)
+        if result is None:
+            response = self._send(
+                action,
+                lambda: self._prepare_request(
+                    'GET', action, uri, req_params, version
+                ),
+                stream=True,
+            )
+            result = self.store.put(
+                action, key, self._iter_content(response, chunk_size),
+                content_type=response.headers.get('content-type'),
+                encoding=response.encoding,
+                expected_md5=response.headers.get('Content-MD5'),
+            )
+        return result
+
+    def _stored_get(self, action, uri, req_params, version):
+        """
+        Make a GET request unless its result is in the store.
+        """
+        result = self.fetch_stored(action, uri, req_params, version)
+        return self._parse_response(action, CachedResponse(
+            result.content_type or '', self.store.read(result),
+            result.encoding,
+        ))
+
+    def _iter_content(self, response, chunk_size):
+        try:
+            for chunk in response.iter_content(chunk_size):
+                yield chunk
+        finally:
+            response.close()
+
     def _request(self, http_verb, action, uri, req_params, version,
-                 body=None, content_type=None):
+                 body=None, content_type=None, close_body=False):
         """
         Build a request, parse the response and handle errors
         """
-        if body is not None:
+        try:
+            response = self._send(
+                action,
+                lambda: self._prepare_request(
+                    http_verb, action, uri, req_params, version,
+                    body, content_type
+                ),
+            )
+        finally:
+            if close_body:
+                body.close()
+        return self._parse_response(action, response)
+
+    def _cached_get(self, action, uri, req_params, version):
+        """
+        Make a GET request unless its response is in the cache.
+        """
+        key = self._get_cache_key(action, uri, req_params, version)
+        response = self.cache.get(key)
+        if response is None:
+            response = self._send(
+                action,
+                lambda: self._prepare_request(
+                    'GET', action, uri, req_params, version
+                ),
+            )
+            self.cache.set(key, action, response)
+        return self._parse_response(action, response)
+
+    def _get_cache_key(self, action, uri, req_params, version):
+        return get_cache_key(
+            self.merchant_id, self.marketplace.endpoint, uri, version,
+            action, req_params,
+        )
+
+    def _prepare_request(self, http_verb, action, uri, req_params, version,
+                         body=None, content_type=None):
+        """
+        Build and sign a request ready to be sent by the session.
+        """
+        return self.session.prepare_request(self._build_request(
+            http_verb, action, uri, req_params, version, body, content_type
+        ))
+
+    def _build_request(self, http_verb, action, uri, req_params, version,
+                       body=None, content_type=None):
+        """
+        Build a signed :class:`requests.Request` for the action.
+        """
+        if body is not None and 'ContentMD5Value' not in req_params:
             req_params['ContentMD5Value'] = get_md5_hash(body)
 
         query_string = self.get_query_string(action, req_params, version)
@@ -147,7 +327,7 @@ class MWS(object):
         if content_type:
             headers['Content-Type'] = content_type
 
-        response = self.session.request(
+        return requests.Request(
             http_verb,
             url,
             data=body,
@@ -158,17 +338,154 @@ class MWS(object):
             headers=headers
         )
 
+    def _send(self, action, prepare, stream=False):
+        """
+        Send the request built by `prepare` and return the response
+        once it is known to be successful.
+
+        The same prepared request is sent again when the retry policy
+        decides that an error is worth retrying, until it is
+        :attr:`resign_after` seconds old and is signed again. With
+        `stream` the body of a successful response is left unread.
+        """
+        attempts = RequestAttempts(self, action, prepare)
+        try:
+            while True:
+                attempts.start()
+                # Wait for the quota before signing, so that the
+                # timestamp is fresh when the request is finally sent.
+                if self.throttle is not None:
+                    self.throttle.acquire(
+                        self.merchant_id, self.marketplace.endpoint, action
+                    )
+                prepared = attempts.sign()
+                try:
+                    if self.limiter is not None:
+                        with self.limiter(self.merchant_id):
+                            response = self.session.send(
+                                prepared, stream=stream
+                            )
+                    else:
+                        response = self.session.send(prepared, stream=stream)
+                    attempts.check(response, stream)
+                except Exception as error:
+                    delay = attempts.failed(error)
+                    if delay is None:
+                        raise
+                    self.retry.sleep(delay)
+                else:
+                    attempts.succeeded(stream)
+                    return response
+        finally:
+            attempts.record()
+
+    def _should_retry(self, error, attempt):
+        """
+        Returns True if the retry policy retries the error of an attempt.
+        """
+        return self.retry is not None and \
+            self.retry.should_retry(error, attempt)
+
+    def _record_retry_stats(self, stats):
+        self._local.retry_stats = stats
+        if self.retry is not None:
+            self.retry.record(stats)
+
+    def _sign(self, prepare, prepared, signed_at):
+        """
+        Returns the request to send for an attempt, and the time it was
+        signed at. The request of the previous attempt is reused as long
+        as its signature is not too old.
+        """
+        if prepared is not None:
+            if hasattr(prepared.body, 'seek'):
+                # A file body was read by the previous attempt
+                rewind_body(prepared)
+            if self.clock() - signed_at < self.resign_after:
+                return prepared, signed_at
+        return prepare(), self.clock()
+
+    def _new_event(self, action, attempt):
+        """
+        Returns the :class:`pymws.hooks.RequestEvent` of an attempt, or
+        None if the client has no hooks.
+        """
+        if not self.hooks:
+            return None
+        return RequestEvent(
+            action, self.merchant_id, self.marketplace.endpoint, attempt
+        )
+
+    def _call_hooks(self, name, event):
+        for hook in self.hooks:
+            getattr(hook, name)(event)
+
+    def _complete_event(self, event, stream):
+        """
+        Call the hooks with the event of a successful request, or keep
+        the event until the response is parsed.
+        """
+        if event is None:
+            return
+        if stream:
+            self._call_hooks('after_request', event)
+        else:
+            self._local.event = event
+
+    def _check_response(self, response):
+        """
+        Raise the appropriate exception if the response is an error.
+        """
         if response.status_code == 401:
-            raise AccessDenied(response.text)
+            raise AccessDenied(
+                response.text, code='AccessDenied', status_code=401
+            )
         elif response.status_code == 503:
-            error_code = objectify.fromstring(response.text).Error.Code
+            error_code = self._get_error_code(response)
             if error_code == 'RequestThrottled':
-                raise RequestThrottled(response.text)
+                raise RequestThrottled(
+                    response.text, code=error_code, status_code=503
+                )
             elif error_code == 'QuotaExceeded':
-                raise QuotaExceeded(response.text)
+                raise QuotaExceeded(
+                    response.text, code=error_code, status_code=503
+                )
+            raise MWSError(
+                response.text, code=error_code, status_code=503
+            )
         elif response.status_code != 200:
-            raise MWSError(response.text)
+            raise MWSError(
+                response.text,
+                code=self._get_error_code(response),
+                status_code=response.status_code,
+            )
+
+    def _get_error_code(self, response):
+        """
+        Returns the error code from an MWS error response, or None
+        if the response body is not an MWS error.
+        """
+        try:
+            return text(objectify.fromstring(response.content).Error.Code)
+        except (etree.XMLSyntaxError, AttributeError, ValueError):
+            return None
 
+    def _parse_response(self, action, response):
+        """
+        Convert a successful response into the result of the action.
+        """
+        event = getattr(self._local, 'event', None)
+        if event is None:
+            return self._parse_content(action, response)
+        self._local.event = None
+        started = time.perf_counter()
+        try:
+            return self._parse_content(action, response)
+        finally:
+            event.parse_time = time.perf_counter() - started
+            self._call_hooks('after_request', event)
+
+    def _parse_content(self, action, response):
         if response.headers['content-type'].startswith('text/xml'):
             xml = objectify.fromstring(response.content)
             result_el = '{}Result'.format(action)
@@ -180,35 +497,34 @@ class MWS(object):
         else:
             return response.text
 
+    @property
+    def last_retry_stats(self):
+        """
+        The :class:`pymws.retry.RetryStats` of the last request made
+        by the current thread with this client.
+        """
+        return getattr(self._local, 'retry_stats', None)
+
+    @property
+    def signer(self):
+        """
+        The :class:`pymws.signing.Signer` of this client. It is built
+        once and built again only if the credentials change.
+        """
+        key = (
+            self.marketplace.endpoint, self.access_key_id, self.secret_key,
+            self.merchant_id, self.auth_token,
+        )
+        if getattr(self, '_signer_key', None) != key:
+            self._signer = Signer(*key)
+            self._signer_key = key
+        return self._signer
+
     def get_query_string(self, action, req_params, version):
-        params = {
-            'AWSAccessKeyId': self.access_key_id,
-            'Action': action,
-            'MWSAuthToken': self.auth_token,
-            'SellerId': self.merchant_id,
-            'SignatureMethod': 'HmacSHA256',
-            'SignatureVersion': '2',
-            'Timestamp': datetime.utcnow().isoformat(),
-            'Version': version,
-        }
-        params.update(req_params)
-        query_string = self.build_query_string(params)
-        return query_string
+        return self.signer.get_query_string(action, req_params, version)
 
     def get_signature(self, http_verb, uri, query_string):
-        to_sign = [
-            http_verb,
-            urlparse(self.marketplace.endpoint).netloc,
-            uri,
-            query_string
-        ]
-        return base64.b64encode(
-            hmac.new(
-                self.secret_key.encode('utf-8'),
-                '\n'.join(to_sign).encode('utf-8'),
-                hashlib.sha256,
-            ).digest()
-        ).decode('utf-8')
+        return self.signer.sign(http_verb, uri, query_string)
 
     def build_query_string(self, params):
         """
@@ -221,20 +537,85 @@ class MWS(object):
         call urlencode because urlencode does not support quoting the
         way amazon wants, it always does quote_plus.
         """
-        query = []
-        for key in sorted(params.keys()):
-            value = params[key]
+        return build_query_string(params)
 
-            if isinstance(value, (date, datetime)):
-                value = value.isoformat()
 
-            if not isinstance(value, text):
-                value = str(value)
+class RequestAttempts(object):
+    """
+    The bookkeeping of the attempts at sending a request: signing,
+    events and hooks, retry decisions and stats. Shared by the
+    synchronous and asyncio clients, which only wait and send
+    differently.
+    """
 
-            query.append(
-                '{}={}'.format(
-                    quote(key, safe=MWS_SAFE),
-                    quote(value.encode('utf-8'), safe=MWS_SAFE)
-                )
-            )
-        return '&'.join(query)
+    def __init__(self, client, action, prepare):
+        self.client = client
+        self.action = action
+        self.prepare = prepare
+        self.stats = RetryStats()
+        self.prepared = None
+        self.signed_at = None
+        self.event = None
+        self._started = None
+
+    def start(self):
+        """
+        Start an attempt, before waiting for the quota.
+        """
+        self.event = self.client._new_event(
+            self.action, self.stats.attempts + 1
+        )
+        self._started = time.perf_counter()
+
+    def sign(self):
+        """
+        Returns the prepared request to send, signed again if the one of
+        the previous attempt is too old.
+        """
+        signed = time.perf_counter()
+        previous = self.prepared
+        self.prepared, self.signed_at = self.client._sign(
+            self.prepare, self.prepared, self.signed_at
+        )
+        self.stats.attempts += 1
+        event = self.event
+        if event is not None:
+            event.throttle_time = signed - self._started
+            if self.prepared is not previous:
+                event.sign_time = time.perf_counter() - signed
+            self.client._call_hooks('before_request', event)
+            self._started = time.perf_counter()
+        return self.prepared
+
+    def check(self, response, stream=False):
+        """
+        Raise the error of a response.
+        """
+        if self.event is not None:
+            self.event.network_time = time.perf_counter() - self._started
+            self.event.set_response(response, stream)
+        self.client._check_response(response)
+
+    def failed(self, error):
+        """
+        Returns the delay before the next attempt, or None if the error
+        is not retried.
+        """
+        if self.event is not None:
+            self.event.error = error
+            self.client._call_hooks('after_request', self.event)
+        if not self.client._should_retry(error, self.stats.attempts):
+            return None
+        delay = self.client.retry.get_delay(self.stats.attempts)
+        self.stats.retries += 1
+        self.stats.sleep_time += delay
+        return delay
+
+    def succeeded(self, stream=False):
+        self.client._complete_event(self.event, stream)
+
+    def record(self):
+        """
+        Record the stats of the request, once it succeeded or failed.
+        """
+        self.client._record_retry_stats(self.stats)
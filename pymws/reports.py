@@ -1,4 +1,8 @@
-from .utils import flatten_list
+from .columns import SCHEMAS, to_columns
+from .exceptions import MWSException, ProcessingCancelled
+from .pagination import Paginator
+from .tracking import ReportTracker
+from .utils import flatten_list, iter_xsv
 
 
 class Reports(object):
@@ -31,6 +35,52 @@ class Reports(object):
             'RequestReport', self.URI, kwargs, self.VERSION
         )
 
+    def fetch_report(self, ReportType, poller=None, timeout=None,
+                     chunk_size=65536, **kwargs):
+        """
+        Request a report, wait for it to be processed and return an
+        iterator over its raw contents (see :meth:`stream_report`).
+
+        The status of the request is polled when reports of the same
+        type are expected to be done (see
+        :class:`pymws.tracking.AdaptivePoller`). An empty iterator is
+        returned if the report has no data, and
+        :class:`pymws.exceptions.ProcessingCancelled` is raised if the
+        request was cancelled.
+
+        .. code-block:: python
+
+            chunks = client.reports.fetch_report(
+                '_GET_FLAT_FILE_OPEN_LISTINGS_DATA_'
+            )
+            for row in iter_xsv(chunks):
+                print(row['sku'])
+
+        :param timeout: Number of seconds after which
+                        :class:`pymws.exceptions.ProcessingTimeout` is
+                        raised if the report is still being processed.
+        """
+        response = self.request_report(ReportType=ReportType, **kwargs)
+        tracker = ReportTracker(self.client, poller=poller, timeout=timeout)
+        tracker.add_info(response.ReportRequestInfo)
+        for info in tracker:
+            status = info.ReportProcessingStatus.text.strip()
+            if status == '_CANCELLED_':
+                raise ProcessingCancelled(
+                    'Report request {} was cancelled'.format(
+                        info.ReportRequestId
+                    )
+                )
+            if status == '_DONE_NO_DATA_':
+                return iter([])
+            report_id = getattr(info, 'GeneratedReportId', None)
+            if report_id is None:
+                # Not given for some report types, find it in the list
+                report_id = self.get_report_list(
+                    ReportRequestIdList=[info.ReportRequestId.text]
+                ).ReportInfo.ReportId
+            return self.stream_report(report_id.text.strip(), chunk_size)
+
     def get_report_request_list(self, **kwargs):
         """
         Returns a list of report requests that you can use to get the
@@ -59,6 +109,18 @@ class Reports(object):
             {'NextToken': NextToken}, self.VERSION
         )
 
+    def iter_report_request_list(self, prefetch=0, **kwargs):
+        """
+        Iterate over the ReportRequestInfo of
+        :meth:`get_report_request_list` and all the following pages.
+        """
+        return Paginator(
+            lambda: self.get_report_request_list(**kwargs),
+            self.get_report_request_list_by_next_token,
+            'ReportRequestInfo',
+            prefetch=prefetch,
+        )
+
     def get_report_request_count(self, **kwargs):
         """
         Returns a count of report requests that have been submitted
@@ -107,6 +169,18 @@ class Reports(object):
             {'NextToken': NextToken}, self.VERSION
         )
 
+    def iter_report_list(self, prefetch=0, **kwargs):
+        """
+        Iterate over the ReportInfo of :meth:`get_report_list` and all
+        the following pages.
+        """
+        return Paginator(
+            lambda: self.get_report_list(**kwargs),
+            self.get_report_list_by_next_token,
+            'ReportInfo',
+            prefetch=prefetch,
+        )
+
     def get_report_count(self, **kwargs):
         """
         Returns a count of the reports, created in the previous 90 days,
@@ -129,3 +203,88 @@ class Reports(object):
             'GetReport', self.URI,
             {'ReportId': ReportId}, self.VERSION
         )
+
+    def stream_report(self, ReportId, chunk_size=65536):
+        """
+        Returns an iterator over the raw contents of a report in chunks
+        of `chunk_size` bytes, without loading the report in memory.
+
+        The Content-MD5 of the report is verified as the chunks are
+        consumed and :class:`pymws.exceptions.ContentMD5Mismatch` is
+        raised after the last chunk if it does not match.
+        """
+        return self.client.stream(
+            'GetReport', self.URI,
+            {'ReportId': ReportId}, self.VERSION,
+            chunk_size=chunk_size,
+        )
+
+    def download_report(self, ReportId, fileobj, chunk_size=65536):
+        """
+        Write the raw contents of a report to a binary file object and
+        return the number of bytes written.
+
+        .. code-block:: python
+
+            with open('settlement.tsv', 'wb') as f:
+                client.reports.download_report(report_id, f)
+        """
+        size = 0
+        for chunk in self.stream_report(ReportId, chunk_size):
+            fileobj.write(chunk)
+            size += len(chunk)
+        return size
+
+    def map_report(self, ReportId):
+        """
+        Returns a context manager giving a read only memory map of the
+        raw contents of a report, downloading it into the store of the
+        client first if needed (see :class:`pymws.store.ResultStore`).
+
+        .. code-block:: python
+
+            with client.reports.map_report(report_id) as data:
+                header = data[:data.find(b'\\n')]
+        """
+        if self.client.store is None:
+            raise MWSException('Reports can only be mapped from a store')
+        return self.client.store.map(self.client.fetch_stored(
+            'GetReport', self.URI, {'ReportId': ReportId}, self.VERSION
+        ))
+
+    def iter_report(self, ReportId, rows='dict', chunk_size=65536):
+        """
+        Lazily parse a flat file (TSV/CSV) report and yield its rows,
+        like :meth:`get_report` does but with a constant memory
+        footprint whatever the size of the report.
+
+        :param rows: Format of the rows, ``dict`` (default), ``tuple``
+                     or ``namedtuple``
+                     (see :class:`pymws.utils.XSVReader`). Tuples are
+                     the most compact.
+        """
+        return iter_xsv(
+            self.stream_report(ReportId, chunk_size),
+            "iso-8859-1",
+            rows=rows,
+        )
+
+    def get_report_columns(self, ReportId, ReportType=None, schema=None,
+                           as_numpy=False, chunk_size=65536):
+        """
+        Download a flat file report and parse it into typed columns
+        (see :func:`pymws.columns.to_columns`).
+
+        :param ReportType: Type of the report, used to look up the column
+                           types in :data:`pymws.columns.SCHEMAS`.
+        :param schema: Column types to use instead of the known schema
+                       of the report type.
+        :param as_numpy: Return numpy arrays instead of arrays and lists.
+        """
+        if schema is None:
+            schema = SCHEMAS.get(ReportType)
+        return to_columns(
+            self.iter_report(ReportId, rows='tuple', chunk_size=chunk_size),
+            schema=schema,
+            as_numpy=as_numpy,
+        )
@@ -0,0 +1,129 @@
+"""
+Retry throttled and failed requests with a jittered exponential backoff.
+
+.. code-block:: python
+
+    client = MWS(
+        'US', merchant_id='A1', ...,
+        retry=RetryPolicy(max_attempts=5, base_delay=2),
+    )
+    client.orders.list_orders(CreatedAfter=start_date)
+    print(client.last_retry_stats.retries)
+
+The delay before the n-th retry is drawn from
+``base_delay * 2 ** (n - 1)`` (capped at `max_delay`), of which the
+`jitter` fraction is randomized, so that many workers throttled at the
+same moment do not all come back at the same moment.
+"""
+import random
+import threading
+import time
+
+import requests
+
+from .exceptions import MWSError
+
+
+#: Error codes returned by MWS that are worth retrying.
+RETRYABLE_CODES = frozenset([
+    'RequestThrottled',
+    'InternalError',
+    'ServiceUnavailable',
+])
+
+#: HTTP status codes that are worth retrying.
+RETRYABLE_STATUS_CODES = frozenset([500, 502, 503, 504])
+
+
+class RetryStats(object):
+    """
+    Number of attempts and retries a request took, and the total
+    number of seconds slept between them.
+    """
+    __slots__ = ('attempts', 'retries', 'sleep_time')
+
+    def __init__(self, attempts=0, retries=0, sleep_time=0.0):
+        self.attempts = attempts
+        self.retries = retries
+        self.sleep_time = sleep_time
+
+    def __repr__(self):
+        return '<RetryStats attempts={} retries={} sleep_time={:.3f}>'.format(
+            self.attempts, self.retries, self.sleep_time
+        )
+
+
+class RetryPolicy(object):
+    """
+    Decides whether and when a failed request should be retried.
+
+    :param max_attempts: Maximum number of attempts including the
+                         first one.
+    :param base_delay: Delay in seconds before the first retry.
+    :param max_delay: Upper bound of the delay between two attempts.
+    :param jitter: Fraction of the delay that is randomized, between
+                   0 (no jitter) and 1 (full jitter).
+    :param retryable_codes: MWS error codes that are retried. Errors
+                            without a code are retried based on their
+                            HTTP status code.
+    :param retryable_status_codes: HTTP status codes that are retried.
+    :param retry_connection_errors: Also retry requests that failed
+                                    with a connection error or a
+                                    timeout.
+    """
+
+    def __init__(
+            self, max_attempts=5, base_delay=1.0, max_delay=60.0,
+            jitter=1.0, retryable_codes=RETRYABLE_CODES,
+            retryable_status_codes=RETRYABLE_STATUS_CODES,
+            retry_connection_errors=True,
+            sleep=time.sleep, random=random.random):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.retryable_codes = frozenset(retryable_codes)
+        self.retryable_status_codes = frozenset(retryable_status_codes)
+        self.retry_connection_errors = retry_connection_errors
+        self.sleep = sleep
+        self.random = random
+
+        #: Totals over all the requests made with this policy.
+        self.stats = RetryStats()
+        self._lock = threading.Lock()
+
+    def is_retryable(self, error):
+        """
+        Returns True if the error is worth retrying.
+        """
+        if isinstance(error, MWSError):
+            if error.code is not None:
+                return error.code in self.retryable_codes
+            return error.status_code in self.retryable_status_codes
+        if isinstance(error, (requests.ConnectionError, requests.Timeout)):
+            return self.retry_connection_errors
+        return False
+
+    def should_retry(self, error, attempt):
+        """
+        Returns True if a request that failed with `error` on its
+        `attempt`-th attempt should be tried again.
+        """
+        return attempt < self.max_attempts and self.is_retryable(error)
+
+    def get_delay(self, attempt):
+        """
+        Returns the number of seconds to wait after the `attempt`-th
+        attempt failed.
+        """
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return delay * (1 - self.jitter * self.random())
+
+    def record(self, stats):
+        """
+        Add the stats of a completed request to the totals.
+        """
+        with self._lock:
+            self.stats.attempts += stats.attempts
+            self.stats.retries += stats.retries
+            self.stats.sleep_time += stats.sleep_time
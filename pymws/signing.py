@@ -0,0 +1,126 @@
+"""
+Signing of MWS requests (Signature Version 2).
+
+Most of what goes into a signed request is the same for every call of
+a client: the host, the secret key and the authentication parameters.
+A :class:`Signer` prepares those once, so that each call only has to
+quote and merge in its own parameters.
+"""
+import base64
+from builtins import str as text
+from datetime import date, datetime
+import hashlib
+import heapq
+import hmac
+
+from .exceptions import MWSException
+
+try:
+    from urllib.parse import urlparse, quote
+except ImportError:
+    # py2
+    from urlparse import urlparse
+    from urllib import quote
+
+
+MWS_SAFE = '-_.~'.encode('utf-8')
+
+
+def quote_param(key, value):
+    """
+    Returns the quoted ``key=value`` pair of a parameter, the way
+    Amazon wants it.
+
+    This cannot use urlencode because urlencode does not support quoting
+    the way amazon wants, it always does quote_plus.
+    """
+    if isinstance(value, (date, datetime)):
+        value = value.isoformat()
+
+    if not isinstance(value, text):
+        value = str(value)
+
+    return '{}={}'.format(
+        quote(key, safe=MWS_SAFE),
+        quote(value.encode('utf-8'), safe=MWS_SAFE)
+    )
+
+
+def build_query_string(params):
+    """
+    create the query string to be signed
+
+    * Sort the UTF-8 query string components by parameter name
+    * URL encode the parameter name and values
+    """
+    return '&'.join(
+        quote_param(key, params[key]) for key in sorted(params.keys())
+    )
+
+
+class Signer(object):
+    """
+    Builds and signs the query strings of the requests of a seller to
+    an MWS endpoint.
+
+    The host, the HMAC key state and the quoted authentication
+    parameters are computed once when the signer is created.
+    """
+
+    def __init__(self, endpoint, access_key_id, secret_key,
+                 merchant_id, auth_token):
+        self.host = urlparse(endpoint).netloc
+        self._hmac = None
+        if secret_key is not None:
+            self._hmac = hmac.new(
+                secret_key.encode('utf-8'), digestmod=hashlib.sha256
+            )
+        self.constant_params = {
+            'AWSAccessKeyId': access_key_id,
+            'MWSAuthToken': auth_token,
+            'SellerId': merchant_id,
+            'SignatureMethod': 'HmacSHA256',
+            'SignatureVersion': '2',
+        }
+        self._constant = [
+            (key, quote_param(key, value))
+            for key, value in sorted(self.constant_params.items())
+        ]
+
+    def get_query_string(self, action, req_params, version):
+        """
+        Returns the sorted and quoted query string of a call.
+        """
+        params = {
+            'Action': action,
+            'Timestamp': datetime.utcnow().isoformat(),
+            'Version': version,
+        }
+        params.update(req_params)
+        constant = self._constant
+        if any(key in self.constant_params for key in params):
+            # The call overrides some of the constant parameters
+            constant = [item for item in constant if item[0] not in params]
+        return '&'.join(pair for _, pair in heapq.merge(
+            constant,
+            [
+                (key, quote_param(key, params[key]))
+                for key in sorted(params.keys())
+            ],
+        ))
+
+    def sign(self, http_verb, uri, query_string):
+        """
+        Returns the base64 encoded signature of a request.
+        """
+        if self._hmac is None:
+            raise MWSException('A secret key is required to sign requests')
+        to_sign = [
+            http_verb,
+            self.host,
+            uri,
+            query_string
+        ]
+        signature = self._hmac.copy()
+        signature.update('\n'.join(to_sign).encode('utf-8'))
+        return base64.b64encode(signature.digest()).decode('utf-8')
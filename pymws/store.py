@@ -0,0 +1,234 @@
+"""
+Local store of downloaded reports and feed processing results.
+
+The content of a report never changes for its ReportId, nor does the
+processing result of a feed for its FeedSubmissionId. A
+:class:`ResultStore` given to the client keeps them on disk the first
+time they are downloaded, so that they are read from the disk instead
+of MWS afterwards, across restarts and by other processes using the
+same directory.
+
+.. code-block:: python
+
+    client = MWS(
+        'US', merchant_id='1234', access_key_id='key',
+        secret_key='secret', store=ResultStore('/var/lib/pymws'),
+    )
+    for row in client.reports.iter_report(report_id):   # Downloaded
+        print(row['sku'])
+    with client.reports.map_report(report_id) as data:  # From disk
+        print(data[:100])
+
+Contents are addressed by their MD5 hash and verified against the
+Content-MD5 header of the response when they are downloaded. Each
+ReportId or FeedSubmissionId points to the hash of its content, so a
+content downloaded under two ids is only stored once.
+"""
+from collections import namedtuple
+from contextlib import contextmanager
+import base64
+import hashlib
+import json
+import mmap
+import os
+import tempfile
+
+from .exceptions import ContentMD5Mismatch
+
+try:
+    from urllib.parse import quote
+except ImportError:
+    # py2
+    from urllib import quote
+
+
+#: The actions whose results are stored, and the parameter identifying
+#: a result.
+STORED_ACTIONS = {
+    'GetReport': 'ReportId',
+    'GetFeedSubmissionResult': 'FeedSubmissionId',
+}
+
+StoredResult = namedtuple(
+    'StoredResult', ['path', 'md5', 'content_type', 'encoding', 'size']
+)
+
+
+class ResultStore(object):
+    """
+    Keeps the results of :data:`STORED_ACTIONS` in `directory`.
+
+    Files are written to a temporary file first and moved in place
+    once complete and verified, so an interrupted download never leaves
+    a partial result behind.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        for name in ('objects', 'refs'):
+            path = os.path.join(directory, name)
+            if not os.path.isdir(path):
+                os.makedirs(path)
+
+    def is_stored(self, action):
+        return action in STORED_ACTIONS
+
+    def get_key(self, action, params):
+        """
+        Returns the id of the result of a call, or None if the result of
+        the call is not stored.
+        """
+        param = STORED_ACTIONS.get(action)
+        if param is None or params.get(param) is None:
+            return None
+        return str(params[param])
+
+    def _ref_path(self, action, key):
+        return os.path.join(
+            self.directory, 'refs', action, quote(key, safe='')
+        )
+
+    def _object_path(self, md5):
+        digest = base64.b64decode(md5.encode('utf-8'))
+        hexdigest = base64.b16encode(digest).decode('utf-8').lower()
+        return os.path.join(
+            self.directory, 'objects', hexdigest[:2], hexdigest
+        )
+
+    def get(self, action, key):
+        """
+        Returns the :class:`StoredResult` of an id, or None if it is
+        not in the store.
+        """
+        try:
+            with open(self._ref_path(action, key), 'rb') as f:
+                ref = json.loads(f.read().decode('utf-8'))
+        except (IOError, OSError, ValueError):
+            return None
+        path = self._object_path(ref['md5'])
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return None
+        return StoredResult(
+            path, ref['md5'], ref['content_type'], ref['encoding'], size
+        )
+
+    def put(self, action, key, chunks, content_type=None, encoding=None,
+            expected_md5=None):
+        """
+        Write an iterable of byte chunks to the store and return its
+        :class:`StoredResult`.
+
+        :param expected_md5: The base64 encoded MD5 the content must
+                             have (the Content-MD5 header of the
+                             response). If it does not match,
+                             :class:`pymws.exceptions.ContentMD5Mismatch`
+                             is raised and nothing is stored.
+        """
+        hasher = hashlib.md5()
+        fd, tmp_path = tempfile.mkstemp(
+            prefix='.', dir=os.path.join(self.directory, 'objects')
+        )
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in chunks:
+                    hasher.update(chunk)
+                    f.write(chunk)
+            md5 = base64.b64encode(hasher.digest()).decode('utf-8')
+            if expected_md5 and md5 != expected_md5:
+                raise ContentMD5Mismatch(
+                    'Content-MD5 of body is {} but expected {}'.format(
+                        md5, expected_md5
+                    )
+                )
+            path = self._object_path(md5)
+            self._makedirs(path)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        ref_path = self._ref_path(action, key)
+        self._makedirs(ref_path)
+        self._write_atomic(ref_path, json.dumps({
+            'md5': md5,
+            'content_type': content_type,
+            'encoding': encoding,
+        }).encode('utf-8'))
+        return StoredResult(
+            path, md5, content_type, encoding, os.path.getsize(path)
+        )
+
+    def delete(self, action, key):
+        """
+        Forget the result of an id. The content is left in place, other
+        ids may point to it.
+        """
+        try:
+            os.remove(self._ref_path(action, key))
+        except OSError:
+            pass
+
+    def verify(self, result):
+        """
+        Returns True if the content of a stored result still matches
+        its MD5.
+        """
+        hasher = hashlib.md5()
+        for chunk in self.iter_chunks(result):
+            hasher.update(chunk)
+        return base64.b64encode(hasher.digest()).decode('utf-8') == \
+            result.md5
+
+    def iter_chunks(self, result, chunk_size=65536):
+        """
+        Iterate over the content of a stored result in chunks.
+        """
+        with open(result.path, 'rb') as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+
+    def read(self, result):
+        with open(result.path, 'rb') as f:
+            return f.read()
+
+    @contextmanager
+    def map(self, result):
+        """
+        Context manager giving a read only memory map of the content of
+        a stored result. The content is paged in by the OS as it is
+        read, so it can be parsed without being loaded in memory.
+        """
+        if not result.size:
+            # Empty files cannot be mapped
+            yield b''
+            return
+        with open(result.path, 'rb') as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                yield data
+            finally:
+                data.close()
+
+    def _makedirs(self, path):
+        directory = os.path.dirname(path)
+        if not os.path.isdir(directory):
+            try:
+                os.makedirs(directory)
+            except OSError:
+                # Created by another process in the meantime
+                if not os.path.isdir(directory):
+                    raise
+
+    def _write_atomic(self, path, data):
+        fd, tmp_path = tempfile.mkstemp(
+            prefix='.', dir=os.path.dirname(path)
+        )
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
@@ -0,0 +1,238 @@
+"""
+Incremental synchronization of orders.
+
+Fetching the orders of a wide, overlapping window every time gets the
+same orders again and again. An :class:`OrderSync` remembers, for each
+seller and marketplace, up to when orders were synchronized (the
+watermark) and only asks for the orders updated since, yielding the
+orders that are new or changed.
+
+.. code-block:: python
+
+    sync = OrderSync(
+        client, JSONCheckpointStore('/var/lib/pymws/orders.json'),
+        start_date=datetime(2020, 1, 1, tzinfo=timezone.utc),
+    )
+    for order in sync.sync():
+        save_order(order)
+
+The NextToken of the last page consumed is saved in the checkpoint
+store after each page. If the process stops in the middle of a
+synchronization, the next one resumes from it instead of starting over.
+The orders seen during a synchronization are only saved at its end, to
+keep the checkpoint saved for each page small, so after a resume orders
+of the page that was being consumed, or listed again on later pages,
+may be yielded again: the synchronization is at least once. The same
+goes for all the orders of the window when the saved NextToken has
+expired and the window is listed again from its first page.
+"""
+from datetime import datetime, timedelta, timezone
+import json
+import os
+import tempfile
+import threading
+
+from .columns import parse_report_date
+from .exceptions import MWSError, MWSException
+from .pagination import get_next_token, get_records
+
+
+#: Error codes of a NextToken that is invalid or has expired
+INVALID_TOKEN_CODES = ('InvalidParameterValue',)
+
+
+def utcnow():
+    return datetime.now(timezone.utc)
+
+
+class MemoryCheckpointStore(object):
+    """
+    Keeps the checkpoints in memory, for the life of the process.
+    """
+
+    def __init__(self):
+        self._checkpoints = {}
+        self._lock = threading.Lock()
+
+    def load(self, key):
+        with self._lock:
+            checkpoint = self._checkpoints.get(key)
+            return json.loads(checkpoint) if checkpoint else None
+
+    def save(self, key, checkpoint):
+        with self._lock:
+            self._checkpoints[key] = json.dumps(checkpoint)
+
+
+class JSONCheckpointStore(object):
+    """
+    Keeps the checkpoints of all the keys in a JSON file, replaced
+    atomically on every save.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _read(self):
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (IOError, OSError):
+            return {}
+
+    def load(self, key):
+        with self._lock:
+            return self._read().get(key)
+
+    def save(self, key, checkpoint):
+        with self._lock:
+            checkpoints = self._read()
+            checkpoints[key] = checkpoint
+            directory = os.path.dirname(os.path.abspath(self.path))
+            fd, tmp_path = tempfile.mkstemp(prefix='.', dir=directory)
+            with os.fdopen(fd, 'w') as f:
+                json.dump(checkpoints, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
+
+
+class OrderSync(object):
+    """
+    Synchronize the orders of the seller of a client.
+
+    :param client: The :class:`pymws.MWS` client of the seller.
+    :param store: Checkpoint store, a :class:`MemoryCheckpointStore` by
+                  default. Any object with ``load(key)`` and
+                  ``save(key, checkpoint)`` methods storing JSON
+                  serializable dictionaries can be used.
+    :param start_date: Timezone aware datetime to synchronize from the
+                       first time, when there is no checkpoint.
+    :param MarketplaceIds: Marketplaces of the orders, the marketplace
+                           of the client by default.
+    :param overlap: Number of seconds the window of a synchronization
+                    overlaps the previous one, so that orders updated
+                    at the boundary are not missed. Orders seen by the
+                    previous synchronization are not yielded again.
+    :param delay: Number of seconds before now the window ends. MWS
+                  requires at least two minutes.
+    :param kwargs: Other parameters of :meth:`pymws.orders.Orders.list_orders`,
+                   like OrderStatus or FulfillmentChannel.
+    """  # noqa: E501
+
+    def __init__(self, client, store=None, start_date=None,
+                 MarketplaceIds=None, overlap=300, delay=180,
+                 clock=utcnow, **kwargs):
+        self.client = client
+        self.store = store if store is not None else MemoryCheckpointStore()
+        self.start_date = start_date
+        self.marketplace_ids = MarketplaceIds or [client.marketplace.id]
+        self.overlap = timedelta(seconds=overlap)
+        self.delay = timedelta(seconds=delay)
+        self.clock = clock
+        self.params = kwargs
+
+    @property
+    def key(self):
+        """
+        The key of the checkpoint of the seller and marketplaces.
+        """
+        return '{}:{}'.format(
+            self.client.merchant_id, ','.join(sorted(self.marketplace_ids))
+        )
+
+    def get_checkpoint(self):
+        checkpoint = self.store.load(self.key)
+        if checkpoint is None:
+            if self.start_date is None:
+                raise MWSException(
+                    'A start date is required for the first '
+                    'synchronization of {}'.format(self.key)
+                )
+            checkpoint = {
+                'watermark': self.start_date.isoformat(),
+                'seen': {},
+            }
+        return checkpoint
+
+    @property
+    def watermark(self):
+        """
+        The date up to which orders have been synchronized.
+        """
+        return parse_report_date(self.get_checkpoint()['watermark'])
+
+    def sync(self):
+        """
+        Yield the orders created or updated since the last
+        synchronization.
+        """
+        checkpoint = self.get_checkpoint()
+        cycle = checkpoint.get('cycle')
+        page = None
+        if cycle is not None and cycle.get('next_token'):
+            try:
+                page = self.client.orders.list_orders_by_next_token(
+                    cycle['next_token']
+                )
+            except MWSError as error:
+                if error.code not in INVALID_TOKEN_CODES:
+                    raise
+                # The token expired, start the window again. Only the
+                # orders of previous synchronizations are skipped, the
+                # ones already yielded by this window are yielded again
+                page = None
+        if cycle is None:
+            before = self.clock() - self.delay
+            after = parse_report_date(checkpoint['watermark']) - \
+                self.overlap
+            cycle = checkpoint['cycle'] = {
+                'after': min(after, before).isoformat(),
+                'before': before.isoformat(),
+            }
+        if page is None:
+            page = self.client.orders.list_orders(**self._get_params(cycle))
+
+        # Only the orders seen by the previous synchronizations are
+        # saved with each page, the checkpoint stays the same size
+        seen = dict(checkpoint['seen'])
+        while page is not None:
+            for order in get_records(page, 'Orders.Order'):
+                order_id = order.AmazonOrderId.text
+                last_update = order.LastUpdateDate.text
+                if seen.get(order_id) == last_update:
+                    continue
+                seen[order_id] = last_update
+                yield order
+            next_token = get_next_token(page)
+            cycle['next_token'] = next_token
+            self.store.save(self.key, checkpoint)
+            page = None
+            if next_token is not None:
+                page = self.client.orders.list_orders_by_next_token(
+                    next_token
+                )
+
+        self._complete(checkpoint, seen)
+
+    def _get_params(self, cycle):
+        params = dict(self.params)
+        for index, marketplace_id in enumerate(self.marketplace_ids, 1):
+            params['MarketplaceId.Id.{}'.format(index)] = marketplace_id
+        params['LastUpdatedAfter'] = cycle['after']
+        params['LastUpdatedBefore'] = cycle['before']
+        return params
+
+    def _complete(self, checkpoint, seen):
+        """
+        Move the watermark to the end of the window and keep the orders
+        seen that the next window can return.
+        """
+        watermark = checkpoint.pop('cycle')['before']
+        horizon = parse_report_date(watermark) - self.overlap
+        checkpoint['watermark'] = watermark
+        checkpoint['seen'] = dict(
+            (order_id, last_update)
+            for order_id, last_update in seen.items()
+            if parse_report_date(last_update) >= horizon
+        )
+        self.store.save(self.key, checkpoint)
@@ -0,0 +1,337 @@
+"""
+Client side throttling that models the published MWS quotas.
+
+Amazon MWS throttles every operation with a leaky bucket algorithm:
+each operation has a maximum request quota (the burst) and a restore
+rate at which the quota is refilled. Instead of discovering the limits
+through ``RequestThrottled`` errors, a :class:`Throttle` holds requests
+locally until the bucket for the operation has a token free.
+
+.. code-block:: python
+
+    throttle = Throttle()
+    client_1 = MWS('US', merchant_id='A1', ..., throttle=throttle)
+    client_2 = MWS('US', merchant_id='A1', ..., throttle=throttle)
+
+A throttle is thread safe and can be shared across any number of
+clients and threads. Buckets are kept per seller, endpoint and
+operation, so clients for different sellers never wait on each other.
+"""
+from collections import namedtuple
+import threading
+import time
+
+from .hooks import Hook
+
+
+#: Quota of an MWS operation.
+#:
+#: * `max_burst`: maximum number of requests that can be made at once.
+#: * `restore_rate`: seconds it takes to restore one request.
+Quota = namedtuple('Quota', ['max_burst', 'restore_rate'])
+
+
+#: Published throttling limits of the operations implemented by this
+#: package, as documented in the throttling section of the MWS
+#: developer guide.
+QUOTAS = {
+    # Orders
+    'ListOrders': Quota(6, 60),
+    'GetOrder': Quota(6, 60),
+    'ListOrderItems': Quota(30, 2),
+    'GetServiceStatus': Quota(2, 300),
+
+    # Reports
+    'RequestReport': Quota(15, 60),
+    'GetReportRequestList': Quota(10, 45),
+    'GetReportRequestListByNextToken': Quota(30, 2),
+    'GetReportRequestCount': Quota(10, 45),
+    'CancelReportRequests': Quota(10, 45),
+    'GetReportList': Quota(10, 60),
+    'GetReportListByNextToken': Quota(30, 2),
+    'GetReportCount': Quota(10, 45),
+    'GetReport': Quota(15, 60),
+
+    # Feeds
+    'SubmitFeed': Quota(15, 120),
+    'GetFeedSubmissionList': Quota(10, 45),
+    'GetFeedSubmissionListByNextToken': Quota(30, 2),
+    'GetFeedSubmissionCount': Quota(10, 45),
+    'CancelFeedSubmissions': Quota(10, 45),
+    'GetFeedSubmissionResult': Quota(15, 60),
+
+    # Fulfillment inbound shipment
+    'ListInboundShipments': Quota(30, 0.5),
+    'ListInboundShipmentItems': Quota(30, 0.5),
+
+    # Fulfillment outbound shipment
+    'CreateFulfillmentOrder': Quota(30, 0.5),
+    'GetFulfillmentOrder': Quota(30, 0.5),
+}
+
+#: Operations that do not have a quota of their own, but draw from the
+#: quota of another operation.
+SHARED_QUOTAS = {
+    'ListOrdersByNextToken': 'ListOrders',
+    'ListOrderItemsByNextToken': 'ListOrderItems',
+    'ListInboundShipmentsByNextToken': 'ListInboundShipments',
+    'ListInboundShipmentItemsByNextToken': 'ListInboundShipmentItems',
+}
+
+
+class TokenBucket(object):
+    """
+    A token bucket that refills one token every `restore_rate` seconds
+    up to `max_burst` tokens.
+
+    Tokens are reserved rather than taken: when the bucket is empty the
+    reservation goes into debt and the caller is told how long to wait
+    for its token. This keeps waiting callers in the order they arrived.
+
+    The bucket is not thread safe by itself, :class:`Throttle`
+    serializes access to it.
+    """
+
+    def __init__(self, max_burst, restore_rate, now):
+        self.max_burst = max_burst
+        self.restore_rate = restore_rate
+        self.tokens = float(max_burst)
+        self.updated_at = now
+
+    def refill(self, now):
+        elapsed = now - self.updated_at
+        if elapsed > 0:
+            self.tokens = min(
+                float(self.max_burst),
+                self.tokens + elapsed / self.restore_rate
+            )
+            self.updated_at = now
+
+    def reserve(self, now):
+        """
+        Reserve a token and return the number of seconds to wait
+        before it can be used.
+        """
+        self.refill(now)
+        self.tokens -= 1
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens * self.restore_rate
+
+    def available(self, now):
+        """
+        Returns True if a token can be used right away.
+        """
+        self.refill(now)
+        return self.tokens >= 1
+
+
+class Throttle(object):
+    """
+    Schedules requests so that they stay within the MWS quotas.
+
+    :param quotas: A dictionary of operation name to :class:`Quota`
+                   that overrides or extends :data:`QUOTAS`.
+    :param clock: Function returning a monotonic time in seconds.
+    :param sleep: Function used to wait for a token.
+    """
+
+    def __init__(self, quotas=None, clock=time.monotonic, sleep=time.sleep):
+        self.quotas = dict(QUOTAS)
+        if quotas:
+            self.quotas.update(quotas)
+        self.clock = clock
+        self.sleep = sleep
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def get_quota_action(self, action):
+        """
+        Returns the name of the operation whose quota `action` uses.
+        """
+        return SHARED_QUOTAS.get(action, action)
+
+    def _get_bucket(self, seller_id, endpoint, action, now):
+        action = self.get_quota_action(action)
+        quota = self.quotas.get(action)
+        if quota is None:
+            return None
+        key = (seller_id, endpoint, action)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(
+                quota.max_burst, quota.restore_rate, now
+            )
+        return bucket
+
+    def reserve(self, seller_id, endpoint, action):
+        """
+        Reserve a request slot and return the number of seconds the
+        caller must wait before making the request.
+
+        Operations without a known quota are never delayed.
+        """
+        with self._lock:
+            now = self.clock()
+            bucket = self._get_bucket(seller_id, endpoint, action, now)
+            if bucket is None:
+                return 0.0
+            return bucket.reserve(now)
+
+    def acquire(self, seller_id, endpoint, action):
+        """
+        Block until a request for the operation can be made. Returns
+        the number of seconds spent waiting.
+        """
+        delay = self.reserve(seller_id, endpoint, action)
+        if delay > 0:
+            self.sleep(delay)
+        return delay
+
+    def available(self, seller_id, endpoint, action):
+        """
+        Returns True if a request for the operation could be made
+        right away without waiting.
+        """
+        with self._lock:
+            now = self.clock()
+            bucket = self._get_bucket(seller_id, endpoint, action, now)
+            if bucket is None:
+                return True
+            return bucket.available(now)
+
+
+#: Hourly request quota of an operation as last reported by MWS in the
+#: ``x-mws-quota-*`` headers of a response.
+#:
+#: * `max`: requests allowed in the hour.
+#: * `remaining`: requests left until the quota resets.
+#: * `resets_on`: timezone aware datetime the quota resets on.
+#: * `updated`: time (of the clock of the tracker) of the response.
+QuotaState = namedtuple(
+    'QuotaState', ['max', 'remaining', 'resets_on', 'updated']
+)
+
+
+class QuotaTracker(Hook):
+    """
+    Track the hourly quotas MWS reports in the response headers, per
+    seller, endpoint and operation, and optionally spread the remaining
+    requests until the quota resets instead of using them all at once.
+
+    The tracker is a hook (see :mod:`pymws.hooks`), it can be shared by
+    the clients of many sellers:
+
+    .. code-block:: python
+
+        quotas = QuotaTracker(slowdown=True)
+        client = MWS(..., hooks=[quotas])
+        client.orders.list_orders(CreatedAfter=start_date)
+        print(quotas.get(
+            client.merchant_id, client.marketplace.endpoint, 'ListOrders'
+        ))
+
+    Requests are held from the hook, which blocks the event loop of an
+    :class:`pymws.aio.AsyncMWS` client: with the asyncio client, leave
+    `slowdown` off and await ``asyncio.sleep(tracker.get_delay(...))``
+    instead.
+
+    :param slowdown: Hold requests when the quota is getting low.
+    :param slowdown_below: Fraction of the quota remaining below which
+                           requests are spread evenly until the reset.
+    :param max_delay: Maximum number of seconds a request is held. The
+                      request is already signed at that point, so it
+                      must stay well within the 15 minutes MWS accepts.
+    :param clock: Function returning the current time in seconds since
+                  the epoch.
+    :param sleep: Function used to hold requests.
+    """
+
+    def __init__(self, slowdown=False, slowdown_below=0.2, max_delay=60.0,
+                 clock=time.time, sleep=time.sleep):
+        self.slowdown = slowdown
+        self.slowdown_below = slowdown_below
+        self.max_delay = max_delay
+        self.clock = clock
+        self.sleep = sleep
+        self._states = {}
+        self._last_requests = {}
+        self._lock = threading.Lock()
+
+    def get(self, seller_id, endpoint, action):
+        """
+        Returns the :class:`QuotaState` of an operation, or None if MWS
+        did not report it yet or if it has reset since. Operations that
+        share a quota (see :data:`SHARED_QUOTAS`) share their state.
+        """
+        with self._lock:
+            return self._get(
+                self._get_key(seller_id, endpoint, action), self.clock()
+            )
+
+    def _get_key(self, seller_id, endpoint, action):
+        return (seller_id, endpoint, SHARED_QUOTAS.get(action, action))
+
+    def _get(self, key, now):
+        state = self._states.get(key)
+        if state is None or (
+                state.resets_on is not None and
+                state.resets_on.timestamp() <= now):
+            return None
+        return state
+
+    def get_delay(self, seller_id, endpoint, action):
+        """
+        Returns the number of seconds to wait before the next request
+        of the operation so that the remaining quota lasts until it
+        resets.
+        """
+        key = self._get_key(seller_id, endpoint, action)
+        with self._lock:
+            now = self.clock()
+            state = self._get(key, now)
+            if state is None or state.max is None or \
+                    state.remaining is None or state.resets_on is None or \
+                    state.remaining > state.max * self.slowdown_below:
+                return 0.0
+            until_reset = state.resets_on.timestamp() - now
+            if state.remaining < 1:
+                return min(until_reset, self.max_delay)
+            last_request = self._last_requests.get(key, state.updated)
+            interval = until_reset / state.remaining
+            delay = interval - (now - last_request)
+            return min(max(delay, 0.0), self.max_delay)
+
+    def before_request(self, event):
+        if self.slowdown:
+            delay = self.get_delay(
+                event.seller_id, event.endpoint, event.action
+            )
+            if delay > 0:
+                self.sleep(delay)
+                event.throttle_time += delay
+        key = self._get_key(event.seller_id, event.endpoint, event.action)
+        with self._lock:
+            self._last_requests[key] = self.clock()
+
+    def after_request(self, event):
+        if event.quota_remaining is None:
+            return
+        key = self._get_key(event.seller_id, event.endpoint, event.action)
+        with self._lock:
+            self._states[key] = QuotaState(
+                event.quota_max, event.quota_remaining,
+                event.quota_resets_on, self.clock(),
+            )
+
+    def get_states(self):
+        """
+        Returns a dictionary of ``(seller_id, endpoint, action)`` to
+        :class:`QuotaState` of the quotas that did not reset yet.
+        """
+        with self._lock:
+            now = self.clock()
+            return dict(
+                (key, state) for key, state in self._states.items()
+                if self._get(key, now) is not None
+            )
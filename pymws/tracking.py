@@ -0,0 +1,354 @@
+"""
+Tracking of report requests and feed submissions until they are
+processed.
+
+Report requests and feed submissions are processed asynchronously by
+Amazon: their status has to be polled until it is final. Polling too
+often wastes the quota of the status operation, polling too rarely adds
+latency. A :class:`ReportTracker` or a :class:`FeedTracker` checks the
+status of any number of requests at once, in batches of a single call,
+and polls them according to how long requests of the same type usually
+take.
+
+.. code-block:: python
+
+    tracker = ReportTracker(client)
+    for report_type in report_types:
+        response = client.reports.request_report(ReportType=report_type)
+        tracker.add_info(response.ReportRequestInfo)
+    for info in tracker:
+        print(info.ReportRequestId, info.ReportProcessingStatus)
+
+When a single report is needed,
+:meth:`pymws.reports.Reports.fetch_report` does it all.
+
+The processing results of feeds are downloaded concurrently as the
+feeds are done::
+
+    tracker = FeedTracker(client)
+    for feed_submission_id in feed_submission_ids:
+        tracker.add(feed_submission_id)
+    for info, result in tracker.iter_results(max_workers=4):
+        print(info.FeedSubmissionId, result.ProcessingReport.StatusCode)
+"""
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import threading
+import time
+
+from .columns import parse_report_date
+from .exceptions import ProcessingTimeout
+from .pagination import get_records
+
+
+class AdaptivePoller(object):
+    """
+    Decides when to poll a request again, from how long requests of the
+    same kind took so far.
+
+    The durations of each kind (a report type for example) are averaged
+    with an exponentially weighted moving average. A request is polled
+    again when it is expected to be done, and then less and less often
+    the longer it is overdue.
+
+    :param min_delay: Minimum number of seconds between two polls of a
+                      request.
+    :param max_delay: Maximum number of seconds between two polls of a
+                      request.
+    :param initial_estimate: Expected duration of requests of a kind
+                             that has not been seen yet.
+    :param smoothing: Weight of the latest duration in the average.
+    :param backoff: Growth of the delay between polls of an overdue
+                    request, relative to how long it is overdue.
+    """
+
+    def __init__(self, min_delay=15.0, max_delay=300.0,
+                 initial_estimate=60.0, smoothing=0.3, backoff=0.5):
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.initial_estimate = initial_estimate
+        self.smoothing = smoothing
+        self.backoff = backoff
+        self._estimates = {}
+        self._lock = threading.Lock()
+
+    def record(self, kind, duration):
+        """
+        Record how long a request of a kind took to be processed.
+        """
+        with self._lock:
+            estimate = self._estimates.get(kind)
+            if estimate is None:
+                self._estimates[kind] = duration
+            else:
+                self._estimates[kind] = \
+                    estimate + self.smoothing * (duration - estimate)
+
+    def estimate(self, kind):
+        """
+        Returns the expected duration of a request of a kind.
+        """
+        return self._estimates.get(kind, self.initial_estimate)
+
+    def get_delay(self, kind, elapsed):
+        """
+        Returns the number of seconds to wait before polling again a
+        request of a kind submitted `elapsed` seconds ago.
+        """
+        remaining = self.estimate(kind) - elapsed
+        if remaining > 0:
+            delay = remaining
+        else:
+            delay = -remaining * self.backoff
+        return min(self.max_delay, max(self.min_delay, delay))
+
+
+#: Poller shared by the trackers that are not given one, so that the
+#: durations learnt by one are used by the next.
+default_poller = AdaptivePoller()
+
+
+class StatusTracker(object):
+    """
+    Base class of the trackers. Subclasses implement
+    :meth:`get_statuses` and describe the status records with the
+    class attributes.
+
+    :param client: The :class:`pymws.MWS` client to poll with.
+    :param poller: :class:`AdaptivePoller` deciding when to poll,
+                   :data:`default_poller` by default.
+    :param batch_size: Maximum number of requests checked in one call.
+    :param timeout: Number of seconds after which
+                    :class:`pymws.exceptions.ProcessingTimeout` is
+                    raised if requests are still pending.
+    """
+    #: Maximum number of ids in the list of a status call
+    BATCH_SIZE = 100
+    #: Element of the id in a status record
+    ID_FIELD = None
+    #: Element of the kind in a status record
+    KIND_FIELD = None
+    #: Element of the status in a status record
+    STATUS_FIELD = None
+    #: Elements of the submitted and completed dates in a status record
+    DATE_FIELDS = (None, None)
+    #: Statuses after which a request does not change anymore
+    FINAL_STATUSES = ('_DONE_', '_CANCELLED_')
+
+    def __init__(self, client, poller=None, batch_size=None, timeout=None,
+                 clock=time.time, sleep=time.sleep):
+        self.client = client
+        self.poller = poller if poller is not None else default_poller
+        self.batch_size = batch_size or self.BATCH_SIZE
+        self.timeout = timeout
+        self.clock = clock
+        self.sleep = sleep
+        #: Ids of the pending requests and their kind, submission time
+        #: and next poll time
+        self._pending = {}
+
+    def __len__(self):
+        return len(self._pending)
+
+    def add(self, request_id, kind=None, submitted=None):
+        """
+        Track a request.
+
+        :param kind: Type of the request, learnt from the first status
+                     check if not given.
+        :param submitted: Time (from the clock of the tracker) the
+                          request was submitted at, now by default.
+        """
+        now = self.clock()
+        submitted = now if submitted is None else submitted
+        self._pending[str(request_id)] = [
+            kind, submitted,
+            now + self.poller.get_delay(kind, now - submitted),
+        ]
+
+    def add_info(self, info):
+        """
+        Track a request from the status record returned when it was
+        submitted.
+        """
+        self.add(self._get(info, self.ID_FIELD),
+                 self._get(info, self.KIND_FIELD))
+
+    def get_statuses(self, request_ids):
+        """
+        Returns the status records of a batch of requests.
+        """
+        raise NotImplementedError
+
+    def __iter__(self):
+        """
+        Poll the pending requests and yield their status records as
+        they reach a final status.
+        """
+        deadline = self._get_deadline()
+        while self._pending:
+            delay = self._get_poll_delay(deadline)
+            if delay > 0:
+                self.sleep(delay)
+            for info in self._poll():
+                yield info
+
+    def _get_deadline(self):
+        if self.timeout is None:
+            return None
+        return self.clock() + self.timeout
+
+    def _get_poll_delay(self, deadline):
+        """
+        Returns the number of seconds until the next poll, or raise
+        :class:`pymws.exceptions.ProcessingTimeout` if it is after the
+        deadline.
+        """
+        next_poll = min(item[2] for item in self._pending.values())
+        if deadline is not None and next_poll > deadline:
+            raise ProcessingTimeout(
+                'Requests still pending after {} seconds'.format(
+                    self.timeout
+                ),
+                pending=sorted(self._pending),
+            )
+        return max(next_poll - self.clock(), 0)
+
+    def _poll(self):
+        """
+        Check the status of the requests that are due, filling the batch
+        with the requests that will be due next since it costs nothing
+        more.
+        """
+        batch = sorted(
+            self._pending, key=lambda request_id: self._pending[request_id][2]
+        )[:self.batch_size]
+        now = self.clock()
+        done = []
+        for info in self.get_statuses(batch):
+            request_id = self._get(info, self.ID_FIELD)
+            item = self._pending.get(request_id)
+            if item is None:
+                continue
+            if item[0] is None:
+                item[0] = self._get(info, self.KIND_FIELD)
+            if self._get(info, self.STATUS_FIELD) in self.FINAL_STATUSES:
+                self.poller.record(
+                    item[0], self._get_duration(info, now - item[1])
+                )
+                del self._pending[request_id]
+                done.append(info)
+        now = self.clock()
+        for request_id in batch:
+            item = self._pending.get(request_id)
+            if item is not None:
+                item[2] = now + self.poller.get_delay(item[0], now - item[1])
+        return done
+
+    def _get(self, info, field):
+        value = getattr(info, field, None)
+        if value is None:
+            return None
+        return value.text.strip()
+
+    def _get_duration(self, info, default):
+        """
+        Returns the processing duration of a request from its dates,
+        which are more accurate than the polls.
+        """
+        submitted, completed = [
+            self._get(info, field) for field in self.DATE_FIELDS
+        ]
+        if not submitted or not completed:
+            return default
+        return (
+            parse_report_date(completed) - parse_report_date(submitted)
+        ).total_seconds()
+
+
+class ReportTracker(StatusTracker):
+    """
+    Track report requests until they are processed, checking up to 100
+    of them with a single GetReportRequestList call.
+
+    Yields the ReportRequestInfo of each request once it is _DONE_,
+    _DONE_NO_DATA_ or _CANCELLED_.
+    """
+    ID_FIELD = 'ReportRequestId'
+    KIND_FIELD = 'ReportType'
+    STATUS_FIELD = 'ReportProcessingStatus'
+    DATE_FIELDS = ('SubmittedDate', 'CompletedDate')
+    FINAL_STATUSES = ('_DONE_', '_DONE_NO_DATA_', '_CANCELLED_')
+
+    def get_statuses(self, request_ids):
+        response = self.client.reports.get_report_request_list(
+            ReportRequestIdList=list(request_ids),
+            MaxCount=len(request_ids),
+        )
+        return get_records(response, 'ReportRequestInfo')
+
+
+class FeedTracker(StatusTracker):
+    """
+    Track feed submissions until they are processed, checking up to 100
+    of them with a single GetFeedSubmissionList call.
+
+    Yields the FeedSubmissionInfo of each submission once it is _DONE_
+    or _CANCELLED_.
+    """
+    ID_FIELD = 'FeedSubmissionId'
+    KIND_FIELD = 'FeedType'
+    STATUS_FIELD = 'FeedProcessingStatus'
+    DATE_FIELDS = ('SubmittedDate', 'CompletedProcessingDate')
+
+    def get_statuses(self, request_ids):
+        response = self.client.feeds.get_feed_submission_list(
+            FeedSubmissionIdList=list(request_ids),
+            MaxCount=len(request_ids),
+        )
+        return get_records(response, 'FeedSubmissionInfo')
+
+    def iter_results(self, max_workers=4):
+        """
+        Yield ``(FeedSubmissionInfo, result)`` tuples as the submissions
+        are done, the results of
+        :meth:`pymws.feeds.Feeds.get_feed_submission_result` being
+        downloaded on a pool of `max_workers` threads while the
+        remaining submissions are polled. The result of a cancelled
+        submission is None.
+        """
+        def get_result(info):
+            if self._get(info, self.STATUS_FIELD) != '_DONE_':
+                return None
+            return self.client.feeds.get_feed_submission_result(
+                self._get(info, self.ID_FIELD)
+            )
+
+        deadline = self._get_deadline()
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        downloads = {}
+        try:
+            while self._pending or downloads:
+                for future in [f for f in downloads if f.done()]:
+                    yield downloads.pop(future), future.result()
+                if not self._pending:
+                    if downloads:
+                        wait(downloads, return_when=FIRST_COMPLETED)
+                    continue
+                delay = self._get_poll_delay(deadline)
+                if delay > 0:
+                    if downloads:
+                        # Yield the downloads completed before the poll
+                        done, _ = wait(
+                            downloads, timeout=delay,
+                            return_when=FIRST_COMPLETED,
+                        )
+                        if done:
+                            continue
+                    else:
+                        self.sleep(delay)
+                for info in self._poll():
+                    downloads[executor.submit(get_result, info)] = info
+        finally:
+            for future in downloads:
+                future.cancel()
+            executor.shutdown(wait=True)
@@ -1,12 +1,15 @@
+import codecs
 import csv
 import base64
 from collections import namedtuple
 import hashlib
 
-from io import BytesIO
+from io import BytesIO, StringIO
+import re
+import tempfile
 from builtins import str
 
-from .exceptions import MWSException
+from .exceptions import ContentMD5Mismatch, MWSException
 
 
 Marketplace = namedtuple(
@@ -120,6 +123,28 @@ def flatten_list(kwargs, key, separator):
             flatten_dict(kwargs, subkey)
 
 
+def chunked(iterable, size):
+    """
+    Split an iterable into lists of at most `size` items.
+
+    Example::
+
+        list(chunked([1, 2, 3, 4, 5], 2))
+
+    Becomes::
+
+        [[1, 2], [3, 4], [5]]
+    """
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
 def flatten_dict(kwargs, key):
     """
     Convert a dict into URL parameters the way amazon like it.
@@ -140,29 +165,223 @@ def flatten_dict(kwargs, key):
         kwargs['{}.{}'.format(key, subkey)] = value
 
 
+#: Delimiters that flat files can be separated by
+XSV_DELIMITERS = '\t,;|'
+
+
 def parse_xsv(text):
     """
     Python 2 and 3 compatible (X)SV - CSV/TSV parser that returns a list of
     dictionary objects.
     """
-    header = BytesIO(text.encode("utf-8")).readline().decode("utf-8")
-    dialect = csv.Sniffer().sniff(header)
+    return list(XSVReader(StringIO(text, newline="\n")))
 
-    return list(
-        csv.DictReader(
-            text.split("\n"),
-            delimiter=dialect.delimiter,
-            quotechar='•',
-        )
-    )
+
+def iter_xsv(chunks, encoding="iso-8859-1", rows="dict"):
+    """
+    Incrementally parse an (X)SV - CSV/TSV flat file from an iterable of
+    byte chunks (for example a streamed report download).
+
+    Returns a :class:`XSVReader` that yields rows as they are parsed.
+    """
+    return XSVReader(iter_text_lines(chunks, encoding), rows=rows)
+
+
+class XSVReader(object):
+    """
+    Incremental (X)SV - CSV/TSV parser over an iterable of text lines.
+
+    The delimiter is sniffed from the header line alone and rows are
+    yielded as they are read, so only one line is held in memory at a
+    time. Rows are returned in one of the formats given by `rows`:
+
+    * ``dict``: a dictionary per row, keyed by the column names.
+    * ``tuple``: a plain tuple per row, the column names are shared in
+      :attr:`fieldnames`.
+    * ``namedtuple``: a namedtuple per row. Column names are converted
+      to valid identifiers (``listing-id`` becomes ``listing_id``).
+
+    .. code-block:: python
+
+        reader = iter_xsv(chunks, rows='tuple')
+        sku_index = reader.fieldnames.index('sku')
+        for row in reader:
+            print(row[sku_index])
+    """
+    ROW_TYPES = ('dict', 'tuple', 'namedtuple')
+
+    def __init__(self, lines, rows="dict"):
+        if rows not in self.ROW_TYPES:
+            raise MWSException(
+                '{} is not a valid row type. Use one of {}'.format(
+                    rows, ', '.join(self.ROW_TYPES)
+                )
+            )
+        self.rows = rows
+        self._lines = iter(lines)
+        self._fieldnames = None
+        self._delimiter = None
+        self._row_class = None
+
+    def _read_header(self):
+        header = next(self._lines, '').rstrip('\r\n')
+        if not header:
+            self._fieldnames = []
+            return
+        try:
+            self._delimiter = csv.Sniffer().sniff(
+                header, delimiters=XSV_DELIMITERS
+            ).delimiter
+        except csv.Error:
+            # A single column has no delimiter to sniff
+            self._delimiter = '\t'
+        self._fieldnames = next(self._reader([header]))
+
+    def _reader(self, lines):
+        return csv.reader(lines, delimiter=self._delimiter, quotechar='•')
+
+    @property
+    def fieldnames(self):
+        """
+        Column names read from the header line.
+        """
+        if self._fieldnames is None:
+            self._read_header()
+        return self._fieldnames
+
+    @property
+    def row_class(self):
+        """
+        The namedtuple class of rows in ``namedtuple`` mode.
+        """
+        if self._row_class is None:
+            self._row_class = namedtuple(
+                'Row',
+                [
+                    re.sub(r'\W', '_', name) or '_'
+                    for name in self.fieldnames
+                ],
+                rename=True,
+            )
+        return self._row_class
+
+    def __iter__(self):
+        fieldnames = self.fieldnames
+        if not fieldnames:
+            return
+        width = len(fieldnames)
+        for row in self._reader(self._lines):
+            if not row:
+                continue
+            if self.rows == "dict":
+                record = dict(zip(fieldnames, row))
+                if len(row) > width:
+                    record[None] = row[width:]
+                elif len(row) < width:
+                    for name in fieldnames[len(row):]:
+                        record[name] = None
+                yield record
+            elif self.rows == "tuple":
+                yield tuple(row)
+            else:
+                if len(row) != width:
+                    row = (row + [None] * width)[:width]
+                yield self.row_class._make(row)
 
 
 def get_md5_hash(string):
+    """
+    Returns the base64 encoded MD5 hash of a string, bytes or a binary
+    file object. A file object is read from its current position in
+    chunks and put back to that position.
+    """
     hasher = hashlib.md5()
-    if isinstance(string, str):
+    if hasattr(string, 'read'):
+        position = string.tell()
+        for chunk in iter_file_chunks(string):
+            hasher.update(chunk)
+        string.seek(position)
+    elif isinstance(string, str):
         hasher.update(string.encode('utf-8'))
     else:
         hasher.update(string)
     return base64.b64encode(
         hasher.digest()
     ).decode('utf-8')
+
+
+def iter_file_chunks(fileobj, chunk_size=65536):
+    """
+    Iterate over the contents of a file object in chunks.
+    """
+    while True:
+        chunk = fileobj.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+#: Size above which spooled bodies are written to a temporary file
+#: instead of being kept in memory.
+SPOOL_MAX_SIZE = 8 * 1024 * 1024
+
+
+def spool_chunks(chunks, encoding='utf-8', max_size=SPOOL_MAX_SIZE):
+    """
+    Write an iterable of chunks to a file object, encoding text chunks
+    with `encoding`, and return the file positioned at its start with
+    the base64 encoded MD5 hash of its contents, computed in the same
+    pass.
+
+    The contents are kept in memory until they grow over `max_size`
+    bytes, and are moved to a temporary file then.
+    """
+    hasher = hashlib.md5()
+    spooled = BytesIO()
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode(encoding)
+        hasher.update(chunk)
+        spooled.write(chunk)
+        if isinstance(spooled, BytesIO) and spooled.tell() > max_size:
+            in_memory, spooled = spooled, tempfile.TemporaryFile()
+            spooled.write(in_memory.getvalue())
+    spooled.seek(0)
+    return spooled, base64.b64encode(hasher.digest()).decode('utf-8')
+
+
+def iter_md5_verified(chunks, expected_md5):
+    """
+    Pass through an iterable of byte chunks while computing their MD5
+    hash, and raise :class:`pymws.exceptions.ContentMD5Mismatch` after
+    the last chunk if it does not match the base64 encoded
+    `expected_md5`. Nothing is verified if `expected_md5` is empty.
+    """
+    hasher = hashlib.md5()
+    for chunk in chunks:
+        hasher.update(chunk)
+        yield chunk
+    if expected_md5:
+        md5 = base64.b64encode(hasher.digest()).decode('utf-8')
+        if md5 != expected_md5:
+            raise ContentMD5Mismatch(
+                'Content-MD5 of body is {} but expected {}'.format(
+                    md5, expected_md5
+                )
+            )
+
+
+def iter_text_lines(chunks, encoding="iso-8859-1"):
+    """
+    Decode an iterable of byte chunks and yield the text lines without
+    their line endings, holding no more than one chunk and one line in
+    memory.
+    """
+    pending = ''
+    for text in codecs.iterdecode(chunks, encoding):
+        lines = (pending + text).split('\n')
+        pending = lines.pop()
+        for line in lines:
+            yield line.rstrip('\r')
+    if pending:
+        yield pending.rstrip('\r')
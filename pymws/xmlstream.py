@@ -0,0 +1,198 @@
+"""
+Streaming parser for large XML responses.
+
+By default responses are parsed into an lxml objectify tree, which is
+convenient but holds the whole document in memory. For large list
+responses, a :class:`RecordStream` parses the response as it is
+downloaded and yields a record for each repeated element, freeing the
+element once it has been converted, so that memory stays flat whatever
+the size of the response.
+
+.. code-block:: python
+
+    for order in client.orders.iter_orders(
+            CreatedAfter=start_date, stream=True):
+        print(order['AmazonOrderId'])
+
+Records are dictionaries by default (see :func:`element_to_dict`).
+Streaming trades time for memory: a page of 100 orders takes about four
+times as long to stream into dictionaries as to build into an objectify
+tree (half of it converting the records, a `convert` function that only
+reads the fields it needs is faster), while the memory used stays about
+1MB where the objectify tree of a response of 5000 orders takes over
+50MB (see the ``xml_parse`` benchmark).
+"""
+from lxml import etree
+
+from .exceptions import MWSException
+
+
+def local_name(tag):
+    """
+    Returns the tag without its namespace.
+    """
+    return tag.rsplit('}', 1)[-1]
+
+
+def element_to_dict(element):
+    """
+    Convert an element into a dictionary keyed by the tag names of its
+    children, without namespaces. Leaf elements become their text and
+    repeated elements become a list.
+
+    Example::
+
+        <Order>
+          <AmazonOrderId>111-1234567-0000001</AmazonOrderId>
+          <OrderTotal>
+            <Amount>138.11</Amount>
+            <CurrencyCode>USD</CurrencyCode>
+          </OrderTotal>
+        </Order>
+
+    Becomes::
+
+        {
+            'AmazonOrderId': '111-1234567-0000001',
+            'OrderTotal': {'Amount': '138.11', 'CurrencyCode': 'USD'},
+        }
+    """
+    value = _convert(element)
+    return value if isinstance(value, dict) else {}
+
+
+#: Local names of the tags, by tag
+_local_names = {}
+
+# The methods of plain elements, objectify elements apply iteration and
+# len to their siblings
+_iter_children = etree.ElementBase.__iter__
+_count_children = etree.ElementBase.__len__
+
+
+def _convert(element):
+    """
+    Returns the dictionary of the children of an element, or its text
+    if it has none.
+    """
+    result = {}
+    for child in _iter_children(element):
+        tag = child.tag
+        if tag.__class__ is not str:
+            # Comments and processing instructions
+            continue
+        name = _local_names.get(tag)
+        if name is None:
+            name = _local_names[tag] = local_name(tag)
+        if _count_children(child):
+            value = _convert(child)
+        else:
+            value = child.text
+        if name in result:
+            previous = result[name]
+            if previous.__class__ is not list:
+                result[name] = [previous]
+            result[name].append(value)
+        else:
+            result[name] = value
+    return result or element.text
+
+
+class RecordStream(object):
+    """
+    Parse an XML response from an iterable of byte chunks and yield a
+    record for each element found at the dotted `path`
+    (``Orders.Order`` for example).
+
+    The parser only reports the end of the elements named like the
+    records, so the cost of parsing the rest of the document stays in
+    lxml. Leaf elements outside of the records (NextToken, HasNext,
+    ...) are collected in :attr:`fields`, which is complete once all
+    the records have been consumed.
+
+    :param convert: Function converting a record element, defaults to
+                    :func:`element_to_dict`.
+    """
+
+    def __init__(self, chunks, path, convert=element_to_dict):
+        self.chunks = chunks
+        self.path = path.split('.')
+        self.convert = convert
+        self.fields = {}
+        self.consumed = False
+        self._started = False
+
+    def __iter__(self):
+        if self._started:
+            raise MWSException('A record stream can only be iterated once')
+        self._started = True
+        parser = etree.XMLPullParser(
+            events=('end',), tag='{*}' + self.path[-1]
+        )
+        # Records are usually siblings, the path is only checked for the
+        # first record of a parent
+        records_parent = None
+        for chunk in self.chunks:
+            parser.feed(chunk)
+            for _, element in parser.read_events():
+                parent = element.getparent()
+                if parent is records_parent or self._is_record(element):
+                    records_parent = parent
+                    yield self.convert(element)
+                    self._release(element, parent)
+        self._collect_fields(parser.close())
+        self.consumed = True
+
+    def _is_record(self, element):
+        """
+        Returns True if the element is at the path of the records and is
+        not nested in another record.
+        """
+        names = [local_name(element.tag)]
+        for ancestor in element.iterancestors():
+            names.append(local_name(ancestor.tag))
+        names.reverse()
+        depth = len(self.path)
+        for index in range(depth, len(names) + 1):
+            if names[index - depth:index] == self.path:
+                # The first element at the path is the record
+                return index == len(names)
+        return False
+
+    def _release(self, element, parent):
+        """
+        Free an element that has been converted, and the elements that
+        preceded it, keeping the fields found in the latter.
+        """
+        element.clear()
+        if parent is not None:
+            tag = element.tag
+            while element.getprevious() is not None:
+                if parent[0].tag != tag:
+                    self._collect_fields(parent[0])
+                del parent[0]
+
+    def _collect_fields(self, element):
+        """
+        Collect the leaf elements of a tree that are not records.
+        """
+        for leaf in element.iter(etree.Element):
+            if len(leaf):
+                continue
+            name = local_name(leaf.tag)
+            if name != self.path[-1] or not self._is_record(leaf):
+                self.fields[name] = leaf.text
+
+    @property
+    def next_token(self):
+        """
+        The NextToken of the response or None if this was the last page.
+        Only known once all the records have been consumed.
+        """
+        if not self.consumed:
+            raise MWSException(
+                'The records must be consumed before reading the NextToken'
+            )
+        if (self.fields.get('HasNext') or '').strip() == 'false':
+            return None
+        return (self.fields.get('NextToken') or '').strip() or None
@@ -16,6 +16,10 @@ requirements = [
     'requests',
 ]
 
+extras_requirements = {
+    'async': ['aiohttp'],
+}
+
 setup(
     author="Fulfil.IO Inc.",
     author_email='help@fulfil.io',
@@ -38,6 +42,7 @@ setup(
         ],
     },
     install_requires=requirements,
+    extras_require=extras_requirements,
     license="MIT license",
     long_description=readme + '\n\n' + history,
     include_package_data=True,
@@ -7,6 +7,32 @@ import requests_mock
 from pymws import MWS
 
 
+class FakeClock(object):
+    """
+    A clock whose time only moves when it is set or slept on.
+    """
+
+    def __init__(self):
+        self.now = 0.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture()
+def clock():
+    """
+    A fake clock, to pass as the `clock` (and `sleep`, with
+    ``clock.sleep``) of the objects under test.
+    """
+    return FakeClock()
+
+
 @pytest.fixture()
 def mws_client():
     return MWS(
@@ -0,0 +1,237 @@
+import asyncio
+
+import pytest
+
+from pymws import AsyncMWS
+from pymws.builders import XMLFeedBuilder
+from pymws.cache import ResponseCache
+from pymws.exceptions import MWSException
+from pymws.retry import RetryPolicy
+
+aiohttp = pytest.importorskip('aiohttp')
+from aiohttp import web  # noqa: E402
+from aiohttp.test_utils import TestServer  # noqa: E402
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+def make_client(server, **kwargs):
+    client = AsyncMWS(
+        'US',
+        access_key_id='ACESSKEY',
+        secret_key='SECRET',
+        merchant_id='MERCHANT_ID',
+        auth_token='amzn.mws.big-fat-token',
+        **kwargs
+    )
+    client.marketplace = client.marketplace._replace(
+        endpoint=str(server.make_url('')).rstrip('/')
+    )
+    return client
+
+
+def serve(responses, requests):
+    """
+    Returns an application that answers with the given responses
+    in order and records the requests it receives.
+    """
+    responses = iter(responses)
+
+    async def handler(request):
+        requests.append((request.method, request.query))
+        status, body, content_type = next(responses)
+        return web.Response(
+            status=status, body=body.encode('utf-8'),
+            content_type=content_type,
+        )
+
+    app = web.Application()
+    app.router.add_route('*', '/{tail:.*}', handler)
+    return app
+
+
+def test_list_orders(example_response):
+    requests = []
+    app = serve(
+        [(200, example_response('orders/list_orders.xml'), 'text/xml')],
+        requests
+    )
+
+    async def main():
+        async with TestServer(app) as server:
+            async with make_client(server) as client:
+                return await client.orders.list_orders()
+
+    response = run(main())
+    assert response.Orders.Order[0].AmazonOrderId == '111-1234567-0000001'
+
+    method, query = requests[0]
+    assert method == 'GET'
+    assert query['Action'] == 'ListOrders'
+    assert query['SellerId'] == 'MERCHANT_ID'
+    assert query['Signature']
+
+
+def test_get_report_tsv(example_response):
+    requests = []
+    app = serve(
+        [(
+            200,
+            example_response('reports/get_report_tab_separated.tsv'),
+            'text/plain',
+        )],
+        requests
+    )
+
+    async def main():
+        async with TestServer(app) as server:
+            async with make_client(server) as client:
+                return await client.reports.get_report(123456789)
+
+    response = run(main())
+    assert len(response) == 3
+    assert response[0]['listing-id'] == '0305XXNBYUQ'
+
+
+def test_retry_and_concurrency(example_response):
+    requests = []
+    status = example_response('orders/get_service_status.xml')
+    app = serve(
+        [(503, example_response('503.xml'), 'text/xml')] +
+        [(200, status, 'text/xml')] * 10,
+        requests
+    )
+
+    async def main():
+        async with TestServer(app) as server:
+            async with make_client(
+                    server, max_concurrency=2,
+                    retry=RetryPolicy(base_delay=0)) as client:
+                return await asyncio.gather(*[
+                    client.orders.get_service_status() for _ in range(10)
+                ])
+
+    responses = run(main())
+    assert [r.Status for r in responses] == ['GREEN'] * 10
+    assert len(requests) == 11
+
+
+def test_retry_stats(example_response):
+    status = example_response('orders/get_service_status.xml')
+    app = serve(
+        [(503, example_response('503.xml'), 'text/xml')] +
+        [(200, status, 'text/xml')] * 3,
+        []
+    )
+    policy = RetryPolicy(base_delay=0)
+
+    async def main():
+        async with TestServer(app) as server:
+            async with make_client(server, retry=policy) as client:
+                await asyncio.gather(*[
+                    client.orders.get_service_status() for _ in range(3)
+                ])
+                # Per thread, it cannot tell the coroutines apart
+                with pytest.raises(MWSException):
+                    client.last_retry_stats
+
+    run(main())
+    assert policy.stats.attempts == 4
+    assert policy.stats.retries == 1
+
+
+def test_cached_get(example_response):
+    requests = []
+    app = serve(
+        [(200, example_response('orders/get_service_status.xml'), 'text/xml')],
+        requests
+    )
+
+    async def main():
+        async with TestServer(app) as server:
+            async with make_client(server, cache=ResponseCache()) as client:
+                first = await client.orders.get_service_status()
+                second = await client.orders.get_service_status()
+                return first, second
+
+    first, second = run(main())
+    assert first.Status == second.Status == 'GREEN'
+    assert len(requests) == 1
+
+
+def test_submit_feed_files(example_response, tmp_path):
+    bodies = []
+
+    async def handler(request):
+        bodies.append(await request.read())
+        return web.Response(
+            body=example_response('feeds/submit_feed.xml').encode('utf-8'),
+            content_type='text/xml',
+        )
+
+    app = web.Application()
+    app.router.add_route('*', '/{tail:.*}', handler)
+    path = tmp_path / 'feed.xml'
+    path.write_bytes(b'<AmazonEnvelope/>')
+    builder = XMLFeedBuilder(
+        '_POST_INVENTORY_AVAILABILITY_DATA_', merchant_id='MERCHANT_ID',
+        max_messages=1,
+    )
+
+    async def main():
+        async with TestServer(app) as server:
+            async with make_client(server) as client:
+                await client.feeds.submit_feed(
+                    path, '_POST_PRODUCT_DATA_'
+                )
+                await client.feeds.submit_feed(
+                    iter(['<Amazon', 'Envelope/>']), '_POST_PRODUCT_DATA_'
+                )
+                # All the feeds are built before any request is sent
+                await asyncio.gather(*client.feeds.submit_records(
+                    builder, [{'SKU': 'A', 'Quantity': 1},
+                              {'SKU': 'B', 'Quantity': 2}]
+                ))
+
+    run(main())
+    assert bodies[:2] == [b'<AmazonEnvelope/>'] * 2
+    assert sorted(b'<SKU>A</SKU>' in body for body in bodies[2:]) == \
+        [False, True]
+
+
+def test_paginators_raise():
+    # Pages are coroutines, paginating them would silently yield nothing
+    async def main():
+        async with AsyncMWS(
+                'US', access_key_id='ACESSKEY', secret_key='SECRET',
+                merchant_id='MERCHANT_ID') as client:
+            with pytest.raises(MWSException):
+                list(client.orders.iter_orders())
+            with pytest.raises(MWSException):
+                list(client.orders.iter_orders_by_id(['111-1234567-0000001']))
+            with pytest.raises(MWSException):
+                list(client.orders.iter_order_items_by_order(['1']))
+            inbound = client.fulfillment_inbound_shipment
+            with pytest.raises(MWSException):
+                inbound.list_all_inbound_shipments()
+
+    run(main())
+
+
+def test_streaming_raises():
+    async def main():
+        async with AsyncMWS(
+                'US', access_key_id='ACESSKEY', secret_key='SECRET',
+                merchant_id='MERCHANT_ID') as client:
+            with pytest.raises(MWSException):
+                client.reports.stream_report('123')
+            with pytest.raises(MWSException):
+                list(client.orders.iter_orders(stream=True))
+
+    run(main())
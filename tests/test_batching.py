@@ -0,0 +1,197 @@
+import time
+
+from lxml import etree
+import pytest
+
+from pymws.batching import FeedBatcher
+from pymws.builders import XMLFeedBuilder
+from pymws.exceptions import MWSError
+from pymws.throttling import Quota, Throttle
+
+
+@pytest.fixture()
+def feeds(mws_client, mock_adapter, example_response):
+    """
+    Returns the list of the SKU and quantities of the submitted feeds.
+    """
+    received = []
+
+    def respond(request, context):
+        feed = etree.fromstring(request.body.read())
+        received.append([
+            (m.findtext('Inventory/SKU'), m.findtext('Inventory/Quantity'))
+            for m in feed.findall('Message')
+        ])
+        context.headers['Content-Type'] = 'text/xml'
+        return example_response('feeds/submit_feed.xml')
+
+    mock_adapter.register_uri(
+        'POST',
+        mws_client.marketplace.endpoint + '/Feeds/2009-01-01',
+        text=respond,
+    )
+    return received
+
+
+def make_batcher(mws_client, **kwargs):
+    return FeedBatcher(
+        mws_client,
+        XMLFeedBuilder(
+            '_POST_INVENTORY_AVAILABILITY_DATA_', merchant_id='MERCHANT_ID'
+        ),
+        **kwargs
+    )
+
+
+def test_last_write_wins(mws_client, feeds, clock):
+    submitted = []
+    batcher = make_batcher(
+        mws_client, window=60, clock=clock,
+        on_submit=lambda response, count: submitted.append(count),
+    )
+    batcher.put({'SKU': 'A', 'Quantity': 1})
+    batcher.put({'SKU': 'B', 'Quantity': 2})
+    batcher.put({'SKU': 'A', 'Quantity': 3})
+    assert len(batcher) == 2
+    assert batcher.maybe_flush() == []
+
+    clock.now = 60
+    responses = batcher.maybe_flush()
+    assert len(responses) == 1
+    assert feeds == [[('B', '2'), ('A', '3')]]
+    assert submitted == [2]
+    assert len(batcher) == 0
+    assert batcher.flush() == []
+
+
+def test_flush_on_size(mws_client, feeds, clock):
+    batcher = make_batcher(mws_client, max_records=2, clock=clock)
+    batcher.put({'SKU': 'A', 'Quantity': 1})
+    batcher.put({'SKU': 'A', 'Quantity': 2})
+    assert feeds == []
+    batcher.put({'SKU': 'B', 'Quantity': 1})
+    assert feeds == [[('A', '2'), ('B', '1')]]
+
+
+def test_flush_when_quota_available(mws_client, feeds, clock):
+    throttle = Throttle(quotas={'SubmitFeed': Quota(1, 120)}, clock=clock)
+    batcher = make_batcher(
+        mws_client, window=60, min_window=5, throttle=throttle, clock=clock
+    )
+    batcher.put({'SKU': 'A', 'Quantity': 1})
+    assert not batcher.is_due()
+    clock.now = 5
+    assert batcher.is_due()
+
+    throttle.reserve(
+        mws_client.merchant_id, mws_client.marketplace.endpoint, 'SubmitFeed'
+    )
+    assert not batcher.is_due()
+
+
+def test_failed_flush_requeues(
+        mws_client, mock_adapter, example_response, clock):
+    mock_adapter.register_uri(
+        'POST',
+        mws_client.marketplace.endpoint + '/Feeds/2009-01-01',
+        status_code=400,
+        text='<ErrorResponse/>',
+    )
+    batcher = make_batcher(mws_client, clock=clock)
+    batcher.put({'SKU': 'A', 'Quantity': 1})
+    with pytest.raises(MWSError):
+        batcher.flush()
+    assert len(batcher) == 1
+
+
+def test_split_feeds(mws_client, mock_adapter, example_response, clock):
+    calls = []
+
+    def respond(request, context):
+        calls.append(request)
+        context.headers['Content-Type'] = 'text/xml'
+        if len(calls) == 2:
+            context.status_code = 400
+            return '<ErrorResponse/>'
+        return example_response('feeds/submit_feed.xml')
+
+    mock_adapter.register_uri(
+        'POST',
+        mws_client.marketplace.endpoint + '/Feeds/2009-01-01',
+        text=respond,
+    )
+    submitted = []
+    batcher = FeedBatcher(
+        mws_client,
+        XMLFeedBuilder(
+            '_POST_INVENTORY_AVAILABILITY_DATA_', merchant_id='MERCHANT_ID',
+            max_messages=2,
+        ),
+        clock=clock,
+        on_submit=lambda response, count: submitted.append(count),
+    )
+    for sku in 'ABCDE':
+        batcher.put({'SKU': sku, 'Quantity': 1})
+
+    # The second feed fails, the first one is not submitted again
+    with pytest.raises(MWSError):
+        batcher.flush()
+    assert submitted == [2]
+    assert batcher.submitted == 2
+    assert len(batcher) == 3
+
+    assert len(batcher.flush()) == 2
+    assert submitted == [2, 2, 1]
+    assert batcher.submitted == 5
+
+
+def test_background_flush(mws_client, feeds):
+    with make_batcher(mws_client, window=0, poll_interval=0.01) as batcher:
+        batcher.put({'SKU': 'A', 'Quantity': 1})
+        batcher.put({'SKU': 'B', 'Quantity': 1})
+    assert sorted(sum(feeds, [])) == [('A', '1'), ('B', '1')]
+    assert batcher.submitted == 2
+
+
+def test_background_flush_after_error(
+        mws_client, mock_adapter, example_response):
+    received = []
+
+    def respond(request, context):
+        context.headers['Content-Type'] = 'text/xml'
+        received.append(request)
+        if len(received) == 1:
+            context.status_code = 400
+            return '<ErrorResponse/>'
+        return example_response('feeds/submit_feed.xml')
+
+    mock_adapter.register_uri(
+        'POST',
+        mws_client.marketplace.endpoint + '/Feeds/2009-01-01',
+        text=respond,
+    )
+    batcher = make_batcher(mws_client, window=0, poll_interval=0.01)
+    batcher.start()
+    try:
+        batcher.put({'SKU': 'A', 'Quantity': 1})
+        deadline = time.time() + 5
+        while batcher.submitted < 1 and time.time() < deadline:
+            time.sleep(0.01)
+        # The thread submitted the records again after the failure
+        assert batcher.submitted == 1
+        with pytest.raises(MWSError):
+            batcher.put({'SKU': 'B', 'Quantity': 1})
+        batcher.put({'SKU': 'B', 'Quantity': 1})
+    finally:
+        batcher.close()
+    assert batcher.submitted == 2
+    assert len(received) == 3
+
+
+def test_exit_on_error_does_not_submit(mws_client, feeds):
+    with pytest.raises(KeyError):
+        with make_batcher(mws_client, window=60) as batcher:
+            batcher.put({'SKU': 'A', 'Quantity': 1})
+            raise KeyError('A')
+    assert feeds == []
+    assert len(batcher) == 1
@@ -0,0 +1,131 @@
+from decimal import Decimal
+
+from lxml import etree
+import pytest
+
+from pymws.builders import FlatFileFeedBuilder, XMLFeedBuilder
+from pymws.exceptions import MWSException
+
+
+def test_xml_feed():
+    builder = XMLFeedBuilder(
+        '_POST_PRODUCT_PRICING_DATA_', merchant_id='MERCHANT_ID'
+    )
+    feeds = [
+        etree.parse(feed).getroot()
+        for feed in builder.build([
+            {
+                'SKU': 'A',
+                'StandardPrice': {
+                    '@currency': 'USD', '#text': Decimal('9.99')
+                },
+            },
+            {'SKU': 'B', 'StandardPrice': {'@currency': 'USD', '#text': 5}},
+        ])
+    ]
+    assert len(feeds) == 1
+    feed = feeds[0]
+    assert feed.tag == 'AmazonEnvelope'
+    assert feed.findtext('Header/MerchantIdentifier') == 'MERCHANT_ID'
+    assert feed.findtext('MessageType') == 'Price'
+    messages = feed.findall('Message')
+    assert [m.findtext('MessageID') for m in messages] == ['1', '2']
+    assert messages[0].findtext('OperationType') == 'Update'
+    price = messages[0].find('Price/StandardPrice')
+    assert price.get('currency') == 'USD'
+    assert price.text == '9.99'
+
+
+def test_xml_feed_split_by_messages():
+    builder = XMLFeedBuilder(
+        '_POST_INVENTORY_AVAILABILITY_DATA_', merchant_id='MERCHANT_ID',
+        max_messages=2,
+    )
+    records = ({'SKU': str(i), 'Quantity': i} for i in range(5))
+    feeds = [
+        etree.parse(feed).getroot() for feed in builder.build(records)
+    ]
+    assert [
+        [m.findtext('Inventory/SKU') for m in feed.findall('Message')]
+        for feed in feeds
+    ] == [['0', '1'], ['2', '3'], ['4']]
+    # Message ids start again in each feed
+    assert feeds[1].find('Message').findtext('MessageID') == '1'
+    assert list(builder.build([])) == []
+
+
+def test_xml_feed_split_by_size():
+    builder = XMLFeedBuilder(
+        '_POST_INVENTORY_AVAILABILITY_DATA_', merchant_id='MERCHANT_ID',
+        max_bytes=1000,
+    )
+    sizes = []
+    count = 0
+    for feed in builder.build(
+            {'SKU': 'SKU-{}'.format(i), 'Quantity': 1} for i in range(100)):
+        data = feed.read()
+        sizes.append(len(data))
+        count += len(etree.fromstring(data).findall('Message'))
+    assert count == 100
+    assert len(sizes) > 1
+    assert max(sizes) < 1300
+
+
+def test_xml_feed_unknown_type():
+    with pytest.raises(MWSException):
+        XMLFeedBuilder('_POST_UNKNOWN_', merchant_id='MERCHANT_ID')
+
+
+def test_flat_file_feed():
+    builder = FlatFileFeedBuilder(
+        '_POST_FLAT_FILE_INVLOADER_DATA_', ['sku', 'quantity', 'price'],
+        header_lines=['TemplateType=InventoryLoader\tVersion=2014.0415'],
+        max_messages=2,
+    )
+    feeds = [
+        feed.read() for feed in builder.build([
+            {'sku': 'caf\xe9', 'quantity': 1},
+            {'sku': 'B', 'quantity': 2, 'price': Decimal('3.50')},
+            {'sku': 'C', 'quantity': 0},
+        ])
+    ]
+    assert feeds == [
+        b'TemplateType=InventoryLoader\tVersion=2014.0415\n'
+        b'sku\tquantity\tprice\n'
+        b'caf\xe9\t1\t\n'
+        b'B\t2\t3.50\n',
+        b'TemplateType=InventoryLoader\tVersion=2014.0415\n'
+        b'sku\tquantity\tprice\n'
+        b'C\t0\t\n',
+    ]
+
+    with pytest.raises(MWSException):
+        list(builder.build([{'sku': 'A\tB'}]))
+
+
+def test_submit_records(mws_client, mock_adapter, example_response):
+    bodies = []
+
+    def respond(request, context):
+        bodies.append(request.body.read())
+        context.headers['Content-Type'] = 'text/xml'
+        return example_response('feeds/submit_feed.xml')
+
+    mock_adapter.register_uri(
+        'POST',
+        mws_client.marketplace.endpoint + '/Feeds/2009-01-01',
+        text=respond,
+    )
+    builder = XMLFeedBuilder(
+        '_POST_INVENTORY_AVAILABILITY_DATA_', merchant_id='MERCHANT_ID',
+        max_messages=2,
+    )
+    responses = list(mws_client.feeds.submit_records(
+        builder, ({'SKU': str(i), 'Quantity': i} for i in range(3))
+    ))
+    assert len(responses) == 2
+    assert responses[0].FeedSubmissionInfo.FeedProcessingStatus == \
+        '_SUBMITTED_'
+    assert b'<SKU>2</SKU>' in bodies[1]
+    assert 'FeedType=_POST_INVENTORY_AVAILABILITY_DATA_' in \
+        mock_adapter.request_history[0].url
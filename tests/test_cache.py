@@ -0,0 +1,120 @@
+from pymws.cache import (
+    CacheEntry, DiskBackend, MemoryBackend, ResponseCache, get_cache_key,
+)
+
+
+def register_service_status(mws_client, mock_adapter, example_response):
+    mock_adapter.register_uri(
+        'GET',
+        mws_client.marketplace.endpoint + '/Orders/2013-09-01',
+        status_code=200,
+        text=example_response('orders/get_service_status.xml'),
+        headers={'Content-Type': 'text/xml'}
+    )
+
+
+def test_cache_key():
+    key = get_cache_key(
+        'SELLER', 'https://mws', '/Orders', 'v1', 'GetOrder',
+        {'AmazonOrderId.Id.1': '1', 'Timestamp': 'now'},
+    )
+    assert key == get_cache_key(
+        'SELLER', 'https://mws', '/Orders', 'v1', 'GetOrder',
+        {'AmazonOrderId.Id.1': '1', 'Timestamp': 'later'},
+    )
+    assert key != get_cache_key(
+        'SELLER', 'https://mws', '/Orders', 'v1', 'GetOrder',
+        {'AmazonOrderId.Id.1': '2'},
+    )
+    assert key != get_cache_key(
+        'OTHER', 'https://mws', '/Orders', 'v1', 'GetOrder',
+        {'AmazonOrderId.Id.1': '1'},
+    )
+
+
+def test_cached_get(mws_client, mock_adapter, example_response, clock):
+    mws_client.cache = ResponseCache(clock=clock)
+    register_service_status(mws_client, mock_adapter, example_response)
+
+    first = mws_client.orders.get_service_status()
+    second = mws_client.orders.get_service_status()
+    assert mock_adapter.call_count == 1
+    assert first.Status == second.Status == 'GREEN'
+    # Each hit is parsed again
+    assert first is not second
+    assert mws_client.cache.hits == 1
+
+    clock.now += 61
+    mws_client.orders.get_service_status()
+    assert mock_adapter.call_count == 2
+
+
+def test_uncached_actions(mws_client, mock_adapter, example_response):
+    mws_client.cache = ResponseCache()
+    mock_adapter.register_uri(
+        'GET',
+        mws_client.marketplace.endpoint + '/Orders/2013-09-01',
+        status_code=200,
+        text=example_response('orders/list_orders.xml'),
+        headers={'Content-Type': 'text/xml'}
+    )
+    mws_client.orders.list_orders()
+    mws_client.orders.list_orders()
+    assert mock_adapter.call_count == 2
+
+
+def test_cached_report(mws_client, mock_adapter, example_response):
+    mws_client.cache = ResponseCache()
+    mock_adapter.register_uri(
+        'GET',
+        mws_client.marketplace.endpoint + '/Reports/2009-01-01',
+        status_code=200,
+        text=example_response('reports/get_report_comma_separated.csv'),
+        headers={'Content-Type': 'text/plain;charset=Cp1252'}
+    )
+    assert mws_client.reports.get_report(1) == \
+        mws_client.reports.get_report(1)
+    mws_client.reports.get_report(2)
+    assert mock_adapter.call_count == 2
+
+
+def test_memory_backend_lru():
+    backend = MemoryBackend(max_entries=2)
+    backend.set('a', CacheEntry(0, 'text/xml', None, b'a'))
+    backend.set('b', CacheEntry(0, 'text/xml', None, b'b'))
+    backend.get('a')
+    backend.set('c', CacheEntry(0, 'text/xml', None, b'c'))
+    assert backend.get('b') is None
+    assert backend.get('a').content == b'a'
+    assert len(backend) == 2
+
+    backend = MemoryBackend(max_bytes=5)
+    backend.set('a', CacheEntry(0, 'text/xml', None, b'aaa'))
+    backend.set('b', CacheEntry(0, 'text/xml', None, b'bbb'))
+    assert backend.get('a') is None
+    assert backend.size == 3
+
+
+def test_disk_backend(tmpdir, mws_client, mock_adapter, example_response):
+    directory = str(tmpdir.join('cache'))
+    mws_client.cache = ResponseCache(DiskBackend(directory))
+    register_service_status(mws_client, mock_adapter, example_response)
+    mws_client.orders.get_service_status()
+
+    # A new backend on the same directory finds the entry
+    mws_client.cache = ResponseCache(DiskBackend(directory))
+    assert mws_client.orders.get_service_status().Status == 'GREEN'
+    assert mock_adapter.call_count == 1
+
+    mws_client.cache.clear()
+    mws_client.orders.get_service_status()
+    assert mock_adapter.call_count == 2
+
+
+def test_disk_backend_eviction(tmpdir):
+    backend = DiskBackend(str(tmpdir), max_bytes=150)
+    for key in 'abc':
+        backend.set(key, CacheEntry(0, 'text/plain', None, b'x' * 50))
+    assert backend.size <= 150
+    assert backend.get('a') is None
+    assert backend.get('c').content == b'x' * 50
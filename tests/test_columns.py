@@ -0,0 +1,113 @@
+from array import array
+from datetime import datetime, timezone
+import math
+
+import pytest
+
+from pymws.columns import FLOAT, INT, parse_report_date, to_columns
+from pymws.exceptions import MWSException
+from pymws.utils import iter_xsv
+
+
+def register_report(mws_client, mock_adapter, example_response, path):
+    mock_adapter.register_uri(
+        'GET',
+        mws_client.marketplace.endpoint + '/Reports/2009-01-01',
+        status_code=200,
+        content=example_response(path).encode('utf-8'),
+        headers={'Content-Type': 'text/plain;charset=Cp1252'}
+    )
+
+
+def test_report_columns_csv(mws_client, mock_adapter, example_response):
+    register_report(
+        mws_client, mock_adapter, example_response,
+        'reports/get_report_comma_separated.csv'
+    )
+    columns = mws_client.reports.get_report_columns(
+        123456789,
+        ReportType='_GET_FBA_FULFILLMENT_CURRENT_INVENTORY_DATA_',
+    )
+    assert list(columns)[:3] == ['snapshot-date', 'fnsku', 'sku']
+    assert columns['quantity'] == array('q', [1, 1])
+    assert columns['sku'] == ['test-1', 'test-2']
+    assert columns['snapshot-date'][0] == \
+        datetime(2021, 5, 24, 7, tzinfo=timezone.utc)
+
+
+def test_report_columns_tsv(mws_client, mock_adapter, example_response):
+    register_report(
+        mws_client, mock_adapter, example_response,
+        'reports/get_report_tab_separated.tsv'
+    )
+    columns = mws_client.reports.get_report_columns(
+        123456789, schema={'price': FLOAT, 'quantity': INT},
+    )
+    assert columns['price'].typecode == 'd'
+    assert columns['price'][0] == 49
+    # Quantity has missing values and falls back to floats
+    assert math.isnan(columns['quantity'][0])
+    assert columns['listing-id'][0] == '0305XXNBYUQ'
+
+
+def test_to_columns_batches():
+    lines = [b'sku\tqty\tprice\n'] + [
+        'SKU-{}\t{}\t{}\n'.format(i, i if i != 7 else '', '1,5').encode()
+        for i in range(10)
+    ]
+    columns = to_columns(
+        iter_xsv(lines, rows='tuple'),
+        schema={'qty': INT, 'price': FLOAT},
+        batch_size=3,
+    )
+    assert len(columns['sku']) == 10
+    assert columns['qty'].typecode == 'd'
+    assert columns['qty'][9] == 9
+    assert math.isnan(columns['qty'][7])
+    assert set(columns['price']) == {1.5}
+
+
+def test_to_columns_grouped_numbers():
+    lines = [
+        b'price\tqty\n',
+        b'1,234.56\t1,200\n',
+        b'1.234,56\t3\n',
+        b'1 234,5\t\n',
+        b'12,5\t4\n',
+        b'n/a\t5\n',
+    ]
+    with pytest.warns(UserWarning, match='n/a'):
+        columns = to_columns(
+            iter_xsv(lines, rows='tuple'),
+            schema={'qty': INT, 'price': FLOAT},
+        )
+    assert list(columns['price'][:4]) == [1234.56, 1234.56, 1234.5, 12.5]
+    assert math.isnan(columns['price'][4])
+    assert columns['qty'][0] == 1200
+    assert math.isnan(columns['qty'][2])
+
+
+def test_parse_report_date():
+    assert parse_report_date('') is None
+    assert parse_report_date('2020-08-09') == datetime(2020, 8, 9)
+    assert parse_report_date('2020-03-05 07:39:41 PST') == \
+        datetime(2020, 3, 5, 15, 39, 41, tzinfo=timezone.utc)
+    assert parse_report_date('09.08.2020 16:45:20 UTC') == \
+        datetime(2020, 8, 9, 16, 45, 20, tzinfo=timezone.utc)
+    assert parse_report_date('2020-08-09T16:45:20.639Z') == \
+        datetime(2020, 8, 9, 16, 45, 20, tzinfo=timezone.utc)
+    assert parse_report_date('2020-08-09T16:45:20+05:30') == \
+        datetime(2020, 8, 9, 11, 15, 20, tzinfo=timezone.utc)
+    with pytest.raises(MWSException):
+        parse_report_date('yesterday')
+
+
+def test_numpy_columns():
+    numpy = pytest.importorskip('numpy')
+    columns = to_columns(
+        iter_xsv([b'sku,qty\nA,1\nB,2\n'], rows='tuple'),
+        schema={'qty': INT},
+        as_numpy=True,
+    )
+    assert columns['qty'].dtype == numpy.int64
+    assert columns['qty'].sum() == 3
@@ -0,0 +1,50 @@
+import threading
+import time
+
+import pytest
+
+from pymws.concurrency import map_concurrent
+
+
+def test_map_concurrent_ordered():
+    def slow_square(value):
+        time.sleep((5 - value) * 0.01)
+        return value * value
+
+    assert list(map_concurrent(slow_square, range(5), max_workers=5)) == \
+        [(0, 0), (1, 1), (2, 4), (3, 9), (4, 16)]
+
+
+def test_map_concurrent_as_completed():
+    def slow_square(value):
+        time.sleep((5 - value) * 0.02)
+        return value * value
+
+    results = list(map_concurrent(
+        slow_square, range(5), max_workers=5, ordered=False
+    ))
+    assert sorted(results) == [(0, 0), (1, 1), (2, 4), (3, 9), (4, 16)]
+    assert results[0] == (4, 16)
+
+
+def test_map_concurrent_is_bounded():
+    submitted = []
+    lock = threading.Lock()
+
+    def record(value):
+        with lock:
+            submitted.append(value)
+        return value
+
+    results = map_concurrent(record, range(1000), max_workers=2)
+    assert next(results) == (0, 0)
+    assert len(submitted) <= 4
+    results.close()
+
+
+def test_map_concurrent_errors():
+    def fail(value):
+        raise ValueError(value)
+
+    with pytest.raises(ValueError):
+        list(map_concurrent(fail, range(3)))
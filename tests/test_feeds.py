@@ -1,3 +1,10 @@
+from io import BytesIO
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+from pymws.retry import RetryPolicy
+from pymws.utils import get_md5_hash, spool_chunks
+
 
 def test_submit_feed(mws_client, mock_adapter, example_response):
     mock_adapter.register_uri(
@@ -22,6 +29,80 @@ def test_submit_feed(mws_client, mock_adapter, example_response):
     assert response.FeedSubmissionInfo.FeedProcessingStatus == '_SUBMITTED_'
 
 
+def register_submit_feed(mws_client, mock_adapter, example_response,
+                         status_codes=(200,)):
+    """
+    Returns the list of the bodies and queries of the SubmitFeed
+    requests, answered with the given status codes in order.
+    """
+    received = []
+    status_codes = iter(status_codes)
+
+    def respond(request, context):
+        body = request.body
+        if hasattr(body, 'read'):
+            body = body.read()
+        received.append((body, parse_qs(urlparse(request.url).query)))
+        context.status_code = next(status_codes, 200)
+        context.headers['Content-Type'] = 'text/xml'
+        if context.status_code == 503:
+            return example_response('503.xml')
+        return example_response('feeds/submit_feed.xml')
+
+    mock_adapter.register_uri(
+        'POST',
+        mws_client.marketplace.endpoint + '/Feeds/2009-01-01',
+        text=respond,
+    )
+    return received
+
+
+def test_submit_feed_file(
+        mws_client, mock_adapter, example_response, tmpdir):
+    received = register_submit_feed(
+        mws_client, mock_adapter, example_response,
+        status_codes=(503, 200),
+    )
+    mws_client.retry = RetryPolicy(jitter=0, sleep=lambda delay: None)
+    path = tmpdir.join('feed.xml')
+    path.write_binary(b'<feed>\xc3\xa9</feed>')
+
+    with open(str(path), 'rb') as f:
+        mws_client.feeds.submit_feed(f, '_POST_PRODUCT_DATA_')
+    # The file is sent again from its start when retried
+    assert [body for body, _ in received] == [b'<feed>\xc3\xa9</feed>'] * 2
+    md5 = get_md5_hash(b'<feed>\xc3\xa9</feed>')
+    assert received[0][1]['ContentMD5Value'] == [md5]
+
+    mws_client.feeds.submit_feed(Path(str(path)), '_POST_PRODUCT_DATA_')
+    assert received[-1][0] == b'<feed>\xc3\xa9</feed>'
+    assert received[-1][1]['ContentMD5Value'] == [md5]
+
+
+def test_submit_feed_chunks(mws_client, mock_adapter, example_response):
+    received = register_submit_feed(
+        mws_client, mock_adapter, example_response
+    )
+    mws_client.feeds.submit_feed(
+        (line for line in ['sku\tquantity\n', 'caf\xe9\t1\n']),
+        '_POST_FLAT_FILE_INVLOADER_DATA_',
+    )
+    body, query = received[0]
+    assert body == b'sku\tquantity\ncaf\xe9\t1\n'
+    assert query['ContentMD5Value'] == [get_md5_hash(body)]
+
+
+def test_spool_chunks():
+    spooled, md5 = spool_chunks([b'abc', 'def'], max_size=4)
+    assert spooled.read() == b'abcdef'
+    assert md5 == get_md5_hash(b'abcdef')
+    assert not isinstance(spooled, BytesIO)
+    spooled.close()
+
+    spooled, md5 = spool_chunks([b'abc'], max_size=4)
+    assert isinstance(spooled, BytesIO)
+
+
 def test_feed_result(mws_client, mock_adapter, example_response):
     mock_adapter.register_uri(
         'GET',
@@ -1,3 +1,6 @@
+from lxml import objectify
+
+
 def test_list_inbound_shipments(mws_client, mock_adapter, example_response):
     mock_adapter.register_uri(
         "GET",
@@ -78,3 +81,59 @@ def test_list_all_inbound_shipment_items(
         ShipmentId="FBA161HWJF4X"
     )
     assert len(items) == 2
+
+
+def test_list_all_inbound_shipments_many_pages(mws_client, monkeypatch):
+    inbound_shipment_api = mws_client.fulfillment_inbound_shipment
+    pages = 3000
+
+    def get_page(number):
+        next_token = ''
+        if number < pages:
+            next_token = '<NextToken>{}</NextToken>'.format(number + 1)
+        return objectify.fromstring(
+            '<Result>{}<ShipmentData><member>'
+            '<ShipmentId>FBA{}</ShipmentId>'
+            '</member></ShipmentData></Result>'.format(next_token, number)
+        )
+
+    monkeypatch.setattr(
+        inbound_shipment_api, 'list_inbound_shipments',
+        lambda **kwargs: get_page(1)
+    )
+    monkeypatch.setattr(
+        inbound_shipment_api, 'list_inbound_shipments_by_next_token',
+        lambda NextToken: get_page(int(NextToken))
+    )
+    # Deeper than the recursion limit
+    shipments = inbound_shipment_api.list_all_inbound_shipments()
+    assert len(shipments) == pages
+    assert shipments[-1].ShipmentId == 'FBA{}'.format(pages)
+
+
+def test_iter_items_by_shipment(
+    mws_client, mock_adapter, example_response
+):
+    mock_adapter.register_uri(
+        "GET",
+        "/FulfillmentInboundShipment/2010-10-01?Action=ListInboundShipmentItems",  # noqa
+        status_code=200,
+        text=example_response("inbound_shipment/list_shipment_items.xml"),
+        headers={"Content-Type": "text/xml"}
+    )
+    mock_adapter.register_uri(
+        "GET",
+        "/FulfillmentInboundShipment/2010-10-01?Action=ListInboundShipmentItemsByNextToken",  # noqa
+        status_code=200,
+        text=example_response(
+            "inbound_shipment/list_shipment_items_by_next_token.xml"
+        ),
+        headers={"Content-Type": "text/xml"}
+    )
+    inbound_shipment_api = mws_client.fulfillment_inbound_shipment
+    results = list(inbound_shipment_api.iter_items_by_shipment(
+        ["FBA1", "FBA2", "FBA3"], max_workers=2
+    ))
+    assert [shipment_id for shipment_id, _ in results] == \
+        ["FBA1", "FBA2", "FBA3"]
+    assert [len(items) for _, items in results] == [2, 2, 2]
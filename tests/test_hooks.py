@@ -0,0 +1,152 @@
+from datetime import datetime, timezone
+import logging
+
+import pytest
+
+from pymws.hooks import Histogram, HistogramHook, Hook, LoggingHook
+from pymws.retry import RetryPolicy
+
+
+QUOTA_HEADERS = {
+    'Content-Type': 'text/xml',
+    'x-mws-request-id': 'b2c3d4e5-request',
+    'x-mws-quota-max': '200.0',
+    'x-mws-quota-remaining': '150.0',
+    'x-mws-quota-resetsOn': '2020-08-10T17:00:00.000Z',
+}
+
+
+class RecordingHook(Hook):
+    def __init__(self):
+        self.calls = []
+
+    def before_request(self, event):
+        self.calls.append(('before', event.action, event.attempt))
+
+    def after_request(self, event):
+        self.calls.append(('after', event))
+
+
+def register(mws_client, mock_adapter, responses):
+    mock_adapter.register_uri(
+        'GET', mws_client.marketplace.endpoint + '/Orders/2013-09-01',
+        responses,
+    )
+
+
+def test_request_event(mws_client, mock_adapter, example_response):
+    hook = RecordingHook()
+    mws_client.hooks.append(hook)
+    body = example_response('orders/list_orders.xml')
+    register(mws_client, mock_adapter, [
+        {'text': body, 'headers': QUOTA_HEADERS},
+    ])
+    mws_client.orders.list_orders()
+
+    assert hook.calls[0] == ('before', 'ListOrders', 1)
+    _, event = hook.calls[1]
+    assert event.seller_id == 'MERCHANT_ID'
+    assert event.endpoint == mws_client.marketplace.endpoint
+    assert event.status_code == 200
+    assert event.bytes == len(body.encode('utf-8'))
+    assert event.request_id == 'b2c3d4e5-request'
+    assert event.quota_max == 200
+    assert event.quota_remaining == 150
+    assert event.quota_resets_on == datetime(
+        2020, 8, 10, 17, tzinfo=timezone.utc
+    )
+    assert event.sign_time > 0
+    assert event.network_time > 0
+    assert event.parse_time > 0
+    assert event.total_time >= event.network_time
+    assert event.error is None
+
+
+def test_request_event_retried(mws_client, mock_adapter, example_response):
+    hook = RecordingHook()
+    mws_client.hooks.append(hook)
+    mws_client.retry = RetryPolicy(jitter=0, sleep=lambda delay: None)
+    register(mws_client, mock_adapter, [
+        {
+            'status_code': 503,
+            'text': example_response('503.xml'),
+            'headers': {'Content-Type': 'text/xml'},
+        },
+        {
+            'text': example_response('orders/get_service_status.xml'),
+            'headers': {'Content-Type': 'text/xml'},
+        },
+    ])
+    mws_client.orders.get_service_status()
+
+    events = [call[1] for call in hook.calls if call[0] == 'after']
+    assert [event.attempt for event in events] == [1, 2]
+    assert events[0].status_code == 503
+    assert events[0].error.code == 'RequestThrottled'
+    assert events[0].parse_time is None
+    assert events[1].error is None
+    assert events[1].sign_time == 0
+
+
+def test_streamed_request_event(mws_client, mock_adapter):
+    hook = RecordingHook()
+    mws_client.hooks.append(hook)
+    mock_adapter.register_uri(
+        'GET', mws_client.marketplace.endpoint + '/Reports/2009-01-01',
+        content=b'sku\tprice\ntest-1\t10\n',
+        headers={'Content-Type': 'text/plain', 'Content-Length': '20'},
+    )
+    list(mws_client.reports.stream_report(123456789))
+    _, event = hook.calls[1]
+    assert event.action == 'GetReport'
+    assert event.bytes == 20
+    assert event.parse_time is None
+
+
+def test_histogram_hook(mws_client, mock_adapter, example_response):
+    histograms = HistogramHook()
+    mws_client.hooks.append(histograms)
+    register(mws_client, mock_adapter, [
+        {
+            'text': example_response('orders/list_orders.xml'),
+            'headers': QUOTA_HEADERS,
+        },
+    ])
+    mws_client.orders.list_orders()
+    mws_client.orders.list_orders()
+
+    assert histograms.actions == ['ListOrders']
+    summary = histograms.get_summary('ListOrders')
+    assert summary['requests'] == 2
+    assert summary['errors'] == 0
+    assert summary['min_quota_remaining'] == 150
+    assert summary['p50'] is not None
+    assert histograms.get_histogram('ListOrders', 'parse_time').count == 2
+
+
+def test_histogram():
+    histogram = Histogram(buckets=(1, 2, 5, float('inf')))
+    for value in (0.5, 0.7, 1.5, 3, 10):
+        histogram.observe(value)
+    assert histogram.counts == [2, 1, 1, 1]
+    assert histogram.quantile(0.5) == 2
+    assert histogram.quantile(0.8) == 5
+    assert histogram.mean == pytest.approx(3.14)
+    assert Histogram().quantile(0.5) is None
+
+
+def test_logging_hook(mws_client, mock_adapter, example_response, caplog):
+    mws_client.hooks.append(LoggingHook())
+    register(mws_client, mock_adapter, [
+        {
+            'text': example_response('orders/list_orders.xml'),
+            'headers': QUOTA_HEADERS,
+        },
+    ])
+    with caplog.at_level(logging.INFO, logger='pymws.requests'):
+        mws_client.orders.list_orders()
+    record, = caplog.records
+    assert record.levelno == logging.INFO
+    assert 'ListOrders seller=MERCHANT_ID attempt=1 status=200' in \
+        record.getMessage()
+    assert 'quota=150.0/200.0' in record.getMessage()
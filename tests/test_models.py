@@ -0,0 +1,118 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from lxml import objectify
+import pytest
+
+from pymws.models import (
+    FeedSubmissionInfo, FulfillmentOrder, InboundShipment, Order, OrderItem,
+    ReportRequestInfo, to_models,
+)
+from pymws.xmlstream import RecordStream
+
+
+def parse(text):
+    return objectify.fromstring(text.encode('utf-8'))
+
+
+def test_order_from_element(example_response):
+    response = parse(example_response('orders/list_orders.xml'))
+    orders = list(to_models(response.ListOrdersResult.Orders.Order, Order))
+    assert len(orders) == 3
+    order = orders[0]
+    assert order.AmazonOrderId == '111-1234567-0000001'
+    assert order.OrderTotal == Decimal('138.11')
+    assert order.CurrencyCode == 'USD'
+    assert order.NumberOfItemsShipped == 1
+    assert order.IsPrime is False
+    assert order.PurchaseDate == datetime(
+        2020, 8, 9, 16, 45, 20, tzinfo=timezone.utc
+    )
+    assert order.ShippingAddress['City'] == 'Mountain View'
+    assert not hasattr(order, '__dict__')
+    assert 'AmazonOrderId' in repr(order)
+
+
+def test_order_does_not_keep_tree(example_response):
+    response = parse(example_response('orders/list_orders.xml'))
+    order = Order.from_element(response.ListOrdersResult.Orders.Order[0])
+    assert type(order.AmazonOrderId) is str
+    assert all(
+        type(value) is str for value in order.ShippingAddress.values()
+    )
+
+
+def test_order_from_stream(example_response):
+    stream = RecordStream(
+        [example_response('orders/list_orders.xml').encode('utf-8')],
+        'Orders.Order', convert=Order.from_element,
+    )
+    orders = list(stream)
+    assert orders == list(to_models(
+        parse(example_response('orders/list_orders.xml'))
+        .ListOrdersResult.Orders.Order,
+        Order,
+    ))
+    assert orders[1].AmazonOrderId == '111-1234567-0000002'
+
+
+def test_order_item(example_response):
+    response = parse(example_response('orders/list_order_items.xml'))
+    item = OrderItem.from_element(
+        response.ListOrderItemsResult.OrderItems.OrderItem
+    )
+    assert item.ASIN == 'B0X1X2X3X4X5'
+    assert item.ItemPrice == Decimal('139.00')
+    assert item.QuantityOrdered == 1
+    assert item.IsGift is False
+
+
+def test_report_request_info(example_response):
+    response = parse(example_response('reports/get_report_request_list.xml'))
+    info = ReportRequestInfo.from_element(
+        response.GetReportRequestListResult.ReportRequestInfo
+    )
+    assert info.GeneratedReportId == '3538561173'
+    assert info.Scheduled is False
+    assert info.StartedProcessingDate == datetime(
+        2011, 2, 17, 23, 44, 43, tzinfo=timezone.utc
+    )
+
+
+def test_feed_submission_info(example_response):
+    response = parse(example_response('feeds/submission-list.xml'))
+    info = FeedSubmissionInfo.from_element(
+        response.GetFeedSubmissionListResult.FeedSubmissionInfo
+    )
+    assert info.FeedSubmissionId == '2291326430'
+    assert info.FeedProcessingStatus == '_SUBMITTED_'
+    assert info.CompletedProcessingDate is None
+
+
+def test_inbound_shipment(example_response):
+    response = parse(example_response('inbound_shipment/list_shipments.xml'))
+    shipments = list(to_models(response.ShipmentData.member, InboundShipment))
+    assert [s.ShipmentId for s in shipments] == ['test', 'test-1']
+    assert shipments[0].AreCasesRequired is False
+    assert shipments[0].ShipFromAddress['City'] == 'PII'
+
+
+def test_fulfillment_order(example_response):
+    response = parse(
+        example_response('outbound_shipment/get_fulfillment_order.xml')
+    )
+    order = FulfillmentOrder.from_element(
+        response.GetFulfillmentOrderResult.FulfillmentOrder
+    )
+    assert order.SellerFulfillmentOrderId == 'extern_id_1154539615776'
+    assert order.MarketplaceId == 'ATVPDKIKX0DER'
+    assert order.DisplayableOrderDateTime == datetime(
+        2016, 9, 2, 17, 26, 56, tzinfo=timezone.utc
+    )
+    assert order.DestinationAddress['CountryCode'] == 'JP'
+
+
+def test_model_unknown_field():
+    with pytest.raises(TypeError):
+        Order(Foo='bar')
+    assert Order(AmazonOrderId='1') != Order(AmazonOrderId='2')
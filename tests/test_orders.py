@@ -1,4 +1,19 @@
+from datetime import datetime, timedelta
 from decimal import Decimal
+from urllib.parse import parse_qs, urlparse
+
+ORDERS_PAGE = """<?xml version="1.0"?>
+<{action}Response xmlns="https://mws.amazonservices.com/Orders/2013-09-01">
+  <{action}Result>
+    {next_token}
+    <Orders>{orders}</Orders>
+  </{action}Result>
+</{action}Response>"""
+
+ORDER = """<Order>
+  <AmazonOrderId>{}</AmazonOrderId>
+  <PurchaseDate>{}</PurchaseDate>
+</Order>"""
 
 
 def test_list_orders(mws_client, mock_adapter, example_response):
@@ -55,3 +70,144 @@ def test_get_service_status(mws_client, mock_adapter, example_response):
     )
     response = mws_client.orders.get_service_status()
     assert response.Status == 'GREEN'
+
+
+def test_get_order_many_ids(mws_client, mock_adapter, example_response):
+    mock_adapter.register_uri(
+        'GET',
+        mws_client.marketplace.endpoint + '/Orders/2013-09-01',
+        status_code=200,
+        text=example_response('orders/list_orders.xml').replace(
+            'ListOrders', 'GetOrder'
+        ),
+        headers={'Content-Type': 'text/xml'}
+    )
+    order_ids = ['111-1234567-{:07d}'.format(i) for i in range(120)]
+    orders = list(mws_client.orders.iter_orders_by_id(order_ids))
+
+    # 3 orders in each of the 3 responses
+    assert len(orders) == 9
+    assert len(mock_adapter.request_history) == 3
+    queries = [request.qs for request in mock_adapter.request_history]
+    assert queries[0]['amazonorderid.id.50'] == ['111-1234567-0000049']
+    assert 'amazonorderid.id.51' not in queries[0]
+    assert queries[2]['amazonorderid.id.20'] == ['111-1234567-0000119']
+    assert 'amazonorderid.id.21' not in queries[2]
+
+
+def test_list_order_items_by_order(
+        mws_client, mock_adapter, example_response):
+    mock_adapter.register_uri(
+        'GET',
+        mws_client.marketplace.endpoint + '/Orders/2013-09-01',
+        status_code=200,
+        text=example_response('orders/list_order_items.xml'),
+        headers={'Content-Type': 'text/xml'}
+    )
+    order_ids = ['111-1234567-0000001', '111-1234567-0000002']
+    results = list(mws_client.orders.iter_order_items_by_order(
+        order_ids, max_workers=2
+    ))
+    assert [order_id for order_id, _ in results] == order_ids
+    assert results[0][1][0].ASIN == 'B0X1X2X3X4X5'
+
+
+def list_orders_responder(dates, page_size):
+    """
+    Returns a callback answering ListOrders with pages of `page_size`
+    orders created at `dates`.
+    """
+    def respond(request, context):
+        context.headers['Content-Type'] = 'text/xml'
+        params = dict(
+            (key, values[0])
+            for key, values in parse_qs(urlparse(request.url).query).items()
+        )
+        action = params['Action']
+        if action == 'ListOrdersByNextToken':
+            after, before, offset = params['NextToken'].split('|')
+            offset = int(offset)
+        else:
+            after, before = params['CreatedAfter'], params['CreatedBefore']
+            offset = 0
+        orders = [
+            (index, date) for index, date in enumerate(dates)
+            if after <= date.isoformat() <= before
+        ]
+        next_token = ''
+        if len(orders) > offset + page_size:
+            next_token = '<NextToken>{}|{}|{}</NextToken>'.format(
+                after, before, offset + page_size
+            )
+        return ORDERS_PAGE.format(
+            action=action,
+            next_token=next_token,
+            orders=''.join(
+                ORDER.format('111-1234567-{:07d}'.format(index), date)
+                for index, date in orders[offset:offset + page_size]
+            ),
+        )
+    return respond
+
+
+def test_backfill_orders(mws_client, mock_adapter):
+    start = datetime(2020, 1, 1)
+    # A quiet first day, then a busy second day
+    dates = [start + timedelta(hours=h) for h in (1, 12)] + [
+        start + timedelta(days=1, hours=h) for h in range(0, 24, 2)
+    ]
+    # Created at the boundary of two windows, listed by both
+    dates.append(start + timedelta(days=1))
+    respond = list_orders_responder(dates, page_size=4)
+
+    mock_adapter.register_uri(
+        'GET',
+        mws_client.marketplace.endpoint + '/Orders/2013-09-01',
+        text=respond,
+    )
+    orders = list(mws_client.orders.backfill_orders(
+        start, start + timedelta(days=2), shards=2, max_workers=2,
+        min_window=6 * 3600,
+    ))
+    order_ids = [order.AmazonOrderId.text for order in orders]
+    assert len(order_ids) == len(dates)
+    assert len(set(order_ids)) == len(dates)
+    purchase_dates = [order.PurchaseDate.text for order in orders]
+    assert purchase_dates == sorted(purchase_dates)
+
+    windows = set(
+        (request.qs['createdafter'][0], request.qs['createdbefore'][0])
+        for request in mock_adapter.request_history
+        if 'createdafter' in request.qs
+    )
+    # The busy day was split into windows of 6 hours
+    assert ('2020-01-02t06:00:00', '2020-01-02t12:00:00') in windows
+    assert ('2020-01-01t00:00:00', '2020-01-01t12:00:00') not in windows
+
+
+def test_backfill_orders_split_first_page(mws_client, mock_adapter):
+    start = datetime(2020, 1, 1)
+    dates = [start + timedelta(hours=h) for h in range(10)]
+    mock_adapter.register_uri(
+        'GET',
+        mws_client.marketplace.endpoint + '/Orders/2013-09-01',
+        text=list_orders_responder(dates, page_size=4),
+    )
+    orders = mws_client.orders.backfill_orders(
+        start, start + timedelta(days=1), shards=1, max_workers=1,
+        min_window=12 * 3600,
+    )
+    # The first page of the split window is yielded before its halves
+    # are listed
+    assert next(orders).AmazonOrderId.text == '111-1234567-0000000'
+    assert len(mock_adapter.request_history) == 1
+    order_ids = [order.AmazonOrderId.text for order in orders]
+    assert len(order_ids) == 9
+    assert len(set(order_ids)) == 9
+
+    actions = [
+        request.qs['action'][0] for request in mock_adapter.request_history
+    ]
+    # The day, then its first half (3 pages) and its empty second half
+    assert actions.count('listorders') == 3
+    assert actions.count('listordersbynexttoken') == 2
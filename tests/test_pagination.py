@@ -0,0 +1,140 @@
+import pytest
+from lxml import objectify
+
+from pymws.pagination import Paginator, get_next_token
+
+
+def page(records, next_token=None, has_next=None):
+    xml = '<Result>'
+    if next_token is not None:
+        xml += '<NextToken>{}</NextToken>'.format(next_token)
+    if has_next is not None:
+        xml += '<HasNext>{}</HasNext>'.format(has_next)
+    xml += '<Items>'
+    xml += ''.join('<Item>{}</Item>'.format(record) for record in records)
+    xml += '</Items></Result>'
+    return objectify.fromstring(xml)
+
+
+PAGES = {
+    None: page([1, 2], 'token-2'),
+    'token-2': page([], 'token-3'),
+    'token-3': page([3], 'token-4', has_next='false'),
+}
+
+
+def test_next_token():
+    assert get_next_token(page([], 'abc')) == 'abc'
+    assert get_next_token(page([], 'abc', has_next='true')) == 'abc'
+    assert get_next_token(page([], 'none', has_next='false')) is None
+    assert get_next_token(page([], '')) is None
+    assert get_next_token(page([])) is None
+
+
+@pytest.mark.parametrize('prefetch', [0, 1, 2])
+def test_paginator(prefetch):
+    tokens = []
+
+    def next_page(token):
+        tokens.append(token)
+        return PAGES[token]
+
+    paginator = Paginator(
+        lambda: PAGES[None], next_page, 'Items.Item', prefetch=prefetch
+    )
+    assert [int(item) for item in paginator] == [1, 2, 3]
+    assert tokens == ['token-2', 'token-3']
+
+
+def test_paginator_is_lazy():
+    fetched = []
+
+    def next_page(token):
+        fetched.append(token)
+        return PAGES[token]
+
+    records = iter(Paginator(lambda: PAGES[None], next_page, 'Items.Item'))
+    assert next(records) == 1
+    assert next(records) == 2
+    assert fetched == []
+
+
+def test_prefetch_errors_are_raised():
+
+    def next_page(token):
+        raise ValueError(token)
+
+    paginator = Paginator(
+        lambda: PAGES[None], next_page, 'Items.Item', prefetch=1
+    )
+    records = iter(paginator)
+    assert next(records) == 1
+    assert next(records) == 2
+    with pytest.raises(ValueError):
+        next(records)
+
+
+def test_iter_orders(mws_client, mock_adapter, example_response):
+    mock_adapter.register_uri(
+        'GET',
+        '/Orders/2013-09-01?Action=ListOrders',
+        status_code=200,
+        text=example_response('orders/list_orders.xml'),
+        headers={'Content-Type': 'text/xml'}
+    )
+    mock_adapter.register_uri(
+        'GET',
+        '/Orders/2013-09-01?Action=ListOrdersByNextToken',
+        status_code=200,
+        text=example_response('orders/list_orders_by_next_token.xml').replace(
+            '<NextToken>NextTokenB64Encoded==</NextToken>', ''
+        ),
+        headers={'Content-Type': 'text/xml'}
+    )
+    orders = list(mws_client.orders.iter_orders(prefetch=1))
+    assert len(orders) == 5
+    assert len(mock_adapter.request_history) == 2
+
+
+def test_iter_report_request_list(mws_client, mock_adapter, example_response):
+    mock_adapter.register_uri(
+        'GET',
+        '/Reports/2009-01-01?Action=GetReportRequestList',
+        status_code=200,
+        text=example_response('reports/get_report_request_list.xml'),
+        headers={'Content-Type': 'text/xml'}
+    )
+    mock_adapter.register_uri(
+        'GET',
+        '/Reports/2009-01-01?Action=GetReportRequestListByNextToken',
+        status_code=200,
+        text=example_response(
+            'reports/get_report_request_list_by_next_token.xml'
+        ),
+        headers={'Content-Type': 'text/xml'}
+    )
+    statuses = [
+        info.ReportProcessingStatus
+        for info in mws_client.reports.iter_report_request_list()
+    ]
+    assert statuses == ['_DONE_', '_SUBMITTED_']
+
+
+def test_iter_feed_submission_list(
+        mws_client, mock_adapter, example_response):
+    mock_adapter.register_uri(
+        'GET',
+        '/Feeds/2009-01-01?Action=GetFeedSubmissionList',
+        status_code=200,
+        text=example_response('feeds/submission-list.xml'),
+        headers={'Content-Type': 'text/xml'}
+    )
+    mock_adapter.register_uri(
+        'GET',
+        '/Feeds/2009-01-01?Action=GetFeedSubmissionListByNextToken',
+        status_code=200,
+        text=example_response('feeds/submission-list-token.xml'),
+        headers={'Content-Type': 'text/xml'}
+    )
+    submissions = list(mws_client.feeds.iter_feed_submission_list())
+    assert submissions[-1].FeedSubmissionId == 2291326430
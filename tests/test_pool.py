@@ -0,0 +1,79 @@
+import threading
+import time
+
+import requests_mock
+
+from pymws.pool import ConcurrencyLimiter, MWSPool
+
+
+def test_clients_share_sessions_per_host():
+    pool = MWSPool(access_key_id='KEY', secret_key='SECRET')
+    us = pool.client('US', 'SELLER_1', 'token-1')
+    br = pool.client('BR', 'SELLER_2', 'token-2')
+    de = pool.client('DE', 'SELLER_1', 'token-3')
+
+    assert us.merchant_id == 'SELLER_1'
+    assert us.access_key_id == 'KEY'
+    assert us.auth_token == 'token-1'
+    # US and BR are served by the same host
+    assert us.session is br.session
+    assert us.session is not de.session
+
+    assert pool.client('US', 'SELLER_1', 'token-1') is us
+    assert pool.client('US', 'SELLER_1', 'token-2') is not us
+    assert us.limiter is pool.limiter
+    pool.close()
+
+
+def test_pool_clients_make_requests(example_response):
+    pool = MWSPool(
+        access_key_id='KEY', secret_key='SECRET', max_concurrency=2
+    )
+    client = pool.client('US', 'SELLER_1', 'token-1')
+    adapter = requests_mock.Adapter()
+    client.session.mount(client.marketplace.endpoint, adapter)
+    adapter.register_uri(
+        'GET',
+        client.marketplace.endpoint + '/Orders/2013-09-01',
+        status_code=200,
+        text=example_response('orders/get_service_status.xml'),
+        headers={'Content-Type': 'text/xml'}
+    )
+    assert client.orders.get_service_status().Status == 'GREEN'
+    assert 'SellerId=SELLER_1' in adapter.request_history[0].url
+
+
+def test_concurrency_limiter():
+    limiter = ConcurrencyLimiter(
+        max_concurrency=3, max_concurrency_per_seller=1
+    )
+    in_flight = {'total': 0, 'max': 0, 'A': 0, 'max_A': 0}
+    lock = threading.Lock()
+
+    def request(seller_id):
+        with limiter(seller_id):
+            with lock:
+                in_flight['total'] += 1
+                in_flight['max'] = max(in_flight['max'], in_flight['total'])
+                if seller_id == 'A':
+                    in_flight['A'] += 1
+                    in_flight['max_A'] = max(
+                        in_flight['max_A'], in_flight['A']
+                    )
+            time.sleep(0.01)
+            with lock:
+                in_flight['total'] -= 1
+                if seller_id == 'A':
+                    in_flight['A'] -= 1
+
+    threads = [
+        threading.Thread(target=request, args=(seller_id,))
+        for seller_id in 'AAAABCDEFG'
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert in_flight['max'] <= 3
+    assert in_flight['max_A'] == 1
@@ -5,8 +5,10 @@ from click.testing import CliRunner
 import pytest
 
 from pymws import MWS, cli
-from pymws.exceptions import AccessDenied
-from pymws.utils import flatten_list, flatten_dict
+from pymws.exceptions import AccessDenied, MWSException
+from pymws.utils import (
+    chunked, flatten_list, flatten_dict, iter_xsv, parse_xsv
+)
 
 
 def test_command_line_interface():
@@ -84,3 +86,32 @@ def test_get_service_status(mws_client, mock_adapter, example_response):
     )
     with pytest.raises(AccessDenied):
         mws_client.orders.get_service_status()
+
+
+def test_parse_xsv():
+    rows = parse_xsv('sku\tprice\r\nA-1\t10\r\n\r\nB-2\t20\t5\nC-3\n')
+    assert rows == [
+        {'sku': 'A-1', 'price': '10'},
+        {'sku': 'B-2', 'price': '20', None: ['5']},
+        {'sku': 'C-3', 'price': None},
+    ]
+    assert parse_xsv('') == []
+
+
+def test_iter_xsv():
+    chunks = [b'sku,qty\nA-', b'1,10\nB-2,', b'20']
+    reader = iter_xsv(chunks, rows='tuple')
+    assert reader.fieldnames == ['sku', 'qty']
+    assert list(reader) == [('A-1', '10'), ('B-2', '20')]
+
+    # Single column files have no delimiter to sniff
+    reader = iter_xsv([b'sku\nA-1\n'], rows='namedtuple')
+    assert [row.sku for row in reader] == ['A-1']
+
+    with pytest.raises(MWSException):
+        iter_xsv(chunks, rows='list')
+
+
+def test_chunked():
+    assert list(chunked([1, 2, 3, 4, 5], 2)) == [[1, 2], [3, 4], [5]]
+    assert list(chunked([], 2)) == []
@@ -1,4 +1,10 @@
 from datetime import datetime
+from io import BytesIO
+
+import pytest
+
+from pymws.exceptions import ContentMD5Mismatch
+from pymws.utils import XSVReader, get_md5_hash
 
 
 def test_request_report(mws_client, mock_adapter, example_response):
@@ -92,3 +98,75 @@ def test_get_report_csv(
     response = mws_client.reports.get_report(123456789)
     assert len(response) == 2
     assert response[0]['sku'] == 'test-1'
+
+
+def test_iter_report(mws_client, mock_adapter, example_response):
+    body = example_response('reports/get_report_tab_separated.tsv')
+    mock_adapter.register_uri(
+        'GET',
+        mws_client.marketplace.endpoint + '/Reports/2009-01-01',
+        status_code=200,
+        content=body.encode('utf-8'),
+        headers={
+            'Content-Type': 'text/plain;charset=Cp1252',
+            'Content-MD5': get_md5_hash(body.encode('utf-8')),
+        }
+    )
+    rows = mws_client.reports.iter_report(123456789, chunk_size=16)
+    assert isinstance(rows, XSVReader)
+    rows = list(rows)
+    assert rows == mws_client.reports.get_report(123456789)
+    assert rows[0]['listing-id'] == '0305XXNBYUQ'
+
+
+def test_download_report(mws_client, mock_adapter, example_response):
+    body = example_response(
+        'reports/get_report_comma_separated.csv'
+    ).encode('utf-8')
+    mock_adapter.register_uri(
+        'GET',
+        mws_client.marketplace.endpoint + '/Reports/2009-01-01',
+        status_code=200,
+        content=body,
+        headers={
+            'Content-Type': 'text/plain;charset=Cp1252',
+            'Content-MD5': get_md5_hash(body),
+        }
+    )
+    fileobj = BytesIO()
+    assert mws_client.reports.download_report(
+        123456789, fileobj, chunk_size=10
+    ) == len(body)
+    assert fileobj.getvalue() == body
+
+
+def test_stream_report_md5_mismatch(mws_client, mock_adapter):
+    mock_adapter.register_uri(
+        'GET',
+        mws_client.marketplace.endpoint + '/Reports/2009-01-01',
+        status_code=200,
+        content=b'sku\tprice\ntest-1\t10\n',
+        headers={
+            'Content-Type': 'text/plain;charset=Cp1252',
+            'Content-MD5': get_md5_hash(b'something else'),
+        }
+    )
+    with pytest.raises(ContentMD5Mismatch):
+        for chunk in mws_client.reports.stream_report(123456789):
+            pass
+
+
+def test_iter_report_tuples(mws_client, mock_adapter, example_response):
+    body = example_response('reports/get_report_tab_separated.tsv')
+    mock_adapter.register_uri(
+        'GET',
+        mws_client.marketplace.endpoint + '/Reports/2009-01-01',
+        status_code=200,
+        content=body.encode('utf-8'),
+        headers={'Content-Type': 'text/plain;charset=Cp1252'}
+    )
+    reader = mws_client.reports.iter_report(123456789, rows='namedtuple')
+    rows = list(reader)
+    assert len(rows) == 3
+    assert reader.fieldnames[:2] == ['item-name', 'item-description']
+    assert rows[0].listing_id == '0305XXNBYUQ'
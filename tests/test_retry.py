@@ -0,0 +1,161 @@
+import pytest
+
+from pymws import MWS
+from pymws.exceptions import MWSError, QuotaExceeded, RequestThrottled
+from pymws.retry import RetryPolicy
+
+
+@pytest.fixture()
+def sleeps():
+    return []
+
+
+@pytest.fixture()
+def retry_client(mws_client, sleeps):
+    mws_client.retry = RetryPolicy(
+        max_attempts=3, base_delay=2, jitter=0, sleep=sleeps.append
+    )
+    return mws_client
+
+
+def throttled(example_response):
+    return {
+        'status_code': 503,
+        'text': example_response('503.xml'),
+        'headers': {'Content-Type': 'text/xml'},
+    }
+
+
+def status_ok(example_response):
+    return {
+        'status_code': 200,
+        'text': example_response('orders/get_service_status.xml'),
+        'headers': {'Content-Type': 'text/xml'},
+    }
+
+
+def test_retry_throttled_request(
+        retry_client, mock_adapter, example_response, sleeps):
+    mock_adapter.register_uri(
+        'GET',
+        retry_client.marketplace.endpoint + '/Orders/2013-09-01',
+        [throttled(example_response), status_ok(example_response)]
+    )
+    response = retry_client.orders.get_service_status()
+    assert response.Status == 'GREEN'
+    assert sleeps == [2]
+
+    stats = retry_client.last_retry_stats
+    assert stats.attempts == 2
+    assert stats.retries == 1
+    assert stats.sleep_time == 2
+
+    # The prepared request is reused and not signed again
+    first, second = mock_adapter.request_history
+    assert first.url == second.url
+
+
+def test_retry_signs_old_request_again(
+        mws_client, mock_adapter, example_response, clock):
+    mws_client.clock = clock
+    mws_client.retry = RetryPolicy(
+        max_attempts=3, base_delay=200, max_delay=600, jitter=0,
+        sleep=clock.sleep,
+    )
+    mock_adapter.register_uri(
+        'GET',
+        mws_client.marketplace.endpoint + '/Orders/2013-09-01',
+        [
+            throttled(example_response),
+            throttled(example_response),
+            status_ok(example_response),
+        ]
+    )
+    response = mws_client.orders.get_service_status()
+    assert response.Status == 'GREEN'
+    assert clock.slept == [200, 400]
+
+    # The second attempt reuses the request signed 200 seconds before,
+    # the third one is past resign_after and is signed again
+    first, second, third = mock_adapter.request_history
+    assert first.url == second.url
+    assert third.url != second.url
+    assert third.qs['timestamp'] != second.qs['timestamp']
+
+
+def test_retry_gives_up(
+        retry_client, mock_adapter, example_response, sleeps):
+    mock_adapter.register_uri(
+        'GET',
+        retry_client.marketplace.endpoint + '/Orders/2013-09-01',
+        **throttled(example_response)
+    )
+    with pytest.raises(RequestThrottled) as excinfo:
+        retry_client.orders.get_service_status()
+    assert excinfo.value.code == 'RequestThrottled'
+    assert sleeps == [2, 4]
+    assert retry_client.last_retry_stats.attempts == 3
+    assert retry_client.retry.stats.retries == 2
+
+
+def test_quota_exceeded_is_not_retried(
+        retry_client, mock_adapter, example_response, sleeps):
+    mock_adapter.register_uri(
+        'GET',
+        retry_client.marketplace.endpoint + '/Orders/2013-09-01',
+        status_code=503,
+        text=example_response('503.xml').replace(
+            'RequestThrottled', 'QuotaExceeded'
+        ),
+        headers={'Content-Type': 'text/xml'}
+    )
+    with pytest.raises(QuotaExceeded):
+        retry_client.orders.get_service_status()
+    assert sleeps == []
+
+
+def test_retry_server_errors(
+        retry_client, mock_adapter, example_response, sleeps):
+    mock_adapter.register_uri(
+        'GET',
+        retry_client.marketplace.endpoint + '/Orders/2013-09-01',
+        [
+            {'status_code': 502, 'text': 'Bad gateway'},
+            status_ok(example_response),
+        ]
+    )
+    response = retry_client.orders.get_service_status()
+    assert response.Status == 'GREEN'
+    assert sleeps == [2]
+
+
+def test_no_retry_by_default(mws_client, mock_adapter, example_response):
+    mock_adapter.register_uri(
+        'GET',
+        mws_client.marketplace.endpoint + '/Orders/2013-09-01',
+        status_code=500,
+        text='Internal error',
+    )
+    with pytest.raises(MWSError) as excinfo:
+        mws_client.orders.get_service_status()
+    assert excinfo.value.status_code == 500
+    assert mws_client.last_retry_stats.attempts == 1
+
+
+def test_backoff_delays():
+    policy = RetryPolicy(
+        base_delay=1, max_delay=5, jitter=0.5, random=lambda: 1.0
+    )
+    assert [policy.get_delay(attempt) for attempt in range(1, 6)] == \
+        [0.5, 1, 2, 2.5, 2.5]
+
+    policy = RetryPolicy(base_delay=1, max_delay=5, jitter=0)
+    assert [policy.get_delay(attempt) for attempt in range(1, 6)] == \
+        [1, 2, 4, 5, 5]
+
+
+def test_client_accepts_policy():
+    policy = RetryPolicy()
+    client = MWS('US', retry=policy)
+    assert client.retry is policy
+    assert client.last_retry_stats is None
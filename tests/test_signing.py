@@ -0,0 +1,88 @@
+import base64
+from datetime import datetime
+import hashlib
+import hmac
+
+import pytest
+
+from pymws.exceptions import MWSException
+from pymws.signing import Signer, build_query_string
+
+
+TIMESTAMP = datetime(2020, 1, 1, 10, 30, 30)
+
+
+@pytest.fixture()
+def signer():
+    return Signer(
+        'https://mws.amazonservices.com', 'ACESSKEY', 'SECRET',
+        'MERCHANT_ID', 'amzn.mws.big-fat-token'
+    )
+
+
+def all_params(**kwargs):
+    params = {
+        'AWSAccessKeyId': 'ACESSKEY',
+        'Action': 'ListOrders',
+        'MWSAuthToken': 'amzn.mws.big-fat-token',
+        'SellerId': 'MERCHANT_ID',
+        'SignatureMethod': 'HmacSHA256',
+        'SignatureVersion': '2',
+        'Timestamp': TIMESTAMP,
+        'Version': '2013-09-01',
+    }
+    params.update(kwargs)
+    return params
+
+
+def test_query_string_matches_full_build(signer):
+    req_params = {
+        'Timestamp': TIMESTAMP,
+        'CreatedAfter': datetime(2020, 1, 1),
+        'MarketplaceId.Id.1': 'ATVPDKIKX0DER',
+        'Zeta': 'Los Ángeles',
+        'BuyerEmail': 'a+b@example.com',
+    }
+    assert signer.get_query_string(
+        'ListOrders', dict(req_params), '2013-09-01'
+    ) == build_query_string(all_params(**req_params))
+
+
+def test_query_string_overrides_constants(signer):
+    req_params = {'Timestamp': TIMESTAMP, 'SellerId': 'OTHER'}
+    query_string = signer.get_query_string(
+        'ListOrders', req_params, '2013-09-01'
+    )
+    assert query_string == build_query_string(all_params(**req_params))
+    assert query_string.count('SellerId=') == 1
+
+
+def test_signature(signer):
+    query_string = build_query_string(all_params())
+    expected = base64.b64encode(hmac.new(
+        b'SECRET',
+        '\n'.join([
+            'GET', 'mws.amazonservices.com', '/Orders/2013-09-01',
+            query_string
+        ]).encode('utf-8'),
+        hashlib.sha256,
+    ).digest()).decode('utf-8')
+    assert signer.sign('GET', '/Orders/2013-09-01', query_string) == expected
+    # The key state is reused, not consumed
+    assert signer.sign('GET', '/Orders/2013-09-01', query_string) == expected
+
+
+def test_signature_needs_secret():
+    with pytest.raises(MWSException):
+        Signer('https://mws.amazonservices.com', 'KEY', None, 'A1', None) \
+            .sign('GET', '/', '')
+
+
+def test_client_signer_follows_credentials(mws_client):
+    signer = mws_client.signer
+    assert mws_client.signer is signer
+    mws_client.auth_token = 'new-token'
+    assert mws_client.signer is not signer
+    assert 'MWSAuthToken=new-token' in mws_client.get_query_string(
+        'ListOrders', {}, '2013-09-01'
+    )
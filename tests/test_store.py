@@ -0,0 +1,89 @@
+import pytest
+
+from pymws.exceptions import ContentMD5Mismatch, MWSException
+from pymws.store import ResultStore
+from pymws.utils import get_md5_hash
+
+
+def register_report(mws_client, mock_adapter, body, md5=None):
+    mock_adapter.register_uri(
+        'GET',
+        mws_client.marketplace.endpoint + '/Reports/2009-01-01',
+        status_code=200,
+        content=body,
+        headers={
+            'Content-Type': 'text/plain;charset=Cp1252',
+            'Content-MD5': md5 or get_md5_hash(body),
+        }
+    )
+
+
+def test_put_and_get(tmpdir):
+    store = ResultStore(str(tmpdir))
+    assert store.get('GetReport', '1') is None
+
+    result = store.put(
+        'GetReport', '1', [b'a\tb\n', b'1\t2\n'], content_type='text/plain'
+    )
+    assert result.md5 == get_md5_hash(b'a\tb\n1\t2\n')
+    assert result.size == 8
+    assert store.get('GetReport', '1') == result
+    assert store.verify(result)
+    assert b''.join(store.iter_chunks(result, 3)) == b'a\tb\n1\t2\n'
+    with store.map(result) as data:
+        assert data[:3] == b'a\tb'
+
+    # Same content under another id is stored once
+    other = store.put('GetReport', '2', [b'a\tb\n1\t2\n'])
+    assert other.path == result.path
+    store.delete('GetReport', '1')
+    assert store.get('GetReport', '1') is None
+    assert store.get('GetReport', '2') is not None
+
+
+def test_put_md5_mismatch(tmpdir):
+    store = ResultStore(str(tmpdir))
+    with pytest.raises(ContentMD5Mismatch):
+        store.put('GetReport', '1', [b'data'], expected_md5='bad')
+    assert store.get('GetReport', '1') is None
+    assert not tmpdir.join('objects').listdir()
+
+
+def test_empty_result(tmpdir):
+    store = ResultStore(str(tmpdir))
+    result = store.put('GetReport', '1', [])
+    with store.map(result) as data:
+        assert data == b''
+
+
+def test_stored_report(tmpdir, mws_client, mock_adapter, example_response):
+    mws_client.store = ResultStore(str(tmpdir))
+    body = example_response('reports/get_report_tab_separated.tsv') \
+        .encode('utf-8')
+    register_report(mws_client, mock_adapter, body)
+
+    rows = list(mws_client.reports.iter_report(123456789))
+    assert mock_adapter.call_count == 1
+    assert list(mws_client.reports.iter_report(123456789)) == rows
+    assert mws_client.reports.get_report(123456789)[0]['listing-id'] == \
+        '0305XXNBYUQ'
+    with mws_client.reports.map_report(123456789) as data:
+        assert data[:] == body
+    assert mock_adapter.call_count == 1
+
+    # Another report is downloaded
+    mws_client.reports.get_report(42)
+    assert mock_adapter.call_count == 2
+
+
+def test_stored_report_md5_mismatch(tmpdir, mws_client, mock_adapter):
+    mws_client.store = ResultStore(str(tmpdir))
+    register_report(mws_client, mock_adapter, b'a\tb\n', md5='bad')
+    with pytest.raises(ContentMD5Mismatch):
+        mws_client.reports.get_report(1)
+    assert mws_client.store.get('GetReport', '1') is None
+
+
+def test_map_report_without_store(mws_client):
+    with pytest.raises(MWSException):
+        mws_client.reports.map_report(1)
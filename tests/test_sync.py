@@ -0,0 +1,148 @@
+from datetime import datetime, timezone
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from pymws.exceptions import MWSError, MWSException
+from pymws.sync import JSONCheckpointStore, OrderSync
+
+
+START = datetime(2020, 8, 1, tzinfo=timezone.utc)
+
+ERROR_RESPONSE = """<?xml version="1.0"?>
+<ErrorResponse xmlns="https://mws.amazonservices.com/Orders/2013-09-01">
+  <Error>
+    <Type>Sender</Type>
+    <Code>{}</Code>
+    <Message>Invalid NextToken</Message>
+  </Error>
+  <RequestID>7e0a8c3e-2d5c-4a5b-9f2e-0c2b6d6e4f11</RequestID>
+</ErrorResponse>"""
+
+
+@pytest.fixture()
+def orders_api(mws_client, mock_adapter, example_response):
+    """
+    Serves a first page of three orders and a last page repeating two
+    of them. Set `fail_next_token` to make the next
+    ListOrdersByNextToken request fail, with the error code
+    `next_token_error` if given.
+    """
+    last_page = example_response('orders/list_orders_by_next_token.xml') \
+        .replace('<NextToken>NextTokenB64Encoded==</NextToken>', '')
+    state = {'fail_next_token': False, 'next_token_error': None}
+
+    def respond(request, context):
+        context.headers['Content-Type'] = 'text/xml'
+        if 'Action=ListOrdersByNextToken' in request.url:
+            if state['fail_next_token']:
+                state['fail_next_token'] = False
+                context.status_code = 400
+                if state['next_token_error']:
+                    return ERROR_RESPONSE.format(state['next_token_error'])
+                return '<ErrorResponse/>'
+            return last_page
+        return example_response('orders/list_orders.xml')
+
+    mock_adapter.register_uri(
+        'GET', mws_client.marketplace.endpoint + '/Orders/2013-09-01',
+        text=respond,
+    )
+    return state
+
+
+def get_params(request):
+    return dict(
+        (key, values[0])
+        for key, values in parse_qs(urlparse(request.url).query).items()
+    )
+
+
+def test_sync(mws_client, mock_adapter, orders_api, clock):
+    clock.now = datetime(2020, 8, 10, 16, 0, tzinfo=timezone.utc)
+    sync = OrderSync(
+        mws_client, start_date=START, overlap=86400, clock=clock
+    )
+    orders = [order.AmazonOrderId.text for order in sync.sync()]
+    assert orders == [
+        '111-1234567-0000001', '111-1234567-0000002', '111-1234567-0000003',
+    ]
+    params = get_params(mock_adapter.request_history[0])
+    assert params['Action'] == 'ListOrders'
+    assert params['MarketplaceId.Id.1'] == mws_client.marketplace.id
+    assert params['LastUpdatedAfter'] == '2020-07-31T00:00:00+00:00'
+    assert params['LastUpdatedBefore'] == '2020-08-10T15:57:00+00:00'
+    assert sync.watermark == datetime(
+        2020, 8, 10, 15, 57, tzinfo=timezone.utc
+    )
+
+    # The next window overlaps the previous one, the orders already
+    # seen are not yielded again
+    clock.now = datetime(2020, 8, 10, 17, 0, tzinfo=timezone.utc)
+    assert list(sync.sync()) == []
+    params = get_params(mock_adapter.request_history[2])
+    assert params['LastUpdatedAfter'] == '2020-08-09T15:57:00+00:00'
+    assert params['LastUpdatedBefore'] == '2020-08-10T16:57:00+00:00'
+
+
+def test_sync_resume(mws_client, mock_adapter, orders_api, tmp_path, clock):
+    store = JSONCheckpointStore(str(tmp_path / 'orders.json'))
+    clock.now = datetime(2020, 8, 10, 16, 0, tzinfo=timezone.utc)
+    orders_api['fail_next_token'] = True
+    sync = OrderSync(mws_client, store, start_date=START, clock=clock)
+    orders = []
+    with pytest.raises(MWSError):
+        for order in sync.sync():
+            orders.append(order.AmazonOrderId.text)
+    assert len(orders) == 3
+    assert sync.watermark == START
+    # The orders seen are only saved at the end of the synchronization
+    assert store.load(sync.key)['seen'] == {}
+
+    # A new process resumes from the NextToken of the failed page, the
+    # orders of the first page listed again are yielded again
+    sync = OrderSync(mws_client, store, clock=clock)
+    assert [order.AmazonOrderId.text for order in sync.sync()] == [
+        '111-1234567-0000002', '111-1234567-0000003',
+    ]
+    params = get_params(mock_adapter.request_history[-1])
+    assert params['Action'] == 'ListOrdersByNextToken'
+    assert params['NextToken'] == 'NextTokenB64Encoded=='
+    assert sync.watermark == datetime(
+        2020, 8, 10, 15, 57, tzinfo=timezone.utc
+    )
+
+
+def test_sync_expired_token(mws_client, mock_adapter, orders_api, clock):
+    clock.now = datetime(2020, 8, 10, 16, 0, tzinfo=timezone.utc)
+    orders_api['fail_next_token'] = True
+    sync = OrderSync(mws_client, start_date=START, clock=clock)
+    with pytest.raises(MWSError):
+        list(sync.sync())
+
+    # Errors other than an invalid token are raised
+    orders_api['fail_next_token'] = True
+    orders_api['next_token_error'] = 'InternalError'
+    with pytest.raises(MWSError) as excinfo:
+        list(sync.sync())
+    assert excinfo.value.code == 'InternalError'
+
+    # The window starts again when the token expired
+    orders_api['fail_next_token'] = True
+    orders_api['next_token_error'] = 'InvalidParameterValue'
+    list(sync.sync())
+    actions = [
+        get_params(request)['Action']
+        for request in mock_adapter.request_history
+    ]
+    assert actions[-3:] == [
+        'ListOrdersByNextToken', 'ListOrders', 'ListOrdersByNextToken',
+    ]
+    assert sync.watermark == datetime(
+        2020, 8, 10, 15, 57, tzinfo=timezone.utc
+    )
+
+
+def test_sync_requires_start_date(mws_client):
+    with pytest.raises(MWSException):
+        list(OrderSync(mws_client).sync())
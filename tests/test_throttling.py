@@ -0,0 +1,176 @@
+from datetime import datetime, timezone
+import threading
+
+import requests_mock
+
+from pymws import MWS
+from pymws.hooks import RequestEvent
+from pymws.throttling import Quota, QuotaTracker, Throttle
+
+
+def test_burst_then_restore_rate(clock):
+    throttle = Throttle(clock=clock, sleep=clock.sleep)
+
+    # ListOrders allows a burst of 6 requests
+    for _ in range(6):
+        assert throttle.acquire('A1', 'endpoint', 'ListOrders') == 0
+
+    # and then restores one request every minute
+    assert throttle.acquire('A1', 'endpoint', 'ListOrders') == 60
+    assert throttle.acquire('A1', 'endpoint', 'ListOrders') == 60
+    assert clock.slept == [60, 60]
+
+
+def test_waiting_callers_queue_up(clock):
+    throttle = Throttle(
+        quotas={'Ping': Quota(1, 10)}, clock=clock, sleep=clock.sleep
+    )
+    assert throttle.reserve('A1', 'endpoint', 'Ping') == 0
+    assert throttle.reserve('A1', 'endpoint', 'Ping') == 10
+    assert throttle.reserve('A1', 'endpoint', 'Ping') == 20
+    assert not throttle.available('A1', 'endpoint', 'Ping')
+
+    clock.now = 30
+    assert throttle.available('A1', 'endpoint', 'Ping')
+
+
+def test_buckets_are_keyed(clock):
+    throttle = Throttle(
+        quotas={'Ping': Quota(1, 10)}, clock=clock, sleep=clock.sleep
+    )
+    assert throttle.reserve('A1', 'us', 'Ping') == 0
+    assert throttle.reserve('A2', 'us', 'Ping') == 0
+    assert throttle.reserve('A1', 'eu', 'Ping') == 0
+
+    # Next token pages share the quota of the operation
+    assert throttle.reserve('A1', 'us', 'ListOrders') == 0
+    for _ in range(5):
+        throttle.reserve('A1', 'us', 'ListOrdersByNextToken')
+    assert throttle.reserve('A1', 'us', 'ListOrders') == 60
+
+    # Unknown operations are never delayed
+    for _ in range(100):
+        assert throttle.reserve('A1', 'us', 'Unknown') == 0
+
+
+def test_throttle_is_thread_safe(clock):
+    throttle = Throttle(
+        quotas={'Ping': Quota(10, 1)}, clock=clock, sleep=lambda s: None
+    )
+    delays = []
+
+    def worker():
+        for _ in range(10):
+            delays.append(throttle.reserve('A1', 'us', 'Ping'))
+
+    threads = [threading.Thread(target=worker) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(delays) == [0.0] * 10 + [float(i) for i in range(1, 41)]
+
+
+def test_client_uses_throttle(example_response, clock):
+    throttle = Throttle(clock=clock, sleep=clock.sleep)
+    client = MWS(
+        'US',
+        access_key_id='ACESSKEY',
+        secret_key='SECRET',
+        merchant_id='MERCHANT_ID',
+        throttle=throttle,
+    )
+    adapter = requests_mock.Adapter()
+    client.session.mount(client.marketplace.endpoint, adapter)
+    adapter.register_uri(
+        'GET',
+        client.marketplace.endpoint + '/Orders/2013-09-01',
+        status_code=200,
+        text=example_response('orders/get_service_status.xml'),
+        headers={'Content-Type': 'text/xml'}
+    )
+    for _ in range(3):
+        client.orders.get_service_status()
+
+    # GetServiceStatus has a burst of 2 and restores every 5 minutes
+    assert clock.slept == [300]
+
+
+def quota_response(example_response, remaining):
+    return {
+        'text': example_response('orders/get_service_status.xml'),
+        'headers': {
+            'Content-Type': 'text/xml',
+            'x-mws-quota-max': '200.0',
+            'x-mws-quota-remaining': str(remaining),
+            'x-mws-quota-resetsOn': '2020-08-10T17:00:00.000Z',
+        },
+    }
+
+
+def test_quota_tracker(example_response, clock):
+    clock.now = datetime(2020, 8, 10, 16, tzinfo=timezone.utc).timestamp()
+    quotas = QuotaTracker(
+        slowdown=True, max_delay=600, clock=clock, sleep=clock.sleep
+    )
+    client = MWS(
+        'US',
+        access_key_id='ACESSKEY',
+        secret_key='SECRET',
+        merchant_id='MERCHANT_ID',
+        hooks=[quotas],
+    )
+    adapter = requests_mock.Adapter()
+    client.session.mount(client.marketplace.endpoint, adapter)
+    adapter.register_uri(
+        'GET',
+        client.marketplace.endpoint + '/Orders/2013-09-01',
+        [
+            quota_response(example_response, 150),
+            quota_response(example_response, 20),
+            quota_response(example_response, 0),
+            quota_response(example_response, 199),
+        ],
+    )
+    endpoint = client.marketplace.endpoint
+    client.orders.get_service_status()
+    state = quotas.get('MERCHANT_ID', endpoint, 'GetServiceStatus')
+    assert state.max == 200
+    assert state.remaining == 150
+    assert state.resets_on == datetime(2020, 8, 10, 17, tzinfo=timezone.utc)
+    assert quotas.get('MERCHANT_ID', endpoint, 'ListOrders') is None
+
+    # Plenty of quota left, no delay
+    client.orders.get_service_status()
+    assert clock.slept == []
+
+    # 20 requests left for the hour, one every 3 minutes
+    assert quotas.get_delay('MERCHANT_ID', endpoint, 'GetServiceStatus') == 180
+    client.orders.get_service_status()
+    assert clock.slept == [180]
+
+    # No quota left, wait until it resets
+    client.orders.get_service_status()
+    assert clock.slept == [180, 600]
+    assert list(quotas.get_states()) == [
+        ('MERCHANT_ID', endpoint, 'GetServiceStatus'),
+    ]
+
+    clock.now += 3600
+    assert quotas.get('MERCHANT_ID', endpoint, 'GetServiceStatus') is None
+    assert quotas.get_delay('MERCHANT_ID', endpoint, 'GetServiceStatus') == 0
+
+
+def test_quota_tracker_shared_quotas():
+    quotas = QuotaTracker()
+    event = RequestEvent('ListOrdersByNextToken', 'A1', 'https://eu')
+    event.quota_max = 200.0
+    event.quota_remaining = 120.0
+    event.quota_resets_on = datetime(2999, 1, 1, tzinfo=timezone.utc)
+    quotas.after_request(event)
+    # The pages draw from the quota of ListOrders, per endpoint
+    assert quotas.get('A1', 'https://eu', 'ListOrders').remaining == 120
+    assert quotas.get('A1', 'https://eu', 'ListOrdersByNextToken') \
+        .remaining == 120
+    assert quotas.get('A1', 'https://us', 'ListOrders') is None
@@ -0,0 +1,272 @@
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from pymws.exceptions import ProcessingCancelled, ProcessingTimeout
+from pymws.tracking import AdaptivePoller, FeedTracker, ReportTracker
+from pymws.utils import get_md5_hash
+
+REQUEST_LIST = """<?xml version="1.0"?>
+<GetReportRequestListResponse
+    xmlns="http://mws.amazonaws.com/doc/2009-01-01/">
+  <GetReportRequestListResult>
+    <HasNext>false</HasNext>
+    {}
+  </GetReportRequestListResult>
+</GetReportRequestListResponse>"""
+
+REQUEST_INFO = """<ReportRequestInfo>
+  <ReportRequestId>{}</ReportRequestId>
+  <ReportType>_GET_MERCHANT_LISTINGS_DATA_</ReportType>
+  <SubmittedDate>2020-08-10T10:00:00+00:00</SubmittedDate>
+  <ReportProcessingStatus>{}</ReportProcessingStatus>
+  {}
+</ReportRequestInfo>"""
+
+
+def request_list(*statuses):
+    infos = []
+    for request_id, status in statuses:
+        extra = ''
+        if status == '_DONE_':
+            extra = '<GeneratedReportId>R{}</GeneratedReportId>' \
+                '<CompletedDate>2020-08-10T10:02:00+00:00</CompletedDate>' \
+                .format(request_id)
+        infos.append(REQUEST_INFO.format(request_id, status, extra))
+    return {
+        'text': REQUEST_LIST.format(''.join(infos)),
+        'headers': {'Content-Type': 'text/xml'},
+    }
+
+
+def get_actions(mock_adapter):
+    return [
+        parse_qs(urlparse(request.url).query)['Action'][0]
+        for request in mock_adapter.request_history
+    ]
+
+
+def test_adaptive_poller():
+    poller = AdaptivePoller(
+        min_delay=10, max_delay=100, initial_estimate=60, smoothing=0.5
+    )
+    assert poller.get_delay('A', 0) == 60
+    assert poller.get_delay('A', 55) == 10
+    assert poller.get_delay('A', 100) == 20
+    assert poller.get_delay('A', 1000) == 100
+
+    poller.record('A', 120)
+    assert poller.estimate('A') == 120
+    poller.record('A', 20)
+    assert poller.estimate('A') == 70
+    assert poller.estimate('B') == 60
+
+
+def test_tracker_batches(mws_client, mock_adapter, clock):
+    mock_adapter.register_uri(
+        'GET',
+        mws_client.marketplace.endpoint + '/Reports/2009-01-01',
+        [
+            request_list(('1', '_IN_PROGRESS_'), ('2', '_DONE_'),
+                         ('3', '_SUBMITTED_')),
+            request_list(('1', '_DONE_NO_DATA_'), ('3', '_CANCELLED_')),
+        ],
+    )
+    poller = AdaptivePoller(min_delay=10, initial_estimate=30)
+    tracker = ReportTracker(
+        mws_client, poller=poller, clock=clock, sleep=clock.sleep
+    )
+    for request_id in ('1', '2', '3'):
+        tracker.add(request_id)
+    assert len(tracker) == 3
+
+    done = [
+        (info.ReportRequestId.text, info.ReportProcessingStatus.text)
+        for info in tracker
+    ]
+    assert done == [
+        ('2', '_DONE_'), ('1', '_DONE_NO_DATA_'), ('3', '_CANCELLED_'),
+    ]
+    assert mock_adapter.call_count == 2
+    query = parse_qs(urlparse(mock_adapter.request_history[0].url).query)
+    assert sorted(
+        value[0] for key, value in query.items()
+        if key.startswith('ReportRequestIdList.Id.')
+    ) == ['1', '2', '3']
+    assert query['MaxCount'] == ['3']
+    # The duration of the done report is taken from its dates
+    assert poller.estimate('_GET_MERCHANT_LISTINGS_DATA_') == 120
+    assert clock.slept == [30, 90]
+
+
+def test_tracker_timeout(mws_client, mock_adapter, clock):
+    mock_adapter.register_uri(
+        'GET',
+        mws_client.marketplace.endpoint + '/Reports/2009-01-01',
+        **request_list(('1', '_IN_PROGRESS_'))
+    )
+    tracker = ReportTracker(
+        mws_client, poller=AdaptivePoller(), timeout=100,
+        clock=clock, sleep=clock.sleep,
+    )
+    tracker.add('1')
+    with pytest.raises(ProcessingTimeout) as excinfo:
+        list(tracker)
+    assert excinfo.value.pending == ['1']
+
+
+def test_fetch_report(mws_client, mock_adapter, example_response):
+    body = b'sku\tquantity\nA\t1\n'
+    mock_adapter.register_uri(
+        'POST',
+        mws_client.marketplace.endpoint + '/Reports/2009-01-01',
+        text=example_response('reports/request_report.xml'),
+        headers={'Content-Type': 'text/xml'},
+    )
+    mock_adapter.register_uri(
+        'GET',
+        mws_client.marketplace.endpoint + '/Reports/2009-01-01',
+        [
+            request_list(('2291326454', '_IN_PROGRESS_')),
+            request_list(('2291326454', '_DONE_')),
+            {
+                'content': body,
+                'headers': {
+                    'Content-Type': 'text/plain',
+                    'Content-MD5': get_md5_hash(body),
+                },
+            },
+        ],
+    )
+    poller = AdaptivePoller(min_delay=0, initial_estimate=0)
+    chunks = mws_client.reports.fetch_report(
+        '_GET_MERCHANT_LISTINGS_DATA_', poller=poller
+    )
+    assert b''.join(chunks) == body
+    assert get_actions(mock_adapter) == [
+        'RequestReport', 'GetReportRequestList', 'GetReportRequestList',
+        'GetReport',
+    ]
+    assert 'ReportId=R2291326454' in mock_adapter.request_history[-1].url
+
+
+def test_fetch_report_cancelled(mws_client, mock_adapter, example_response):
+    mock_adapter.register_uri(
+        'POST',
+        mws_client.marketplace.endpoint + '/Reports/2009-01-01',
+        text=example_response('reports/request_report.xml'),
+        headers={'Content-Type': 'text/xml'},
+    )
+    mock_adapter.register_uri(
+        'GET',
+        mws_client.marketplace.endpoint + '/Reports/2009-01-01',
+        **request_list(('2291326454', '_CANCELLED_'))
+    )
+    poller = AdaptivePoller(min_delay=0, initial_estimate=0)
+    with pytest.raises(ProcessingCancelled):
+        mws_client.reports.fetch_report(
+            '_GET_MERCHANT_LISTINGS_DATA_', poller=poller
+        )
+
+
+SUBMISSION_LIST = """<?xml version="1.0"?>
+<GetFeedSubmissionListResponse
+    xmlns="http://mws.amazonaws.com/doc/2009-01-01/">
+  <GetFeedSubmissionListResult>
+    <HasNext>false</HasNext>
+    {}
+  </GetFeedSubmissionListResult>
+</GetFeedSubmissionListResponse>"""
+
+SUBMISSION_INFO = """<FeedSubmissionInfo>
+  <FeedSubmissionId>{}</FeedSubmissionId>
+  <FeedType>_POST_INVENTORY_AVAILABILITY_DATA_</FeedType>
+  <FeedProcessingStatus>{}</FeedProcessingStatus>
+</FeedSubmissionInfo>"""
+
+
+def test_feed_tracker(mws_client, mock_adapter, example_response):
+    # Submissions are done after as many polls as their id
+    polls = {}
+    feed_results = []
+
+    def respond(request, context):
+        context.headers['Content-Type'] = 'text/xml'
+        query = parse_qs(urlparse(request.url).query)
+        if query['Action'] == ['GetFeedSubmissionResult']:
+            feed_results.append(query['FeedSubmissionId'][0])
+            return example_response('feeds/result-failed.xml')
+        infos = []
+        for key, value in query.items():
+            if key.startswith('FeedSubmissionIdList.Id.'):
+                submission_id = value[0]
+                polls[submission_id] = polls.get(submission_id, 0) + 1
+                status = '_IN_PROGRESS_'
+                if polls[submission_id] >= int(submission_id):
+                    status = '_DONE_'
+                if submission_id == '2':
+                    status = '_CANCELLED_'
+                infos.append(SUBMISSION_INFO.format(submission_id, status))
+        return SUBMISSION_LIST.format(''.join(infos))
+
+    mock_adapter.register_uri(
+        'GET', mws_client.marketplace.endpoint + '/Feeds/2009-01-01',
+        text=respond,
+    )
+    poller = AdaptivePoller(min_delay=0, initial_estimate=0)
+    results = dict(
+        (info.FeedSubmissionId.text, result)
+        for info, result in mws_client.feeds.iter_feed_submission_results(
+            ['1', '2', '3'], max_workers=2, poller=poller
+        )
+    )
+    assert results['2'] is None
+    assert results['1'].Message.ProcessingReport.StatusCode == 'Complete'
+    assert sorted(feed_results) == ['1', '3']
+    assert get_actions(mock_adapter).count('GetFeedSubmissionList') == 3
+
+
+def test_feed_tracker_yields_early(
+        mws_client, mock_adapter, example_response, clock):
+    # '1' is done at the first poll, '5' after five polls
+    polls = {}
+
+    def respond(request, context):
+        context.headers['Content-Type'] = 'text/xml'
+        query = parse_qs(urlparse(request.url).query)
+        if query['Action'] == ['GetFeedSubmissionResult']:
+            return example_response('feeds/result-failed.xml')
+        infos = []
+        for key, value in query.items():
+            if key.startswith('FeedSubmissionIdList.Id.'):
+                submission_id = value[0]
+                polls[submission_id] = polls.get(submission_id, 0) + 1
+                status = '_IN_PROGRESS_'
+                if polls[submission_id] >= int(submission_id):
+                    status = '_DONE_'
+                infos.append(SUBMISSION_INFO.format(submission_id, status))
+        return SUBMISSION_LIST.format(''.join(infos))
+
+    mock_adapter.register_uri(
+        'GET', mws_client.marketplace.endpoint + '/Feeds/2009-01-01',
+        text=respond,
+    )
+    tracker = FeedTracker(
+        mws_client, poller=AdaptivePoller(min_delay=60, initial_estimate=0),
+        clock=clock, sleep=clock.sleep,
+    )
+    tracker.add('1')
+    tracker.add('5')
+    results = tracker.iter_results(max_workers=2)
+
+    info, result = next(results)
+    assert info.FeedSubmissionId.text == '1'
+    assert result.Message.ProcessingReport.StatusCode == 'Complete'
+    assert polls == {'1': 1, '5': 1}
+    assert clock.slept == [60]
+
+    info, result = next(results)
+    assert info.FeedSubmissionId.text == '5'
+    assert polls == {'1': 1, '5': 5}
+    assert len(clock.slept) == 5
+    assert list(results) == []
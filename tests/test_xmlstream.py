@@ -0,0 +1,116 @@
+import pytest
+
+from pymws.exceptions import MWSException
+from pymws.xmlstream import RecordStream
+
+
+def chunks(text, size=7):
+    data = text.encode('utf-8')
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def test_record_stream(example_response):
+    stream = RecordStream(
+        chunks(example_response('orders/list_orders.xml')), 'Orders.Order'
+    )
+    with pytest.raises(MWSException):
+        stream.next_token
+
+    orders = list(stream)
+    assert len(orders) == 3
+    assert orders[0]['AmazonOrderId'] == '111-1234567-0000001'
+    assert orders[0]['OrderTotal'] == {
+        'Amount': '138.11', 'CurrencyCode': 'USD'
+    }
+    assert orders[0]['PaymentMethodDetails'] == {
+        'PaymentMethodDetail': 'Standard'
+    }
+    assert stream.next_token == 'NextTokenB64Encoded=='
+
+    with pytest.raises(MWSException):
+        list(stream)
+
+
+def test_record_stream_releases_elements():
+    xml = '<Result><Items>{}</Items><HasNext>false</HasNext>' \
+        '<NextToken>abc</NextToken></Result>'.format(
+            ''.join('<Item><Id>{}</Id></Item>'.format(i) for i in range(100))
+        )
+    elements = []
+
+    def convert(element):
+        elements.append(element)
+        return element.findtext('Id')
+
+    stream = RecordStream(chunks(xml), 'Items.Item', convert)
+    assert list(stream) == [str(i) for i in range(100)]
+    # Only the last converted element is still attached to the tree
+    parent = elements[-1].getparent()
+    assert len(parent) == 1
+    assert len(elements[-1]) == 0
+    assert stream.next_token is None
+
+
+def test_record_stream_nested_records():
+    xml = '<Result><HasNext>true</HasNext><Items>' \
+        '<Item><Item>a</Item><Id>1</Id></Item>' \
+        '<Item><Id>2</Id></Item>' \
+        '</Items><NextToken>abc</NextToken></Result>'
+    stream = RecordStream(chunks(xml), 'Items.Item')
+    assert list(stream) == [{'Item': 'a', 'Id': '1'}, {'Id': '2'}]
+    assert stream.fields == {'HasNext': 'true', 'NextToken': 'abc'}
+    assert stream.next_token == 'abc'
+
+
+def test_repeated_children(example_response):
+    items = list(RecordStream(
+        chunks(example_response('inbound_shipment/list_shipment_items.xml')),
+        'ItemData.member',
+    ))
+    assert len(items) == 2
+    assert items[0]['PrepDetailsList']['PrepDetails'] == [
+        None, {'PrepOwner': 'SELLER', 'PrepInstruction': 'Polybagging'}
+    ]
+
+
+def test_iter_orders_stream(mws_client, mock_adapter, example_response):
+    mock_adapter.register_uri(
+        'GET',
+        '/Orders/2013-09-01?Action=ListOrders',
+        status_code=200,
+        text=example_response('orders/list_orders.xml'),
+        headers={'Content-Type': 'text/xml'}
+    )
+    mock_adapter.register_uri(
+        'GET',
+        '/Orders/2013-09-01?Action=ListOrdersByNextToken',
+        status_code=200,
+        text=example_response('orders/list_orders_by_next_token.xml').replace(
+            '<NextToken>NextTokenB64Encoded==</NextToken>', ''
+        ),
+        headers={'Content-Type': 'text/xml'}
+    )
+    orders = list(mws_client.orders.iter_orders(stream=True))
+    assert [order['AmazonOrderId'] for order in orders][:2] == \
+        ['111-1234567-0000001', '111-1234567-0000002']
+    assert len(orders) == 5
+    assert 'MarketplaceId.Id.1=ATVPDKIKX0DER' in \
+        mock_adapter.request_history[0].url
+
+
+def test_feed_submission_result_stream(
+        mws_client, mock_adapter, example_response):
+    mock_adapter.register_uri(
+        'GET',
+        mws_client.marketplace.endpoint + '/Feeds/2009-01-01',
+        status_code=200,
+        text=example_response('feeds/result-failed.xml'),
+        headers={'Content-Type': 'text/xml'}
+    )
+    stream = mws_client.feeds.iter_feed_submission_result('4901340')
+    results = list(stream)
+    assert results[0]['ResultCode'] == 'Error'
+    assert results[0]['AdditionalInfo']['AmazonOrderID'] == \
+        '113-123456-123456'
+    assert stream.fields['StatusCode'] == 'Complete'
+    assert stream.fields['MessagesWithError'] == '1'